@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""Benchmark: translation to several syntaxes in one pass vs. one pass per syntax."""
+from __future__ import annotations
+
+import random
+import timeit
+import typing
+
+from bench_query_construction import build_list_query
+
+from search_query.and_query import AndQuery
+from search_query.constants import Fields
+from search_query.or_query import OrQuery
+from search_query.query import Query
+
+# to run (from top-level dir): python benchmarks/bench_batch_translation.py
+
+SYNTAXES = ["pre_notation", "structured", "wos", "pubmed"]
+NR_STRATEGIES = 2_000
+
+
+def build_corpus(seed: int = 0) -> typing.List[Query]:
+    """Strategies: AND of 2-5 OR-blocks of 3-15 terms (fields supported by all syntaxes)"""
+    rng = random.Random(seed)
+    queries: typing.List[Query] = []
+    for _ in range(NR_STRATEGIES):
+        blocks = [
+            OrQuery(
+                [f"term{rng.randrange(5_000)}" for _ in range(rng.randint(3, 15))],
+                search_field=rng.choice([Fields.TITLE, Fields.ABSTRACT]),
+            )
+            for _ in range(rng.randint(2, 5))
+        ]
+        queries.append(AndQuery(blocks, search_field=Fields.TITLE))  # type: ignore
+    return queries
+
+
+def separate(queries: typing.List[Query]) -> None:
+    """One traversal per syntax"""
+    for query in queries:
+        for syntax in SYNTAXES:
+            query.to_string(syntax)
+
+
+def batch(queries: typing.List[Query]) -> None:
+    """One traversal for all syntaxes"""
+    for query in queries:
+        query.to_strings(SYNTAXES)
+
+
+def _time(function: typing.Callable, builder: typing.Callable) -> float:
+    # Fresh trees for each run (the strings are cached)
+    return min(
+        timeit.repeat(
+            "function(queries)",
+            setup="queries = builder()",
+            number=1,
+            repeat=3,
+            globals={"function": function, "builder": builder},
+        )
+    )
+
+
+def main() -> None:
+    """Compare separate and batch translation"""
+    workloads = [
+        ("corpus", build_corpus),
+        ("list_query", lambda: [build_list_query(50_000)]),
+    ]
+    print(f"{'workload':<12}{'separate':>14}{'batch':>14}")
+    for name, builder in workloads:
+        separate_time = _time(separate, builder)
+        batch_time = _time(batch, builder)
+        print(f"{name:<12}{separate_time * 1e3:>11.1f} ms{batch_time * 1e3:>11.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark: re-parsing after an edit (full vs. incremental)."""
+from __future__ import annotations
+
+import re
+import time
+import timeit
+
+from bench_parser_wos import generate_query
+
+from search_query.parser_wos import WOSParser
+
+# to run (from top-level dir): python benchmarks/bench_incremental_parse.py
+
+SIZES = [100, 1_000, 2_000, 10_000]
+
+# Position of the edited term (positions after the edit are shifted)
+EDIT_POSITIONS = {"start": 0.02, "middle": 0.5, "end": 0.98}
+
+# Time per edit (start and middle of strategies with thousands of terms)
+TARGET_MS = 1.0
+
+
+def main() -> int:
+    """Print the time per edit (a term is renamed and renamed back)
+    and check the edits at the start and in the middle against the target"""
+    print(
+        f"{'terms':>10}{'full [ms]':>12}{'first [ms]':>12}"
+        + "".join(f"{name + ' [ms]':>14}" for name in EDIT_POSITIONS)
+    )
+    missed = []
+    for size in SIZES:
+        query_str = generate_query(size)
+        full_seconds = min(
+            timeit.repeat(lambda: WOSParser(query_str).parse(), number=1, repeat=5)
+        )
+        row = f"{size:>10}{full_seconds * 1e3:>12.2f}"
+        for name, fraction in EDIT_POSITIONS.items():
+            start = re.search(rf"term{int(size * fraction)}(?!\d)", query_str).start()  # type: ignore
+            edits = [((start, start + 4), "words"), ((start, start + 5), "term")]
+            parser = WOSParser(query_str)
+            query = parser.parse()
+
+            def incremental() -> None:
+                nonlocal query
+                for span, replacement in edits:
+                    query = parser.reparse(query, span, replacement)
+
+            if name == "start":
+                # The first edit prepares the positions of the query (once)
+                first_start = time.perf_counter()
+                query = parser.reparse(query, *edits[0])
+                row += f"{(time.perf_counter() - first_start) * 1e3:>12.2f}"
+                query = parser.reparse(query, *edits[1])
+            seconds = min(timeit.repeat(incremental, number=1, repeat=5)) / len(edits)
+            row += f"{seconds * 1e3:>14.3f}"
+            if name != "end" and size >= 1_000 and seconds * 1e3 > TARGET_MS:
+                missed.append(f"{size} terms ({name})")
+        print(row)
+    if missed:
+        print(f"Target ({TARGET_MS} ms per edit) missed: {', '.join(missed)}")
+        return 1
+    print(f"Target ({TARGET_MS} ms per edit at the start and in the middle) met")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Benchmark: linting many search files (cold and warm cache)."""
+from __future__ import annotations
+
+import contextlib
+import io
+import json
+import os
+import tempfile
+import time
+
+from bench_parser_wos import generate_query
+
+from search_query.linter import main
+
+# to run (from top-level dir): python benchmarks/bench_lint_files.py
+
+NR_FILES = 10_000
+
+
+def write_search_files(directory: str) -> None:
+    """Write search files (WOS strategies with 20 terms)"""
+    for nr in range(NR_FILES):
+        sub_directory = os.path.join(directory, f"{nr // 1000:02d}")
+        os.makedirs(sub_directory, exist_ok=True)
+        with open(
+            os.path.join(sub_directory, f"search_{nr}.json"), "w", encoding="utf-8"
+        ) as file:
+            json.dump(
+                {
+                    "record_info": {},
+                    "authors": [{"name": "Wagner, G."}],
+                    "date": {},
+                    "platform": "Web of Science",
+                    "database": ["SCI-EXPANDED"],
+                    "search_string": generate_query(20, seed=nr),
+                },
+                file,
+            )
+
+
+def run(args: list) -> float:
+    """Run the linter (without output) and return the time [s]"""
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        main(args)
+    return time.perf_counter() - start
+
+
+def main_benchmark() -> None:
+    """Print the time of a cold run (all files are linted) and a warm run"""
+    with tempfile.TemporaryDirectory() as directory:
+        search_directory = os.path.join(directory, "searches")
+        write_search_files(search_directory)
+        args = [search_directory, "--cache-file", os.path.join(directory, "cache.json")]
+        cold = run(args)
+        warm = min(run(args) for _ in range(3))
+    print(f"{'files':>10}{'cold [s]':>12}{'warm [s]':>12}")
+    print(f"{NR_FILES:>10}{cold:>12.2f}{warm:>12.2f}")
+
+
+if __name__ == "__main__":
+    main_benchmark()
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Benchmark: watch mode (re-linting a changed file) vs. a new linter process."""
+from __future__ import annotations
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import typing
+
+from bench_lint_files import NR_FILES
+from bench_lint_files import write_search_files
+
+from search_query.linter import LintWatcher
+
+# to run (from top-level dir): python benchmarks/bench_lint_watch.py
+
+
+def timed(function: typing.Callable[[], typing.Any]) -> float:
+    """Time of a call [s]"""
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Print the time of the first poll, a poll without changes, a poll after
+    changing one file, and a new process that lints the changed file"""
+    with tempfile.TemporaryDirectory() as directory:
+        search_directory = os.path.join(directory, "searches")
+        write_search_files(search_directory)
+        watcher = LintWatcher([search_directory])
+        first = timed(watcher.poll)
+        unchanged = min(timed(watcher.poll) for _ in range(3))
+
+        file_path = os.path.join(search_directory, "00", "search_0.json")
+        with open(file_path, encoding="utf-8") as file:
+            data = json.load(file)
+        changed = []
+        for nr in range(3):
+            data["search_string"] = data["search_string"] + f" OR TS=change{nr}"
+            with open(file_path, "w", encoding="utf-8") as file:
+                json.dump(data, file)
+            changed.append(timed(watcher.poll))
+
+        process = timed(
+            lambda: subprocess.run(
+                [sys.executable, "-m", "search_query.linter", file_path, "--no-cache"],
+                check=False,
+                stdout=subprocess.DEVNULL,
+            )
+        )
+    print(
+        f"{'files':>10}{'first poll [s]':>16}{'no change [ms]':>16}"
+        f"{'one change [ms]':>17}{'new process [ms]':>18}"
+    )
+    print(
+        f"{NR_FILES:>10}{first:>16.2f}{unchanged * 1e3:>16.1f}"
+        f"{min(changed) * 1e3:>17.1f}{process * 1e3:>18.1f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+"""Benchmark: linter rules (one pass) vs. parsing."""
+from __future__ import annotations
+
+import timeit
+
+from bench_parser_wos import generate_query
+
+from search_query.linter_rules import RuleEngine
+from search_query.linter_rules import RULES
+from search_query.parser_wos import WOSParser
+
+# to run (from top-level dir): python benchmarks/bench_linter_rules.py
+
+SIZES = [1_000, 10_000]
+
+
+def main() -> None:
+    """Print the time of the rules (one pass vs. one pass per rule)"""
+    print(f"{'terms':>10}{'parse [ms]':>14}{'one pass [ms]':>16}{'per rule [ms]':>16}")
+    for size in SIZES:
+        query_str = generate_query(size)
+        parser = WOSParser(query_str)
+        query = parser.parse()
+        parse_seconds = min(
+            timeit.repeat(lambda: WOSParser(query_str).parse(), number=1, repeat=3)
+        )
+        engine = RuleEngine()
+        one_pass = min(
+            timeit.repeat(
+                lambda: engine.run(query_str, "wos", parser.tokens, query),
+                number=1,
+                repeat=3,
+            )
+        )
+        engines = [RuleEngine([name]) for name in RULES]
+        per_rule = min(
+            timeit.repeat(
+                lambda: [
+                    single.run(query_str, "wos", parser.tokens, query)
+                    for single in engines
+                ],
+                number=1,
+                repeat=3,
+            )
+        )
+        print(
+            f"{size:>10}{parse_seconds * 1e3:>14.2f}"
+            f"{one_pass * 1e3:>16.2f}{per_rule * 1e3:>16.2f}"
+        )
+
+    timed = RuleEngine(timing=True)
+    timed.run(query_str, "wos", parser.tokens, query)
+    print()
+    print(timed.timing_report())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Benchmark: linter server (incremental re-linting) vs. run_linter."""
+from __future__ import annotations
+
+import itertools
+import timeit
+
+from bench_parser_wos import generate_query
+
+from search_query.linter import run_linter
+from search_query.linter_server import Document
+
+# to run (from top-level dir): python benchmarks/bench_linter_server.py
+
+SIZES = [1_000, 10_000]
+EDITS = 20
+
+
+def main() -> None:
+    """Print the time per edit (didChange + diagnostics vs. run_linter)"""
+    print(f"{'terms':>10}{'run_linter [ms]':>18}{'server [ms]':>14}")
+    for size in SIZES:
+        query_str = generate_query(size)
+        document = Document(query_str, "wos")
+        # Replace a term in the middle of the query (changes the length)
+        start = query_str.index(" OR ", len(query_str) // 2) + 4
+        end = query_str.index(" ", start)
+        replacements = itertools.cycle(["x", "yy"])
+
+        def edit() -> None:
+            nonlocal end
+            text = next(replacements)
+            document.change(
+                [
+                    {
+                        "range": {
+                            "start": {"line": 0, "character": start},
+                            "end": {"line": 0, "character": end},
+                        },
+                        "text": text,
+                    }
+                ]
+            )
+            end = start + len(text)
+            document.diagnostics()
+
+        server_seconds = min(timeit.repeat(edit, number=EDITS, repeat=3))
+        linter_seconds = min(
+            timeit.repeat(lambda: run_linter(document.text, "wos"), number=1, repeat=3)
+        )
+        print(
+            f"{size:>10}{linter_seconds * 1e3:>18.2f}"
+            f"{server_seconds / EDITS * 1e3:>14.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Benchmark: parsing time of list-format queries with many numbered lines."""
+from __future__ import annotations
+
+import timeit
+
+from search_query.parser_wos import WOSListParser
+
+# to run (from top-level dir): python benchmarks/bench_list_parser.py
+
+SIZES = [100, 1_000, 10_000]
+
+
+def generate_query_list(nr_lines: int) -> str:
+    """Generate a search history: concept lines, then lines combining them"""
+    nr_concepts = nr_lines // 2
+    lines = [
+        f'{i}. TS=(term{i}a OR term{i}b OR "term {i}c")'
+        for i in range(1, nr_concepts + 1)
+    ]
+    # Combine the concepts pairwise, then the combinations (one line each)
+    previous = "#1"
+    for i in range(2, nr_concepts + 1):
+        lines.append(f"{len(lines) + 1}. {previous} AND #{i}")
+        previous = f"#{len(lines)}"
+    return "\n".join(lines)
+
+
+def main() -> None:
+    """Print parsing time per line for growing search histories"""
+    print(f"{'lines':>10}{'chars':>12}{'total [ms]':>14}{'per line [us]':>16}")
+    for size in SIZES:
+        query_list = generate_query_list(size)
+        nr_lines = query_list.count("\n") + 1
+        seconds = min(
+            timeit.repeat(lambda: WOSListParser(query_list).parse(), number=1, repeat=3)
+        )
+        print(
+            f"{nr_lines:>10}{len(query_list):>12}"
+            f"{seconds * 1e3:>14.1f}{seconds / nr_lines * 1e6:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Benchmark: parsing vs. cache hits (memory and disk tier)."""
+from __future__ import annotations
+
+import tempfile
+import timeit
+
+from bench_parser_wos import generate_query
+
+from search_query.parse_cache import ParseCache
+from search_query.parser import parse
+
+# to run (from top-level dir): python benchmarks/bench_parse_cache.py
+
+SIZES = [100, 1_000, 10_000]
+
+# Minimum speedup of a hit over parsing (strategies with thousands of terms)
+TARGET_SPEEDUP = {"memory": 4.0, "disk": 1.5}
+
+
+def main() -> int:
+    """Print the time per query (parsing, memory hit, disk hit)
+    and check the speedups of the hits against the targets"""
+    print(
+        f"{'terms':>10}{'parse [ms]':>14}{'memory [ms]':>14}{'disk [ms]':>14}"
+        f"{'memory [x]':>14}{'disk [x]':>14}"
+    )
+    missed = []
+    with tempfile.TemporaryDirectory() as directory:
+        for size in SIZES:
+            query_str = generate_query(size)
+            parse_seconds = min(
+                timeit.repeat(lambda: parse(query_str), number=1, repeat=5)
+            )
+            cache = ParseCache(directory=directory)
+            parse(query_str, cache=cache)
+            memory_seconds = min(
+                timeit.repeat(lambda: parse(query_str, cache=cache), number=1, repeat=5)
+            )
+
+            def disk_hit() -> None:
+                parse(query_str, cache=ParseCache(directory=directory))
+
+            disk_seconds = min(timeit.repeat(disk_hit, number=1, repeat=5))
+            speedups = {
+                "memory": parse_seconds / memory_seconds,
+                "disk": parse_seconds / disk_seconds,
+            }
+            print(
+                f"{size:>10}{parse_seconds * 1e3:>14.2f}"
+                f"{memory_seconds * 1e3:>14.2f}{disk_seconds * 1e3:>14.2f}"
+                f"{speedups['memory']:>14.1f}{speedups['disk']:>14.1f}"
+            )
+            for tier, speedup in speedups.items():
+                if size >= 1_000 and speedup < TARGET_SPEEDUP[tier]:
+                    missed.append(f"{size} terms ({tier})")
+    if missed:
+        print(f"Target speedup missed: {', '.join(missed)}")
+        return 1
+    print(
+        f"Target speedup (memory: {TARGET_SPEEDUP['memory']}x, "
+        f"disk: {TARGET_SPEEDUP['disk']}x) met"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
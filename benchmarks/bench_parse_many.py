@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Benchmark: scaling of parse_many() across workers (threads and processes)."""
+from __future__ import annotations
+
+import os
+import time
+
+from bench_parser_wos import generate_query
+
+from search_query.parser import parse_many
+
+# to run (from top-level dir): python benchmarks/bench_parse_many.py
+
+NR_QUERIES = 400
+NR_TERMS = 500
+
+
+def main() -> None:
+    """Print the throughput of parse_many() for growing numbers of workers"""
+    queries = [generate_query(NR_TERMS, seed=seed) for seed in range(NR_QUERIES)]
+    nr_cpus = os.cpu_count() or 1
+    worker_counts = sorted({1, 2, 4, 8, nr_cpus})
+    print(f"{NR_QUERIES} queries with {NR_TERMS} terms, {nr_cpus} CPUs")
+    print(
+        f"{'executor':>10}{'workers':>10}{'total [s]':>12}{'queries/s':>12}{'speedup':>10}"
+    )
+    baseline = None
+    for executor in ["thread", "process"]:
+        for workers in worker_counts:
+            start = time.perf_counter()
+            for _ in parse_many(queries, "wos", workers=workers, executor=executor):
+                pass
+            seconds = time.perf_counter() - start
+            if baseline is None:
+                baseline = seconds
+            print(
+                f"{executor:>10}{workers:>10}{seconds:>12.2f}"
+                f"{NR_QUERIES / seconds:>12.0f}{baseline / seconds:>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+"""Benchmark: throughput of the Pubmed parser on long strategies."""
+from __future__ import annotations
+
+import random
+import timeit
+
+from search_query.parser_pubmed import PubmedParser
+
+# to run (from top-level dir): python benchmarks/bench_parser_pubmed.py
+
+SIZES = [1_000, 10_000, 100_000, 200_000]
+
+
+def generate_query(nr_terms: int, seed: int = 0) -> str:
+    """Generate a Pubmed strategy: AND of parenthesized blocks with 10 OR-ed terms
+
+    Most terms use [tiab], which is expanded to [ti] OR [ab] when parsing."""
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(0, nr_terms, 10):
+        terms = []
+        for j in range(i, i + 10):
+            field = rng.choice(["[tiab]", "[tiab]", "[ti]", "[ab]", "[mh]", "[mesh]"])
+            if rng.random() < 0.2:
+                terms.append(f'"term{j} phrase"{field}')
+            else:
+                terms.append(f"term{j}*{field}")
+        blocks.append("(" + " OR ".join(terms) + ")")
+    return " AND ".join(blocks)
+
+
+def main() -> None:
+    """Print parsing time per term for growing strategies"""
+    print(f"{'terms':>10}{'chars':>12}{'total [ms]':>14}{'per term [us]':>16}")
+    for size in SIZES:
+        query_str = generate_query(size)
+        seconds = min(
+            timeit.repeat(lambda: PubmedParser(query_str).parse(), number=1, repeat=3)
+        )
+        print(
+            f"{size:>10}{len(query_str):>12}"
+            f"{seconds * 1e3:>14.1f}{seconds / size * 1e6:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
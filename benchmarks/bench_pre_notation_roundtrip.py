@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Benchmark: pre-notation round trip (serialize and parse) on a generated corpus."""
+from __future__ import annotations
+
+import time
+
+from bench_batch_translation import build_corpus
+from bench_query_construction import build_left_deep
+
+from search_query.parser_pre_notation import PreNotationParser
+
+# to run (from top-level dir): python benchmarks/bench_pre_notation_roundtrip.py
+
+DEEP_SIZES = [1_000, 10_000, 100_000]
+
+
+def main() -> None:
+    """Serialize queries to pre-notation and parse them again"""
+    workloads = [("corpus", build_corpus())]
+    workloads += [(f"left_deep {size}", [build_left_deep(size)]) for size in DEEP_SIZES]
+    print(f"{'workload':<18}{'nodes':>10}{'parse [ms]':>12}{'per node [us]':>16}")
+    for name, queries in workloads:
+        strings = [query.to_string() for query in queries]
+        nr_nodes = sum(1 for query in queries for _ in query.walk())
+
+        start = time.perf_counter()
+        parsed = [PreNotationParser(string).parse() for string in strings]
+        seconds = time.perf_counter() - start
+
+        assert parsed == queries
+        print(
+            f"{name:<18}{nr_nodes:>10}{seconds * 1e3:>12.1f}"
+            f"{seconds / nr_nodes * 1e6:>16.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
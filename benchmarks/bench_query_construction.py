@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Benchmark: construction time of query trees (bottom-up, as built by parsers)."""
+from __future__ import annotations
+
+import timeit
+
+from search_query.and_query import AndQuery
+from search_query.constants import Fields
+from search_query.or_query import OrQuery
+from search_query.query import Query
+from search_query.query import SearchField
+
+# to run (from top-level dir): python benchmarks/bench_query_construction.py
+
+SIZES = [1_000, 2_000, 4_000, 8_000, 16_000, 32_000]
+
+
+def build_left_deep(nr_terms: int) -> Query:
+    """Build a left-deep chain: ((t0 AND t1) OR t2) AND t3 ..."""
+    search_field = SearchField(Fields.TITLE)
+    query: Query = Query("t0", search_field=search_field)
+    for i in range(1, nr_terms):
+        query_class = AndQuery if i % 2 else OrQuery
+        query = query_class([query, f"t{i}"], search_field=search_field)
+    return query
+
+
+def build_list_query(nr_terms: int) -> Query:
+    """Build a searchRxiv-style list query: AND of blocks with 10 OR-ed terms"""
+    search_field = SearchField(Fields.TITLE)
+    blocks = [
+        OrQuery(
+            [f"term{i}_{j}" for j in range(10)],
+            search_field=search_field,
+        )
+        for i in range(nr_terms // 10)
+    ]
+    return AndQuery(blocks, search_field=search_field)  # type: ignore
+
+
+def main() -> None:
+    """Print construction time per node for growing tree sizes"""
+    print(f"{'tree':<12}{'terms':>10}{'total [ms]':>14}{'per node [us]':>16}")
+    for builder in [build_left_deep, build_list_query]:
+        for size in SIZES:
+            seconds = min(timeit.repeat(lambda: builder(size), number=1, repeat=3))
+            print(
+                f"{builder.__name__[6:]:<12}{size:>10}"
+                f"{seconds * 1e3:>14.2f}{seconds / size * 1e6:>16.3f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
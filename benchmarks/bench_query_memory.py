@@ -0,0 +1,135 @@
+#!/usr/bin/env python3
+"""Benchmark: memory per query node (slotted layout, interned fields and terms)."""
+from __future__ import annotations
+
+import gc
+import random
+import tracemalloc
+import typing
+
+from search_query.and_query import AndQuery
+from search_query.constants import Fields
+from search_query.or_query import OrQuery
+from search_query.query import Query
+
+# to run (from top-level dir): python benchmarks/bench_query_memory.py
+
+NR_STRATEGIES = 2_000
+VOCABULARY_SIZE = 5_000
+FIELDS = [Fields.TITLE, Fields.ABSTRACT, Fields.ALL]
+
+
+class LegacySearchField:
+    """Layout of SearchField before __slots__/interning (for comparison)"""
+
+    def __init__(self, value: str, position: typing.Optional[tuple] = None) -> None:
+        self.value = value
+        self.position = position
+
+
+class LegacyQuery:
+    """Layout of Query before __slots__/interning (for comparison)"""
+
+    def __init__(
+        self,
+        value: str,
+        *,
+        operator: bool = False,
+        search_field: typing.Optional[LegacySearchField] = None,
+        children: typing.Optional[list] = None,
+    ) -> None:
+        self.value = value
+        self.operator = operator
+        self.children = [
+            LegacyQuery(c, search_field=search_field) if isinstance(c, str) else c
+            for c in children or []
+        ]
+        self.marked = False
+        self.search_field = None if operator else search_field
+        self.position = None
+
+
+def generate_corpus(seed: int = 0) -> typing.List[list]:
+    """Generate strategies: AND of 2-5 OR-blocks of 3-15 terms (Zipf-like vocabulary)"""
+    rng = random.Random(seed)
+    vocabulary = [
+        f"term{i}*" if i % 7 == 0 else f"term{i}" for i in range(VOCABULARY_SIZE)
+    ]
+    weights = [1 / (rank + 1) for rank in range(VOCABULARY_SIZE)]
+    corpus = []
+    for _ in range(NR_STRATEGIES):
+        blocks = []
+        for _ in range(rng.randint(2, 5)):
+            terms = rng.choices(vocabulary, weights, k=rng.randint(3, 15))
+            blocks.append((rng.choice(FIELDS), terms))
+        corpus.append(blocks)
+    return corpus
+
+
+def _fresh(term: str) -> str:
+    # Parsed terms are new string objects (slices of the query string)
+    return "".join(list(term))
+
+
+def build_current(corpus: typing.List[list]) -> list:
+    """Build the corpus with the current Query classes"""
+    queries = []
+    for blocks in corpus:
+        children: typing.List[Query] = []
+        for field, terms in blocks:
+            children.append(OrQuery([_fresh(t) for t in terms], search_field=field))
+        queries.append(AndQuery(children, search_field=Fields.ALL))  # type: ignore
+    return queries
+
+
+def build_legacy(corpus: typing.List[list]) -> list:
+    """Build the corpus with the legacy layout"""
+    queries = []
+    for blocks in corpus:
+        children = [
+            LegacyQuery(
+                "OR",
+                operator=True,
+                children=[_fresh(t) for t in terms],
+                search_field=LegacySearchField(field),
+            )
+            for field, terms in blocks
+        ]
+        queries.append(
+            LegacyQuery(
+                "AND",
+                operator=True,
+                children=children,
+                search_field=LegacySearchField(Fields.ALL),
+            )
+        )
+    return queries
+
+
+def measure(builder: typing.Callable, corpus: typing.List[list]) -> int:
+    """Return the number of bytes allocated (and kept) by the builder"""
+    gc.collect()
+    tracemalloc.start()
+    queries = builder(corpus)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del queries
+    return size
+
+
+def main() -> None:
+    """Print bytes per node for the legacy and the current layout"""
+    corpus = generate_corpus()
+    nr_nodes = sum(
+        1 + len(blocks) + sum(len(t) for _, t in blocks) for blocks in corpus
+    )
+    print(f"strategies: {NR_STRATEGIES}, nodes: {nr_nodes}")
+    legacy = measure(build_legacy, corpus)
+    current = measure(build_current, corpus)
+    print(f"legacy layout:  {legacy / nr_nodes:8.1f} bytes/node")
+    print(f"current layout: {current / nr_nodes:8.1f} bytes/node")
+    print(f"reduction:      {1 - current / legacy:8.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Benchmark: opening a corpus of query trees stored in the binary format."""
+from __future__ import annotations
+
+import os
+import random
+import tempfile
+import time
+
+from bench_batch_translation import build_corpus
+
+from search_query.query_store import dump_queries
+from search_query.query_store import QueryStore
+
+# to run (from top-level dir): python benchmarks/bench_query_store.py
+
+NR_STRATEGIES = 100_000
+
+
+def main() -> None:
+    """Write a corpus, open it and access queries"""
+    corpus = build_corpus()
+    queries = [corpus[i % len(corpus)] for i in range(NR_STRATEGIES)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "corpus.bin")
+        start = time.perf_counter()
+        with open(path, "wb") as file:
+            dump_queries(queries, file)
+        print(f"write:            {(time.perf_counter() - start) * 1e3:10.1f} ms")
+        print(f"file size:        {os.path.getsize(path) / 2**20:10.1f} MiB")
+
+        start = time.perf_counter()
+        store = QueryStore.open(path)
+        print(f"open:             {(time.perf_counter() - start) * 1e3:10.3f} ms")
+
+        rng = random.Random(0)
+        indices = [rng.randrange(len(store)) for _ in range(1_000)]
+        start = time.perf_counter()
+        for index in indices:
+            store[index]  # pylint: disable=pointless-statement
+        print(
+            f"random access:    {(time.perf_counter() - start) / len(indices) * 1e6:10.1f} us/query"
+        )
+
+        start = time.perf_counter()
+        for _ in store:
+            pass
+        print(f"load all:         {(time.perf_counter() - start) * 1e3:10.1f} ms")
+        store.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Benchmark: reading search files (one JSON file each) vs. JSON Lines corpora."""
+from __future__ import annotations
+
+import os
+import tempfile
+import time
+import tracemalloc
+
+from bench_lint_files import write_search_files
+
+from search_query.search_file import iter_search_files
+from search_query.search_file import write_json_lines
+
+# to run (from top-level dir): python benchmarks/bench_search_file_corpus.py
+
+
+def read(path: str) -> float:
+    """Read all SearchFiles and return the time [s]"""
+    start = time.perf_counter()
+    for _ in iter_search_files(path):
+        pass
+    return time.perf_counter() - start
+
+
+def peak_memory(path: str) -> float:
+    """Peak memory while reading the SearchFiles [MB]"""
+    tracemalloc.start()
+    for _ in iter_search_files(path):
+        pass
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak / 1e6
+
+
+def main() -> None:
+    """Print the time and the peak memory of reading each layout"""
+    with tempfile.TemporaryDirectory() as directory:
+        search_directory = os.path.join(directory, "searches")
+        write_search_files(search_directory)
+        nr_files = sum(1 for _ in iter_search_files(search_directory))
+        paths = {"files": search_directory}
+        for name in ["corpus.jsonl", "corpus.jsonl.gz"]:
+            paths[name] = os.path.join(directory, name)
+            write_json_lines(iter_search_files(search_directory), paths[name])
+
+        print(f"{nr_files} search files")
+        print(f"{'layout':<18}{'read [s]':>10}{'peak [MB]':>11}")
+        for name, path in paths.items():
+            seconds = min(read(path) for _ in range(3))
+            print(f"{name:<18}{seconds:>10.2f}{peak_memory(path):>11.2f}")
+
+
+if __name__ == "__main__":
+    main()
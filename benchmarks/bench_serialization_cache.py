@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+"""Benchmark: serializing a query and all of its subqueries (as the analyzer does)."""
+from __future__ import annotations
+
+import timeit
+
+from bench_query_construction import build_left_deep
+from bench_query_construction import build_list_query
+
+from search_query.query import Query
+from search_query.serializer_pubmed import to_string_pubmed
+
+# to run (from top-level dir): python benchmarks/bench_serialization_cache.py
+
+SIZES = [500, 1_000, 2_000]
+
+
+def serialize_subqueries_uncached(query: Query) -> None:
+    """Serialize the query and every subquery from scratch"""
+    for node in query.walk():
+        if node.operator:
+            to_string_pubmed(node)
+
+
+def serialize_subqueries_cached(query: Query) -> None:
+    """Serialize the query and every subquery with Query.to_string()"""
+    for node in query.walk():
+        if node.operator:
+            node.to_string(syntax="pubmed")
+
+
+def main() -> None:
+    """Compare uncached and cached serialization of all subqueries"""
+    print(f"{'tree':<12}{'terms':>8}{'uncached [ms]':>16}{'cached [ms]':>14}")
+    for builder in [build_list_query, build_left_deep]:
+        for size in SIZES:
+            # Fresh trees for each run (the cache is kept on the nodes)
+            uncached = min(
+                timeit.repeat(
+                    "serialize_subqueries_uncached(query)",
+                    setup="query = builder(size)",
+                    number=1,
+                    repeat=3,
+                    globals={**globals(), "builder": builder, "size": size},
+                )
+            )
+            cached = min(
+                timeit.repeat(
+                    "serialize_subqueries_cached(query)",
+                    setup="query = builder(size)",
+                    number=1,
+                    repeat=3,
+                    globals={**globals(), "builder": builder, "size": size},
+                )
+            )
+            print(
+                f"{builder.__name__[6:]:<12}{size:>8}"
+                f"{uncached * 1e3:>16.2f}{cached * 1e3:>14.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
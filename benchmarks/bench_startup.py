@@ -0,0 +1,52 @@
+#!/usr/bin/env python3
+"""Benchmark: import time of the package (python -X importtime)."""
+from __future__ import annotations
+
+import subprocess
+import sys
+
+# to run (from top-level dir): python benchmarks/bench_startup.py
+
+MODULES = ["search_query", "search_query.parser", "search_query.linter"]
+REPEAT = 5
+
+
+def import_time(module: str) -> float:
+    """Cumulative import time of a module in a new interpreter [ms]"""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    for line in result.stderr.splitlines():
+        # import time: self [us] | cumulative [us] | module
+        _, cumulative, name = line.split("|")
+        if name.strip() == module:
+            return int(cumulative) / 1e3
+    raise ValueError(f"Module not imported: {module}")
+
+
+def main() -> None:
+    """Print the import time (minimum of several interpreters)"""
+    print(f"{'module':<24}{'import [ms]':>14}{'parser/serializer modules':>28}")
+    for module in MODULES:
+        milliseconds = min(import_time(module) for _ in range(REPEAT))
+        loaded = subprocess.run(
+            [
+                sys.executable,
+                "-c",
+                f"import sys, {module}; "
+                "print(sum(name.startswith('search_query.parser_') "
+                "or name.startswith('search_query.serializer_') "
+                "for name in sys.modules))",
+            ],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+        print(f"{module:<24}{milliseconds:>14.1f}{loaded:>28}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Benchmark: typed single-pass tokenizer vs. classifying token strings."""
+from __future__ import annotations
+
+import random
+import re
+import timeit
+
+from search_query.constants import TokenTypes
+from search_query.parser_base import QueryStringParser
+
+# to run (from top-level dir): python benchmarks/bench_tokenizer.py
+
+SIZES = [1_000, 10_000, 100_000]
+
+SEARCH_FIELD_REGEX = r"\b(?:TI|AB)="
+OPERATOR_REGEX = r"\b(?:AND|OR|NOT)\b"
+TERM_REGEX = r'"[^"]*"|[\w*]+'
+
+
+class BenchParser(QueryStringParser):
+    """Parser with token patterns (typed tokens)"""
+
+    TOKEN_PATTERNS = {
+        TokenTypes.SEARCH_FIELD: SEARCH_FIELD_REGEX,
+        TokenTypes.LOGIC_OPERATOR: OPERATOR_REGEX,
+        TokenTypes.PARENTHESIS_OPEN: r"\(",
+        TokenTypes.PARENTHESIS_CLOSED: r"\)",
+        TokenTypes.SEARCH_TERM: TERM_REGEX,
+    }
+
+
+def generate_query(nr_terms: int, seed: int = 0) -> str:
+    """Generate a WOS-like query: blocks of OR-ed terms (some multi-word)"""
+    rng = random.Random(seed)
+    blocks = []
+    for i in range(0, nr_terms, 10):
+        terms = [
+            f"term{j} word{j}" if rng.random() < 0.3 else f"term{j}*"
+            for j in range(i, i + 10)
+        ]
+        blocks.append(f"{rng.choice(['TI', 'AB'])}=(" + " OR ".join(terms) + ")")
+    return " AND ".join(blocks)
+
+
+def legacy_tokenize(query_str: str) -> list:
+    """Previous approach: untyped tokens, classified again by each stage"""
+    pattern = "|".join([SEARCH_FIELD_REGEX, OPERATOR_REGEX, r"\(", r"\)", TERM_REGEX])
+    tokens = [(m.group(), m.span()) for m in re.finditer(pattern, query_str)]
+
+    def is_operator(token: str) -> bool:
+        return bool(re.match(r"^(AND|OR|NOT)$", token, re.IGNORECASE))
+
+    def is_term(token: str) -> bool:
+        return (
+            not is_operator(token)
+            and token not in ["(", ")"]
+            and not bool(re.match(SEARCH_FIELD_REGEX, token))
+        )
+
+    combined = []
+    i = 0
+    while i < len(tokens):
+        if i + 1 < len(tokens) and is_term(tokens[i][0]) and is_term(tokens[i + 1][0]):
+            combined.append(
+                (
+                    tokens[i][0] + " " + tokens[i + 1][0],
+                    (tokens[i][1][0], tokens[i + 1][1][1]),
+                )
+            )
+            i += 2
+        else:
+            combined.append(tokens[i])
+            i += 1
+    return combined
+
+
+def typed_tokenize(query_str: str) -> list:
+    """Current approach: typed tokens from one precompiled regex"""
+    parser = BenchParser(query_str)
+    parser.tokenize()
+    parser.combine_subsequent_terms()
+    return parser.tokens
+
+
+def main() -> None:
+    """Compare legacy and typed tokenization"""
+    print(f"{'terms':>10}{'legacy [ms]':>14}{'typed [ms]':>14}")
+    for size in SIZES:
+        query_str = generate_query(size)
+        legacy = min(
+            timeit.repeat(lambda: legacy_tokenize(query_str), number=1, repeat=3)
+        )
+        typed = min(
+            timeit.repeat(lambda: typed_tokenize(query_str), number=1, repeat=3)
+        )
+        print(f"{size:>10}{legacy * 1e3:>14.1f}{typed * 1e3:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""Benchmark: iterative traversal vs. the previous recursive walkers."""
+from __future__ import annotations
+
+import sys
+import timeit
+import typing
+
+from bench_query_construction import build_left_deep
+from bench_query_construction import build_list_query
+
+from search_query.query import Query
+from search_query.serializer_wos import _get_search_field_wos
+
+# to run (from top-level dir): python benchmarks/bench_traversal.py
+
+DEEP_SIZES = [500, 5_000, 100_000]
+
+
+def recursive_nr_leaves(node: Query) -> int:
+    """Previous (recursive) implementation of Query.get_nr_leaves()"""
+    return sum(recursive_nr_leaves(n) if n.operator else 1 for n in node.children)
+
+
+def recursive_pre_notation(node: Query) -> str:
+    """Previous (recursive) implementation of to_string_pre_notation()"""
+    result = ""
+    node_content = node.value
+    if node.search_field:
+        node_content += f"[{node.search_field}]"
+    result = f"{result}{node_content}"
+    if not node.children:
+        return result
+    result = f"{result}["
+    for child in node.children:
+        result = f"{result}{recursive_pre_notation(child)}"
+        if child is not node.children[-1]:
+            result = f"{result}, "
+    return f"{result}]"
+
+
+def recursive_wos(node: Query) -> str:
+    """Previous (recursive) implementation of to_string_wos()"""
+    result = ""
+    for child in node.children:
+        first = child is node.children[0]
+        last = child is node.children[-1]
+        if not child.operator:
+            if first and not last:
+                field = _get_search_field_wos(str(child.search_field))
+                result = f"{result}{field}=({child.value}"
+            else:
+                result = f"{result} {node.value} {child.value}"
+            if last:
+                result = f"{result})"
+        else:
+            if child.value == "NOT":
+                result = f"{result}{recursive_wos(child)}"
+            elif first and not last:
+                result = f"{result}({recursive_wos(child)}"
+            else:
+                result = f"{result} {node.value} {recursive_wos(child)}"
+            if last and child.value != "NOT":
+                result = f"{result})"
+    return result
+
+
+def _time(function: typing.Callable) -> str:
+    try:
+        seconds = min(timeit.repeat(function, number=1, repeat=3))
+    except RecursionError:
+        return "RecursionError"
+    return f"{seconds * 1e3:.2f} ms"
+
+
+def main() -> None:
+    """Compare recursive and iterative walkers on list-style and deep trees"""
+    # Give the recursive walkers a chance on moderately deep trees
+    sys.setrecursionlimit(20_000)
+
+    trees = [("list_query", 50_000, build_list_query(50_000))]
+    trees += [("left_deep", size, build_left_deep(size)) for size in DEEP_SIZES]
+
+    cases: typing.List[typing.Tuple[str, typing.Callable, typing.Callable]] = [
+        ("nr_leaves", recursive_nr_leaves, Query.get_nr_leaves),
+        ("pre_notation", recursive_pre_notation, lambda q: q.to_string()),
+        ("wos", recursive_wos, lambda q: q.to_string("wos")),
+    ]
+    print(f"{'tree':<12}{'terms':>9}  {'walker':<14}{'recursive':>16}{'iterative':>16}")
+    for name, size, query in trees:
+        for case, recursive, iterative in cases:
+            print(
+                f"{name:<12}{size:>9}  {case:<14}"
+                f"{_time(lambda: recursive(query)):>16}"  # pylint: disable=cell-var-from-loop
+                f"{_time(lambda: iterative(query)):>16}"  # pylint: disable=cell-var-from-loop
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,10 +4,13 @@ from __future__ import annotations
 
 import typing
 
+from search_query.constants import Operators
 from search_query.constants import PLATFORM
 from search_query.constants import PLATFORM_FIELD_TRANSLATION_MAP
+from search_query.constants import TokenTypes
 from search_query.parser_base import QueryListParser
 from search_query.parser_base import QueryStringParser
+from search_query.parser_base import Token
 from search_query.query import Query
 from search_query.query import SearchField
 
@@ -17,54 +20,55 @@ class XYParser(QueryStringParser):
 
     FIELD_TRANSLATION_MAP = PLATFORM_FIELD_TRANSLATION_MAP[PLATFORM.XY]
 
-    SEARCH_FIELD_REGEX = r"..."
-    OPERATOR_REGEX = r"..."
-    # ...
-
-    pattern = "|".join(
-        [
-            SEARCH_FIELD_REGEX,
-            OPERATOR_REGEX,
-            # ...
-        ]
-    )
-
-    def tokenize(self) -> None:
-        """Tokenize the query_str."""
-
-        # Parse tokens and positions based on regex pattern
-
-        self.tokens = [("token_1", (0, 4))]
-
-    # Implement and override methods of parent class (as needed)
-
-    def parse_query_tree(
-        self,
-        tokens: list,
-        search_field: typing.Optional[SearchField] = None,
-    ) -> Query:
-        """Parse a query from a list of tokens."""
-
-        # Parse a query tree from tokens recursively
-
-        # Add messages to self.linter_messages
-
-    def translate_search_fields(self, query: Query) -> None:
-        """Translate search fields."""
+    # Regular expressions of the tokens (in order of precedence).
+    # The tokenize() method of the parent class matches all patterns
+    # in a single pass and assigns the type of each token.
+    TOKEN_PATTERNS = {
+        TokenTypes.SEARCH_FIELD: r"...",
+        TokenTypes.LOGIC_OPERATOR: r"...",
+        TokenTypes.PARENTHESIS_OPEN: r"\(",
+        TokenTypes.PARENTHESIS_CLOSED: r"\)",
+        TokenTypes.SEARCH_TERM: r"...",
+        # ...
+    }
+
+    # Tokens: Token(value, type, position), e.g., Token("AB=", TokenTypes.SEARCH_FIELD, (0, 3))
+    # Subsequent terms (without operator) are combined
+    # (tokenize() is not overridden: reparse() tokenizes edits incrementally)
+    COMBINE_SUBSEQUENT_TERMS = True
+
+    # Binding power of the operators (default: left to right)
+    PRECEDENCE = {
+        Operators.NEAR: 4,
+        Operators.NOT: 3,
+        Operators.AND: 2,
+        Operators.OR: 1,
+    }
+    # Search fields precede (TI=term) or follow (term[ti]) their term
+    PREFIX_SEARCH_FIELDS = True
+
+    # The parse() method of the parent class tokenizes the query_str and
+    # builds the query tree in one pass (parse_query_tree()).
+    # Implement and override the following methods (as needed)
+
+    def parse_operator(self, token: Token) -> typing.Tuple[str, typing.Optional[int]]:
+        """Operator and near param of an operator token"""
+
+        # e.g., "NEAR/5" -> (Operators.NEAR, 5)
+
+    def translate_search_field(self, token: Token) -> SearchField:
+        """Translate a search field tag to the standard search field."""
 
         # Translate search fields to standard names using self.FIELD_TRANSLATION_MAP
 
-        # Add messages to self.linter_messages if needed
-
-    def parse(self) -> Query:
-        """Parse a query string."""
-        self.tokenize()
-        query = self.parse_query_tree(self.tokens)
-        self.translate_search_fields(query)
+        # Add messages to self.linter_messages if needed (self.add_linter_message())
 
-        # If self.mode == "strict", raise exception if self.linter_messages is not empty
+    def create_term(
+        self, token: Token, search_field: typing.Optional[SearchField]
+    ) -> Query:
+        """Create the node of a search term."""
 
-        return query
+        # e.g., expand combined search fields (term[tiab] -> (term[ti] OR term[ab]))
 
 
 class XYListParser(QueryListParser):
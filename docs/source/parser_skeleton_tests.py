@@ -5,7 +5,9 @@ from pathlib import Path
 
 import pytest
 
+from search_query.constants import TokenTypes
 from search_query.parser_base import QueryStringParser
+from search_query.parser_base import Token
 from search_query.parser_xy import XYParser
 from search_query.query import Query
 
@@ -19,7 +21,12 @@ from search_query.query import Query
     [
         (
             "AB=(Health)",
-            [("AB=", (0, 3)), ("(", (3, 4)), ("Health", (4, 10)), (")", (10, 11))],
+            [
+                Token("AB=", TokenTypes.SEARCH_FIELD, (0, 3)),
+                Token("(", TokenTypes.PARENTHESIS_OPEN, (3, 4)),
+                Token("Health", TokenTypes.SEARCH_TERM, (4, 10)),
+                Token(")", TokenTypes.PARENTHESIS_CLOSED, (10, 11)),
+            ],
         ),
     ],
 )
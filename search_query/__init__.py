@@ -3,12 +3,26 @@
 __author__ = """Gerit Wagner"""
 __email__ = "gerit.wagner@hec.ca"
 
+import typing
+
 from search_query.or_query import OrQuery
 from search_query.and_query import AndQuery
-from .__version__ import __version__
 
 __all__ = ["__version__", "OrQuery", "AndQuery"]
 
+
+def __getattr__(name: str) -> typing.Any:
+    # The version is read on first use (see _version.py)
+    if name == "__version__":
+        # pylint: disable=import-outside-toplevel
+        from search_query._version import get_version
+
+        version = get_version()
+        globals()["__version__"] = version
+        return version
+    raise AttributeError(name)
+
+
 # Instead of adding elements to __all__,
 # prefixing methods/variables with "__" is preferred.
 # Imports like "from x import *" are discouraged.
@@ -0,0 +1,15 @@
+"""Version of the package (read from the package metadata on first use)."""
+import functools
+
+
+@functools.lru_cache(maxsize=None)
+def get_version() -> str:
+    """Version of search_query (importlib.metadata is slow to import)"""
+    # pylint: disable=import-outside-toplevel
+    try:
+        from importlib.metadata import version
+    except ImportError:  # pragma: no cover
+        # For Python < 3.8
+        from importlib_metadata import version  # type: ignore
+
+    return version("search_query")
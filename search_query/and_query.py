@@ -12,6 +12,8 @@ from search_query.query import SearchField
 class AndQuery(Query):
     """AND Query"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         children: typing.List[typing.Union[str, Query]],
@@ -31,6 +33,6 @@ class AndQuery(Query):
             children=children,
             search_field=search_field
             if isinstance(search_field, SearchField)
-            else SearchField(search_field),
+            else SearchField.intern(search_field),
             position=position,
         )
@@ -17,6 +17,18 @@ class PLATFORM(Enum):
     PRE_NOTATION = "pre_notation"
 
 
+class TokenTypes(Enum):
+    """Token types (assigned once by the tokenizer)"""
+
+    LOGIC_OPERATOR = "LOGIC_OPERATOR"
+    PROXIMITY_OPERATOR = "PROXIMITY_OPERATOR"
+    SEARCH_FIELD = "SEARCH_FIELD"
+    SEARCH_TERM = "SEARCH_TERM"
+    PARENTHESIS_OPEN = "PARENTHESIS_OPEN"
+    PARENTHESIS_CLOSED = "PARENTHESIS_CLOSED"
+    UNKNOWN = "UNKNOWN"
+
+
 class Operators:
     """Operators"""
 
@@ -33,6 +45,9 @@ class Fields:
     ALL = "all"
     ABSTRACT = "ab"
     AUTHOR_KEYWORDS = "au"
+    TOPIC = "ts"
+    MESH_TERM = "mh"
+    SUBJECT_TERMS = "su"
 
     @classmethod
     def all(cls) -> list:
@@ -58,16 +73,23 @@ PLATFORM_FIELD_MAP = {
         Fields.ALL: "ALL=",
         Fields.ABSTRACT: "AB=",
         Fields.TITLE: "TI=",
+        Fields.TOPIC: "TS=",
+        Fields.AUTHOR_KEYWORDS: "AK=",
     },
     # fields from https://pubmed.ncbi.nlm.nih.gov/help/
     PLATFORM.PUBMED: {
         Fields.ALL: "[all]",
         Fields.TITLE: "[ti]",
         Fields.ABSTRACT: "[ab]",
+        Fields.MESH_TERM: "[mh]",
     },
     # fields from https://connect.ebsco.com/s/article/Searching-with-Field-Codes?language=en_US
     PLATFORM.EBSCO: {
+        Fields.ALL: "TX ",
         Fields.TITLE: "TI ",
+        Fields.ABSTRACT: "AB ",
+        Fields.SUBJECT_TERMS: "SU ",
+        Fields.MESH_TERM: "MH ",
     },
 }
 
@@ -82,6 +104,7 @@ PLATFORM_COMBINED_FIELDS_MAP = {
     },
 }
 
+
 class ExitCodes:
     """Exit codes"""
 
@@ -2,57 +2,497 @@
 """Query linter hook."""
 from __future__ import annotations
 
+import argparse
+import collections
+import functools
+import hashlib
+import json
+import os
 import sys
+import time
+import typing
 
+import search_query
+import search_query.exception
 import search_query.parser
 from search_query.constants import Colors
 from search_query.constants import ExitCodes
+from search_query.linter_rules import format_timing_report
+from search_query.linter_rules import RuleEngine
 from search_query.search_file import SearchFile
+from search_query.utils import create_executor
 from search_query.utils import format_query_string_pos
+from search_query.utils import write_atomic
 
+if typing.TYPE_CHECKING:  # pragma: no
+    from search_query.parser_base import QueryStringParser
+    from search_query.query import Query
 
-def run_linter(search_string: str, syntax: str) -> list:
-    """Run the linter on the search string"""
 
-    parser = search_query.parser.PARSERS[syntax](search_string)
+def default_cache_file() -> str:
+    """Cache file of the working directory in the user cache directory
+
+    ($XDG_CACHE_HOME, %LOCALAPPDATA% on Windows, or ~/.cache)"""
+    cache_home = os.environ.get("XDG_CACHE_HOME", "")
+    if not os.path.isabs(cache_home):
+        # (relative paths are ignored, see the XDG base directory specification)
+        cache_home = os.environ.get("LOCALAPPDATA", "") if os.name == "nt" else ""
+        if not cache_home:
+            cache_home = os.path.join(os.path.expanduser("~"), ".cache")
+    project = hashlib.sha256(os.path.abspath(os.getcwd()).encode("utf-8"))
+    return os.path.join(
+        cache_home, "search-query", f"lint-{project.hexdigest()[:16]}.json"
+    )
+
+
+def run_linter(
+    search_string: str,
+    syntax: str,
+    rule_engine: typing.Optional[RuleEngine] = None,
+) -> list:
+    """Run the linter on the search string
+
+    rule_engine: rules that are checked after parsing (default: all rules)"""
+
+    if syntax in search_query.parser.LIST_PARSERS and "1." in search_string[:10]:
+        return run_list_linter(search_string, syntax, rule_engine)
+
+    # All errors are reported (the parser recovers from errors)
+    parser = search_query.parser.PARSERS[syntax](search_string, mode="lenient")
+    query = None
     try:
-        parser.parse()
+        query = parser.parse()
     except Exception:  # pylint: disable=broad-except
         assert parser.linter_messages
-    return parser.linter_messages
+    return run_rules(parser, syntax, query, rule_engine)
 
 
-def pre_commit_hook() -> int:
-    """Entrypoint for the query linter hook"""
+def run_rules(
+    parser: QueryStringParser,
+    syntax: str,
+    query: typing.Optional[Query],
+    rule_engine: typing.Optional[RuleEngine],
+) -> list:
+    """Messages of the parser and of the rules (sorted by position)"""
+    if rule_engine is None:
+        rule_engine = RuleEngine()
+    messages = parser.linter_messages + rule_engine.run(
+        parser.query_str, syntax, parser.tokens, query
+    )
+    messages.sort(key=lambda message: message["pos"][0])
+    return messages
 
-    file_path = sys.argv[1]
+
+def run_list_linter(
+    query_list: str,
+    syntax: str,
+    rule_engine: typing.Optional[RuleEngine] = None,
+) -> list:
+    """Run the linter on the search string of a query list
+    (with positions in the query list)"""
+
+    # Errors of the lines (positions in the line that contains the error)
+    list_parser = search_query.parser.LIST_PARSERS[syntax](query_list, mode="lenient")
+    try:
+        list_parser.parse()
+    except search_query.exception.QuerySyntaxError:
+        pass
+    except ValueError as exc:
+        return [{"level": "error", "msg": str(exc), "pos": (0, len(query_list))}]
+    messages = list(list_parser.linter_messages)
+
+    # Rules are checked on the expanded query (positions are mapped back)
+    try:
+        search_string, source_map = list_parser.expand()
+    except search_query.exception.QuerySyntaxError:
+        return messages
+    parser = search_query.parser.PARSERS[syntax](search_string, mode="lenient")
+    query = None
+    try:
+        query = parser.parse()
+    except search_query.exception.QuerySyntaxError:
+        pass
+    if rule_engine is None:
+        rule_engine = RuleEngine()
+    messages += source_map.remap_linter_messages(
+        rule_engine.run(search_string, syntax, parser.tokens, query)
+    )
+    messages.sort(key=lambda message: message["pos"][0])
+    return messages
+
+
+def lint_file(
+    file_path: str,
+    rules: typing.Optional[typing.Tuple[str, ...]] = None,
+    timing: bool = False,
+) -> dict:
+    """Lint a search file.
+
+    Returns the platform, the search string and the linter messages
+    (or the error if the file cannot be loaded).
+    timing: adds the calls and the time of the rules ("timings")"""
 
     try:
         search_file = SearchFile(file_path)
         platform = search_query.parser.get_platform(search_file.platform)
     except Exception as e:  # pylint: disable=broad-except
-        print(e)
-        return ExitCodes.FAIL
+        return {"error": str(e)}
+    rule_engine = RuleEngine(rules, timing=timing)
+    result = {
+        "platform": platform,
+        "search_string": search_file.search_string,
+        "messages": run_linter(search_file.search_string, platform, rule_engine),
+    }
+    if timing:
+        result["timings"] = {
+            name: (rule_engine.calls[name], seconds)
+            for name, seconds in rule_engine.timings.items()
+        }
+    return result
+
+
+def print_result(file_path: str, result: dict) -> None:
+    """Print the linter messages of a file"""
+    if "error" in result:
+        print(f"{file_path}: {result['error']}")
+        return
+    for message in result["messages"]:
+        color = Colors.ORANGE
+        if message["level"] == "error":
+            color = Colors.RED
+
+        print(f"{file_path} ({result['platform']})")
+        print(f"- {message['msg']}")
+        query_info = format_query_string_pos(
+            result["search_string"], message["pos"], color=color
+        )
+        print(f"  {query_info}")
+
+
+class LintCache:
+    """Results of the linter, keyed by the hash of the file content
+
+    Results are stored in a JSON file and are discarded when the
+    version of the library changes. Results of files that were not
+    linted (or looked up) in the run are dropped when the cache is saved."""
+
+    def __init__(self, path: typing.Optional[str]) -> None:
+        self.path = path
+        self.results: typing.Dict[str, dict] = {}
+        self.changed = False
+        # Keys of the files in the run
+        self._file_keys: typing.Dict[str, str] = {}
+        if path is None or not os.path.exists(path):
+            return
+        try:
+            with open(path, encoding="utf-8") as file:
+                data = json.load(file)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == search_query.__version__:
+            self.results = data.get("results", {})
+
+    @staticmethod
+    def key(content: bytes, rules: typing.Optional[typing.Tuple[str, ...]]) -> str:
+        """hash of the file content (and the selected rules)"""
+        digest = hashlib.sha256(content)
+        digest.update(b"\0" + ",".join(sorted(rules or ("*",))).encode("utf-8"))
+        return digest.hexdigest()
+
+    def get(self, file_path: str, key: str) -> typing.Optional[dict]:
+        """returns the cached result of the file (or None)"""
+        self._file_keys[file_path] = key
+        result = self.results.get(key)
+        if result is None or "messages" not in result:
+            return result
+        # (JSON stores positions as lists)
+        return {
+            **result,
+            "messages": [
+                {**message, "pos": tuple(message["pos"])}
+                for message in result["messages"]
+            ],
+        }
+
+    def put(self, file_path: str, key: str, result: dict) -> None:
+        """adds the result of the file"""
+        self._file_keys[file_path] = key
+        self.results[key] = {
+            name: value for name, value in result.items() if name != "timings"
+        }
+        self.changed = True
+
+    def discard(self, file_path: str) -> None:
+        """drops the result of a removed file (when the cache is saved)"""
+        self._file_keys.pop(file_path, None)
+
+    def save(self) -> None:
+        """writes the results of the files in the run (if results changed)"""
+        keys = set(self._file_keys.values())
+        results = {key: result for key, result in self.results.items() if key in keys}
+        if len(results) < len(self.results):
+            self.results = results
+            self.changed = True
+        if self.path is None or not self.changed:
+            return
+        write_atomic(
+            self.path,
+            json.dumps({"version": search_query.__version__, "results": self.results}),
+        )
+        self.changed = False
 
-    linter_messages = run_linter(search_file.search_string, search_file.search_string)
 
-    if linter_messages:
-        for message in linter_messages:
-            color = Colors.ORANGE
-            if message["level"] == "error":
-                color = Colors.RED
+def iter_file_paths(paths: typing.Iterable[str]) -> typing.Iterator[str]:
+    """Search files (*.json) in the paths (files or directories)
 
-            print(f"{file_path} ({platform})")
-            print(f"- {message['msg']}")
-            query_info = format_query_string_pos(
-                search_file.search_string, message["pos"], color=color
+    Hidden files and directories are skipped."""
+    for path in paths:
+        if not os.path.isdir(path):
+            yield path
+            continue
+        for directory, dir_names, file_names in os.walk(path):
+            dir_names[:] = sorted(
+                dir_name for dir_name in dir_names if not dir_name.startswith(".")
             )
-            print(f"  {query_info}")
+            for file_name in sorted(file_names):
+                if file_name.endswith(".json") and not file_name.startswith("."):
+                    yield os.path.join(directory, file_name)
 
-        return ExitCodes.FAIL
 
-    return ExitCodes.SUCCESS
+def lint_files(
+    file_paths: typing.List[str],
+    *,
+    cache: typing.Optional[LintCache] = None,
+    workers: typing.Optional[int] = None,
+    rules: typing.Optional[typing.Tuple[str, ...]] = None,
+    timing: bool = False,
+) -> typing.Iterator[typing.Tuple[str, dict]]:
+    """Lint search files in a process pool.
+
+    Yields (file path, result) in the order of the files.
+    Files with a cached result (same content and rules) are not linted again."""
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    results: typing.List[typing.Optional[dict]] = []
+    keys: typing.List[typing.Optional[str]] = []
+    for file_path in file_paths:
+        try:
+            with open(file_path, "rb") as file:
+                key = LintCache.key(file.read(), rules)
+        except OSError as exc:
+            results.append({"error": str(exc)})
+            keys.append(None)
+            continue
+        keys.append(key)
+        results.append(cache.get(file_path, key) if cache is not None else None)
+
+    missing = [nr for nr, result in enumerate(results) if result is None]
+    lint = functools.partial(lint_file, rules=rules, timing=timing)
+    if workers <= 1 or len(missing) <= 1:
+        new_results: typing.Iterable[dict] = (lint(file_paths[nr]) for nr in missing)
+    else:
+        chunksize = max(1, len(missing) // (workers * 4))
+        with create_executor(workers) as pool:
+            new_results = list(
+                pool.map(lint, [file_paths[nr] for nr in missing], chunksize=chunksize)
+            )
+    for nr, result in zip(missing, new_results):
+        results[nr] = result
+        if cache is not None:
+            cache.put(file_paths[nr], keys[nr], result)  # type: ignore
+
+    for file_path, result in zip(file_paths, results):
+        yield file_path, result  # type: ignore
+
+
+class LintWatcher:
+    """Lints the search files in the paths again when they change.
+
+    Files are polled (size and modification time). Results are kept in
+    memory (and in the cache), so only new and changed files are linted."""
+
+    def __init__(
+        self,
+        paths: typing.List[str],
+        *,
+        cache: typing.Optional[LintCache] = None,
+        workers: typing.Optional[int] = None,
+        rules: typing.Optional[typing.Tuple[str, ...]] = None,
+    ) -> None:
+        self.paths = paths
+        self.cache = cache if cache is not None else LintCache(None)
+        self.workers = workers
+        self.rules = rules
+        self.results: typing.Dict[str, dict] = {}
+        self._stats: typing.Dict[str, tuple] = {}
+
+    @staticmethod
+    def _stat(file_path: str) -> typing.Optional[tuple]:
+        try:
+            stat = os.stat(file_path)
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def poll(
+        self,
+    ) -> typing.Tuple[typing.List[typing.Tuple[str, dict]], typing.List[str]]:
+        """Lint new and changed files
+
+        Returns the (file path, result) of the linted files and the removed files"""
+
+        stats = {}
+        for file_path in iter_file_paths(self.paths):
+            stat = self._stat(file_path)
+            if stat is not None:
+                stats[file_path] = stat
+        changed = [
+            file_path
+            for file_path, stat in stats.items()
+            if self._stats.get(file_path) != stat
+        ]
+        removed = [file_path for file_path in self._stats if file_path not in stats]
+        self._stats = stats
+        for file_path in removed:
+            self.results.pop(file_path, None)
+            self.cache.discard(file_path)
+
+        linted = list(
+            lint_files(
+                changed, cache=self.cache, workers=self.workers, rules=self.rules
+            )
+        )
+        self.results.update(linted)
+        self.cache.save()
+        return linted, removed
+
+    def exit_code(self) -> int:
+        """FAIL if a file has linter messages (or cannot be loaded)"""
+        for result in self.results.values():
+            if "error" in result or result["messages"]:
+                return ExitCodes.FAIL
+        return ExitCodes.SUCCESS
+
+    def watch(self, interval: float = 1.0, rounds: typing.Optional[int] = None) -> int:
+        """Poll the files until interrupted (or for a number of rounds)"""
+        nr = 0
+        try:
+            while rounds is None or nr < rounds:
+                if nr:
+                    time.sleep(interval)
+                nr += 1
+                linted, removed = self.poll()
+                for file_path, result in linted:
+                    if "error" in result or result["messages"]:
+                        print_result(file_path, result)
+                if linted or removed:
+                    failed = sum(
+                        1
+                        for result in self.results.values()
+                        if "error" in result or result["messages"]
+                    )
+                    print(
+                        f"Linted {len(linted)} file(s): "
+                        f"{failed} of {len(self.results)} file(s) with messages",
+                        flush=True,
+                    )
+        except KeyboardInterrupt:
+            pass
+        return self.exit_code()
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    """Entrypoint of the search-file-lint command (and the pre-commit hook)"""
+
+    arg_parser = argparse.ArgumentParser(
+        prog="search-file-lint", description="Lint search files (JSON)."
+    )
+    arg_parser.add_argument(
+        "paths", nargs="+", help="search files or directories (with *.json files)"
+    )
+    arg_parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=None,
+        help="number of processes (default: number of CPUs)",
+    )
+    arg_parser.add_argument(
+        "--cache-file",
+        default=None,
+        help="results of previous runs (default: in the user cache directory)",
+    )
+    arg_parser.add_argument(
+        "--no-cache", action="store_true", help="lint all files again"
+    )
+    arg_parser.add_argument(
+        "--rules",
+        default=None,
+        help="comma-separated rules (default: all rules)",
+    )
+    arg_parser.add_argument(
+        "--timing", action="store_true", help="print the time of the rules"
+    )
+    arg_parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="lint changed files again (until interrupted)",
+    )
+    arg_parser.add_argument(
+        "--interval",
+        type=float,
+        default=1.0,
+        help="seconds between checks for changes (--watch, default: 1)",
+    )
+    args = arg_parser.parse_args(argv)
+    if args.watch and args.timing:
+        arg_parser.error("--timing is not supported with --watch")
+
+    rules = None
+    if args.rules is not None:
+        rules = tuple(rule.strip() for rule in args.rules.split(",") if rule.strip())
+        try:
+            RuleEngine(rules)
+        except ValueError as exc:
+            arg_parser.error(str(exc))
+
+    cache = LintCache(
+        None if args.no_cache else args.cache_file or default_cache_file()
+    )
+    if args.watch:
+        watcher = LintWatcher(args.paths, cache=cache, workers=args.jobs, rules=rules)
+        return watcher.watch(args.interval)
+
+    exit_code = ExitCodes.SUCCESS
+    calls: typing.Dict[str, int] = collections.Counter()
+    timings: typing.Dict[str, float] = collections.Counter()
+    try:
+        for file_path, result in lint_files(
+            list(iter_file_paths(args.paths)),
+            cache=cache,
+            workers=args.jobs,
+            rules=rules,
+            timing=args.timing,
+        ):
+            if "error" in result or result["messages"]:
+                print_result(file_path, result)
+                exit_code = ExitCodes.FAIL
+            for name, (nr_calls, seconds) in result.get("timings", {}).items():
+                calls[name] += nr_calls
+                timings[name] += seconds
+    finally:
+        cache.save()
+    if args.timing:
+        # (files with cached results are not included)
+        print(format_timing_report(calls, timings))
+    return exit_code
+
+
+def pre_commit_hook() -> int:
+    """Entrypoint for the query linter hook"""
+    return main(sys.argv[1:])
 
 
 if __name__ == "__main__":
-    raise SystemExit(pre_commit_hook())
+    raise SystemExit(main())
@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+"""Rules of the linter (checks of the query tree and the tokens)."""
+from __future__ import annotations
+
+import time
+import typing
+
+from search_query.constants import TokenTypes
+from search_query.registry import Registry
+from search_query.traversal import iter_preorder
+
+if typing.TYPE_CHECKING:  # pragma: no
+    from search_query.parser_base import Token
+    from search_query.query import Query
+
+# Kind of term nodes (operator nodes: the operator, e.g., "AND")
+TERM = "term"
+
+
+class RuleContext:
+    """Query that is linted (shared by the rules of a run)"""
+
+    def __init__(self, query_str: str, syntax: str) -> None:
+        self.query_str = query_str
+        self.syntax = syntax
+        self.messages: typing.List[dict] = []
+
+    def add_message(
+        self, rule: str, msg: str, pos: typing.Optional[tuple], level: str = "warning"
+    ) -> None:
+        """Add a linter message of a rule"""
+        self.messages.append(
+            {
+                "level": level,
+                "msg": msg,
+                "pos": pos if pos is not None else (0, len(self.query_str)),
+                "rule": rule,
+            }
+        )
+
+
+class Rule:
+    """Linter rule.
+
+    Rules subscribe to node kinds (TERM or operators, e.g., "AND") and token
+    types. The RuleEngine visits the tokens and the nodes once and calls the
+    rules that subscribed to them."""
+
+    name: typing.ClassVar[str] = ""
+    NODE_KINDS: typing.ClassVar[typing.Tuple[str, ...]] = ()
+    TOKEN_TYPES: typing.ClassVar[typing.Tuple[TokenTypes, ...]] = ()
+
+    def start(self, context: RuleContext) -> None:
+        """called before the tokens and nodes of a query are visited"""
+
+    def visit_token(self, token: Token, context: RuleContext) -> None:
+        """called for tokens of the TOKEN_TYPES"""
+
+    def visit_node(self, node: Query, context: RuleContext) -> None:
+        """called for nodes of the NODE_KINDS (parents before children)"""
+
+    def finish(self, context: RuleContext) -> None:
+        """called after the tokens and nodes of a query were visited"""
+
+
+class RedundantTermRule(Rule):
+    """Terms that occur more than once in an AND or OR"""
+
+    name = "redundant-term"
+    NODE_KINDS = ("AND", "OR")
+
+    def visit_node(self, node: Query, context: RuleContext) -> None:
+        seen: typing.Set[tuple] = set()
+        for child in node.children:
+            if child.operator:
+                continue
+            search_field = child.search_field
+            key = (child.value, search_field.value if search_field else None)
+            if key in seen:
+                context.add_message(
+                    self.name, f"Redundant term ({child.value})", child.position
+                )
+            seen.add(key)
+
+
+class SuspiciousWildcardRule(Rule):
+    """Wildcards at the start of a term or after a short stem (e.g., ab*)"""
+
+    name = "suspicious-wildcard"
+    NODE_KINDS = (TERM,)
+
+    MIN_STEM_LENGTH = 3
+
+    def visit_node(self, node: Query, context: RuleContext) -> None:
+        value = node.value
+        if "*" not in value and "?" not in value and "$" not in value:
+            return
+        value = value.strip('"')
+        first = min(
+            (value.find(wildcard) for wildcard in "*?$" if wildcard in value),
+            default=-1,
+        )
+        if first == 0:
+            context.add_message(
+                self.name, f"Wildcard at the start of a term ({value})", node.position
+            )
+        elif 0 < first < self.MIN_STEM_LENGTH and " " not in value[:first]:
+            context.add_message(
+                self.name, f"Wildcard after a short stem ({value})", node.position
+            )
+
+
+# Rules by name (plugins: entry points "search_query.linter_rules")
+RULES = Registry("search_query.linter_rules", {})
+for _rule in (RedundantTermRule, SuspiciousWildcardRule):
+    RULES.register(_rule.name, _rule)
+
+
+class RuleEngine:
+    """Runs the rules in one pass over the tokens and one traversal of the tree.
+
+    rules: names of the rules (default: all rules)
+    timing: measure the time of each rule (see timing_report())"""
+
+    def __init__(
+        self,
+        rules: typing.Optional[typing.Iterable[str]] = None,
+        *,
+        timing: bool = False,
+    ) -> None:
+        names = list(RULES) if rules is None else list(rules)
+        for name in names:
+            if name not in RULES:
+                raise ValueError(f"Linter rule not available ({name})")
+        self.rules: typing.List[Rule] = [RULES[name]() for name in names]
+        self.timing = timing
+        self.timings: typing.Dict[str, float] = {rule.name: 0.0 for rule in self.rules}
+        self.calls: typing.Dict[str, int] = {rule.name: 0 for rule in self.rules}
+
+        # Dispatch tables: node kind / token type -> rules
+        self._node_rules: typing.Dict[str, typing.List[Rule]] = {}
+        self._token_rules: typing.Dict[TokenTypes, typing.List[Rule]] = {}
+        for rule in self.rules:
+            for kind in rule.NODE_KINDS:
+                self._node_rules.setdefault(kind, []).append(rule)
+            for token_type in rule.TOKEN_TYPES:
+                self._token_rules.setdefault(token_type, []).append(rule)
+
+    def _call(self, rule: Rule, method: typing.Callable, *args: typing.Any) -> None:
+        start = time.perf_counter()
+        method(*args)
+        self.timings[rule.name] += time.perf_counter() - start
+        self.calls[rule.name] += 1
+
+    def run(
+        self,
+        query_str: str,
+        syntax: str,
+        tokens: typing.Iterable[Token] = (),
+        query: typing.Optional[Query] = None,
+    ) -> typing.List[dict]:
+        """Run the rules and return their linter messages
+
+        tokens and query: result of the parser (positions in query_str)"""
+
+        context = RuleContext(query_str, syntax)
+        token_rules = self._token_rules
+        node_rules = self._node_rules
+        call = self._call if self.timing else None
+
+        for rule in self.rules:
+            if call:
+                call(rule, rule.start, context)
+            else:
+                rule.start(context)
+
+        if token_rules:
+            for token in tokens:
+                for rule in token_rules.get(token.type, ()):
+                    if call:
+                        call(rule, rule.visit_token, token, context)
+                    else:
+                        rule.visit_token(token, context)
+
+        if node_rules and query is not None:
+            for node in iter_preorder(query):
+                kind = node.value if node.operator else TERM
+                for rule in node_rules.get(kind, ()):
+                    if call:
+                        call(rule, rule.visit_node, node, context)
+                    else:
+                        rule.visit_node(node, context)
+
+        for rule in self.rules:
+            if call:
+                call(rule, rule.finish, context)
+            else:
+                rule.finish(context)
+        return context.messages
+
+    def timing_report(self) -> str:
+        """Time of the rules (slowest first)"""
+        return format_timing_report(self.calls, self.timings)
+
+
+def format_timing_report(
+    calls: typing.Dict[str, int], timings: typing.Dict[str, float]
+) -> str:
+    """Table of the calls and the time of the rules (slowest first)"""
+    lines = [f"{'rule':<28}{'calls':>10}{'total [ms]':>14}"]
+    for name, seconds in sorted(
+        timings.items(), key=lambda item: item[1], reverse=True
+    ):
+        lines.append(f"{name:<28}{calls[name]:>10}{seconds * 1e3:>14.2f}")
+    return "\n".join(lines)
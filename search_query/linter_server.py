@@ -0,0 +1,383 @@
+#!/usr/bin/env python3
+"""Linter server (JSON-RPC over stdio, Language Server Protocol)."""
+from __future__ import annotations
+
+import bisect
+import json
+import sys
+import typing
+
+import search_query.exception as search_query_exception
+import search_query.parser
+from search_query.linter import run_rules
+from search_query.linter import run_linter
+from search_query.linter_rules import RuleEngine
+
+if typing.TYPE_CHECKING:  # pragma: no
+    from search_query.parser_base import QueryStringParser
+    from search_query.query import Query
+
+SERVER_NAME = "search-file-lint-server"
+
+# LSP: DiagnosticSeverity and TextDocumentSyncKind
+SEVERITIES = {"error": 1, "warning": 2, "info": 3}
+SYNC_INCREMENTAL = 2
+
+# JSON-RPC error codes
+METHOD_NOT_FOUND = -32601
+INVALID_PARAMS = -32602
+INTERNAL_ERROR = -32603
+
+# LSP: PositionEncodingKind (utf-16: default, utf-32: code points)
+UTF16 = "utf-16"
+UTF32 = "utf-32"
+
+
+def _utf16_length(text: str) -> int:
+    """Number of UTF-16 code units of a string"""
+    if text.isascii():
+        return len(text)
+    return len(text) + sum(1 for char in text if ord(char) > 0xFFFF)
+
+
+def _utf16_index(text: str, units: int) -> int:
+    """Index of the character at a number of UTF-16 code units"""
+    if text.isascii():
+        return min(units, len(text))
+    for index, char in enumerate(text):
+        units -= 2 if ord(char) > 0xFFFF else 1
+        if units < 0:
+            return index
+    return len(text)
+
+
+class Document:
+    """Query string of an open document (with the parser state).
+
+    Edits are parsed incrementally (see QueryStringParser.reparse()).
+    Diagnostics are computed when they are requested after a change.
+    LSP positions count UTF-16 code units (or code points: encoding utf-32)."""
+
+    def __init__(
+        self,
+        text: str,
+        syntax: str,
+        rule_engine: typing.Optional[RuleEngine] = None,
+        *,
+        encoding: str = UTF16,
+    ) -> None:
+        self.syntax = syntax
+        self.encoding = encoding
+        self.rule_engine = rule_engine
+        self.text = text
+        self.parser: typing.Optional[QueryStringParser] = None
+        self.query: typing.Optional[Query] = None
+        self._line_starts: typing.Optional[typing.List[int]] = None
+        self._diagnostics: typing.Optional[typing.List[dict]] = None
+        self._parse()
+
+    def _is_list(self) -> bool:
+        return (
+            self.syntax in search_query.parser.LIST_PARSERS and "1." in self.text[:10]
+        )
+
+    def _parse(self) -> None:
+        """Parse the text (again)"""
+        self.parser = None
+        self.query = None
+        if self._is_list():
+            # Query lists are linted as a whole (see run_linter())
+            return
+        self.parser = search_query.parser.PARSERS[self.syntax](
+            self.text, mode="lenient"
+        )
+        try:
+            self.query = self.parser.parse()
+        except search_query_exception.QuerySyntaxError:
+            self.query = None
+
+    def offset(self, position: dict) -> int:
+        """Offset of an LSP position (line, character)"""
+        line_starts = self.line_starts()
+        line = min(position["line"], len(line_starts) - 1)
+        start = line_starts[line]
+        if self.encoding == UTF16:
+            end = line_starts[line + 1] if line + 1 < len(line_starts) else None
+            return start + _utf16_index(self.text[start:end], position["character"])
+        return min(start + position["character"], len(self.text))
+
+    def position(self, offset: int) -> dict:
+        """LSP position (line, character) of an offset"""
+        line_starts = self.line_starts()
+        line = bisect.bisect_right(line_starts, offset) - 1
+        if self.encoding == UTF16:
+            character = _utf16_length(self.text[line_starts[line] : offset])
+        else:
+            character = offset - line_starts[line]
+        return {"line": line, "character": character}
+
+    def line_starts(self) -> typing.List[int]:
+        """Offsets of the lines"""
+        if self._line_starts is None:
+            self._line_starts = [0]
+            index = self.text.find("\n")
+            while index != -1:
+                self._line_starts.append(index + 1)
+                index = self.text.find("\n", index + 1)
+        return self._line_starts
+
+    def change(self, changes: typing.List[dict]) -> None:
+        """Apply changes (LSP TextDocumentContentChangeEvent)"""
+        for change in changes:
+            if "range" not in change:
+                self.text = change["text"]
+                self._line_starts = None
+                self._parse()
+                continue
+            start = self.offset(change["range"]["start"])
+            end = self.offset(change["range"]["end"])
+            self.text = self.text[:start] + change["text"] + self.text[end:]
+            self._line_starts = None
+            if self.parser is None or self.query is None or self._is_list():
+                self._parse()
+                continue
+            try:
+                self.query = self.parser.reparse(
+                    self.query, (start, end), change["text"]
+                )
+            except search_query_exception.QuerySyntaxError:
+                self._parse()
+        self._diagnostics = None
+
+    def lint(self) -> typing.List[dict]:
+        """Linter messages (of the parser and the rules)"""
+        if self.parser is None:
+            return run_linter(self.text, self.syntax, self.rule_engine)
+        return run_rules(self.parser, self.syntax, self.query, self.rule_engine)
+
+    def diagnostics(self) -> typing.List[dict]:
+        """LSP diagnostics (with the span and the text of the message)"""
+        if self._diagnostics is None:
+            self._diagnostics = []
+            for message in self.lint():
+                start, end = message["pos"]
+                diagnostic = {
+                    "range": {"start": self.position(start), "end": self.position(end)},
+                    "severity": SEVERITIES.get(message["level"], 3),
+                    "source": SERVER_NAME,
+                    "message": message["msg"],
+                    "data": {"pos": [start, end], "text": self.text[start:end]},
+                }
+                if "rule" in message:
+                    diagnostic["code"] = message["rule"]
+                self._diagnostics.append(diagnostic)
+        return self._diagnostics
+
+
+class LinterServer:
+    """Language server with the documents in memory.
+
+    Supports the lifecycle (initialize, shutdown, exit), the synchronization
+    of documents (didOpen, didChange with incremental changes, didClose),
+    diagnostics (publishDiagnostics after changes) and the custom request
+    searchQuery/lint (diagnostics of a query string that is not open).
+    The syntax of a document is its languageId (if it is a supported syntax)
+    or the initializationOption "syntax" (default: wos)."""
+
+    def __init__(
+        self,
+        reader: typing.BinaryIO,
+        writer: typing.BinaryIO,
+        *,
+        syntax: str = "wos",
+        rules: typing.Optional[typing.Iterable[str]] = None,
+    ) -> None:
+        self.reader = reader
+        self.writer = writer
+        self.syntax = syntax
+        self.rule_engine = RuleEngine(rules)
+        self.encoding = UTF16
+        self.documents: typing.Dict[str, Document] = {}
+        self.shutdown_requested = False
+        self.handlers: typing.Dict[str, typing.Callable[[dict], typing.Any]] = {
+            "initialize": self.initialize,
+            "initialized": lambda params: None,
+            "shutdown": self.shutdown,
+            "textDocument/didOpen": self.did_open,
+            "textDocument/didChange": self.did_change,
+            "textDocument/didClose": self.did_close,
+            "textDocument/didSave": lambda params: None,
+            "searchQuery/lint": self.lint,
+        }
+
+    # Messages (Content-Length header and JSON body)
+
+    def read_message(self) -> typing.Optional[dict]:
+        """Read a message (None: end of input)"""
+        length = None
+        while True:
+            line = self.reader.readline()
+            if not line:
+                return None
+            line = line.strip()
+            if not line:
+                break
+            name, _, value = line.decode("ascii").partition(":")
+            if name.lower() == "content-length":
+                length = int(value)
+        if length is None:
+            return None
+        return json.loads(self.reader.read(length).decode("utf-8"))
+
+    def send(self, message: dict) -> None:
+        """Write a message"""
+        body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf-8")
+        self.writer.write(f"Content-Length: {len(body)}\r\n\r\n".encode("ascii"))
+        self.writer.write(body)
+        self.writer.flush()
+
+    def notify(self, method: str, params: dict) -> None:
+        """Send a notification"""
+        self.send({"method": method, "params": params})
+
+    # Handlers
+
+    def initialize(self, params: dict) -> dict:
+        """Capabilities of the server"""
+        options = params.get("initializationOptions") or {}
+        self.syntax = options.get("syntax", self.syntax)
+        if "rules" in options:
+            self.rule_engine = RuleEngine(options["rules"])
+        general = (params.get("capabilities") or {}).get("general") or {}
+        encodings = general.get("positionEncodings") or [UTF16]
+        self.encoding = UTF32 if UTF32 in encodings else UTF16
+        return {
+            "capabilities": {
+                "positionEncoding": self.encoding,
+                "textDocumentSync": {"openClose": True, "change": SYNC_INCREMENTAL},
+            },
+            "serverInfo": {"name": SERVER_NAME},
+        }
+
+    def shutdown(self, params: dict) -> None:
+        """Stop accepting documents (exit follows)"""
+        self.shutdown_requested = True
+        self.documents.clear()
+
+    def _syntax(self, language_id: typing.Optional[str]) -> str:
+        if language_id and language_id.lower() in search_query.parser.PARSERS:
+            return language_id.lower()
+        return self.syntax
+
+    def publish_diagnostics(self, uri: str) -> None:
+        """Send the diagnostics of a document"""
+        document = self.documents[uri]
+        self.notify(
+            "textDocument/publishDiagnostics",
+            {"uri": uri, "diagnostics": document.diagnostics()},
+        )
+
+    def did_open(self, params: dict) -> None:
+        """Parse and lint an opened document"""
+        text_document = params["textDocument"]
+        uri = text_document["uri"]
+        self.documents[uri] = Document(
+            text_document["text"],
+            self._syntax(text_document.get("languageId")),
+            self.rule_engine,
+            encoding=self.encoding,
+        )
+        self.publish_diagnostics(uri)
+
+    def did_change(self, params: dict) -> None:
+        """Re-parse the changed parts of a document and lint it"""
+        uri = params["textDocument"]["uri"]
+        self.documents[uri].change(params["contentChanges"])
+        self.publish_diagnostics(uri)
+
+    def did_close(self, params: dict) -> None:
+        """Remove a document (and its diagnostics)"""
+        uri = params["textDocument"]["uri"]
+        self.documents.pop(uri, None)
+        self.notify("textDocument/publishDiagnostics", {"uri": uri, "diagnostics": []})
+
+    def lint(self, params: dict) -> typing.List[dict]:
+        """Diagnostics of a query string (params: text, syntax)"""
+        document = Document(
+            params["text"],
+            self._syntax(params.get("syntax")),
+            self.rule_engine,
+            encoding=self.encoding,
+        )
+        return document.diagnostics()
+
+    def handle(self, message: dict) -> None:
+        """Dispatch a request or notification"""
+        method = message.get("method")
+        is_request = "id" in message
+        handler = self.handlers.get(method)  # type: ignore
+        if handler is None:
+            if is_request:
+                self.send(
+                    {
+                        "id": message["id"],
+                        "error": {
+                            "code": METHOD_NOT_FOUND,
+                            "message": f"Method not found ({method})",
+                        },
+                    }
+                )
+            return
+        try:
+            result = handler(message.get("params") or {})
+        except Exception as exc:  # pylint: disable=broad-except
+            # Errors are returned (or ignored for notifications): the server keeps running
+            code = (
+                INVALID_PARAMS
+                if isinstance(exc, (KeyError, TypeError, ValueError))
+                else INTERNAL_ERROR
+            )
+            if is_request:
+                self.send(
+                    {
+                        "id": message["id"],
+                        "error": {"code": code, "message": str(exc)},
+                    }
+                )
+            return
+        if is_request:
+            self.send({"id": message["id"], "result": result})
+
+    def serve(self) -> int:
+        """Handle messages until exit (returns the exit code)"""
+        while True:
+            message = self.read_message()
+            if message is None:
+                return 1
+            if message.get("method") == "exit":
+                return 0 if self.shutdown_requested else 1
+            self.handle(message)
+
+
+def main(argv: typing.Optional[typing.List[str]] = None) -> int:
+    """Entrypoint of the linter server (stdio)"""
+    # pylint: disable=import-outside-toplevel
+    import argparse
+
+    arg_parser = argparse.ArgumentParser(
+        prog=SERVER_NAME, description="Linter server (Language Server Protocol, stdio)."
+    )
+    arg_parser.add_argument("--syntax", default="wos", help="default syntax")
+    arg_parser.add_argument(
+        "--rules", default=None, help="comma-separated rules (default: all rules)"
+    )
+    args = arg_parser.parse_args(argv)
+    rules = None if args.rules is None else args.rules.split(",")
+    server = LinterServer(
+        sys.stdin.buffer, sys.stdout.buffer, syntax=args.syntax, rules=rules
+    )
+    return server.serve()
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
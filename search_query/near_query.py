@@ -0,0 +1,52 @@
+#!/usr/bin/env python
+"""NEAR Query"""
+from __future__ import annotations
+
+import typing
+
+from search_query.constants import Operators
+from search_query.query import Query
+from search_query.query import SearchField
+
+
+class NearQuery(Query):
+    """NEAR Query"""
+
+    __slots__ = ("_near_param",)
+
+    def __init__(
+        self,
+        children: typing.List[typing.Union[str, Query]],
+        *,
+        search_field: typing.Union[SearchField, str],
+        near_param: int,
+        position: typing.Optional[tuple] = None,
+    ) -> None:
+        """init method
+        search terms: strings which you want to include in the search query
+        nested queries: queries whose roots are appended to the query
+        search field: search field to which the query should be applied
+        near param: maximum distance between the terms
+        """
+
+        self._near_param = near_param
+        super().__init__(
+            value=Operators.NEAR,
+            operator=True,
+            children=children,
+            search_field=search_field
+            if isinstance(search_field, SearchField)
+            else SearchField.intern(search_field),
+            position=position,
+        )
+
+    @property
+    def near_param(self) -> int:
+        """maximum distance between the terms"""
+        return self._near_param
+
+    @near_param.setter
+    def near_param(self, near_param: int) -> None:
+        self._ensure_not_interned()
+        self._near_param = near_param
+        self._invalidate()
@@ -10,6 +10,8 @@ from search_query.query import SearchField
 class NotQuery(Query):
     """NOT Query"""
 
+    __slots__ = ()
+
     def __init__(
         self,
         children: typing.List[typing.Union[str, Query]],
@@ -29,6 +31,6 @@ class NotQuery(Query):
             children=children,
             search_field=search_field
             if isinstance(search_field, SearchField)
-            else SearchField(search_field),
+            else SearchField.intern(search_field),
             position=position,
         )
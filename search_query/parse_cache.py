@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+"""Cache of parsed queries (in memory and on disk)."""
+from __future__ import annotations
+
+import collections
+import hashlib
+import os
+import threading
+import typing
+
+import search_query
+from search_query.query_store import dumps
+from search_query.query_store import loads
+from search_query.query_store import VERSION as STORE_VERSION
+from search_query.utils import write_atomic
+
+if typing.TYPE_CHECKING:  # pragma: no
+    from search_query.query import Query
+
+# Default size of the memory tier
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def cache_key(query_str: str, syntax: str, mode: str) -> str:
+    """Key of a parsed query (changes with the library and the binary format)"""
+    digest = hashlib.sha256()
+    version = search_query.__version__
+    for part in (query_str, syntax, mode, version, str(STORE_VERSION)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class ParseCache:
+    """Cache of parsed queries
+
+    Queries are keyed by the hash of the query string, syntax, mode and
+    library version. The memory tier keeps query trees (copied on each hit)
+    and evicts the least recently used queries when max_bytes (the size in
+    the binary format, see query_store) is exceeded. The (optional) disk tier
+    stores one file per query in the binary format in a directory (shared by
+    processes). Each hit returns a new query tree."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        directory: typing.Optional[str] = None,
+    ) -> None:
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self._entries: collections.OrderedDict[
+            str, typing.Tuple[Query, int]
+        ] = collections.OrderedDict()
+        self._nr_bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        if directory is not None:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nr_bytes(self) -> int:
+        """size of the queries in the memory tier (in the binary format)"""
+        return self._nr_bytes
+
+    def stats(self) -> dict:
+        """hit and miss counters"""
+        return {
+            "hits": self.hits,
+            "disk_hits": self.disk_hits,
+            "misses": self.misses,
+            "entries": len(self._entries),
+            "bytes": self._nr_bytes,
+        }
+
+    def _path(self, key: str) -> str:
+        assert self.directory is not None
+        return os.path.join(self.directory, key[:2], key + ".sqry")
+
+    def get(
+        self, query_str: str, syntax: str, mode: str = "strict"
+    ) -> typing.Optional[Query]:
+        """returns the cached query (or None)"""
+        key = cache_key(query_str, syntax, mode)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+        if entry is not None:
+            return entry[0].copy()
+        data = None
+        if self.directory is not None:
+            try:
+                with open(self._path(key), "rb") as file:
+                    data = file.read()
+            except OSError:
+                data = None
+        if data is None:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_hits += 1
+        query = loads(data)
+        self._add(key, query, len(data))
+        return query.copy()
+
+    def put(
+        self, query_str: str, syntax: str, query: Query, mode: str = "strict"
+    ) -> None:
+        """adds a parsed query"""
+        key = cache_key(query_str, syntax, mode)
+        data = dumps(query)
+        self._add(key, query.copy(), len(data))
+        if self.directory is not None:
+            path = self._path(key)
+            if not os.path.exists(path):
+                write_atomic(path, data)
+
+    def _add(self, key: str, query: Query, size: int) -> None:
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._nr_bytes -= previous[1]
+            self._entries[key] = (query, size)
+            self._nr_bytes += size
+            while self._nr_bytes > self.max_bytes:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self._nr_bytes -= evicted_size
+
+    def clear(self) -> None:
+        """removes the queries from the memory tier (and resets the counters)"""
+        with self._lock:
+            self._entries.clear()
+            self._nr_bytes = 0
+            self.hits = self.disk_hits = self.misses = 0
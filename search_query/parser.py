@@ -2,44 +2,156 @@
 """Query parser."""
 from __future__ import annotations
 
+import os
+import typing
+
+import search_query.exception as search_query_exception
 from search_query.constants import PLATFORM
-from search_query.query import Query
+from search_query.registry import Registry
+from search_query.utils import create_executor
 
-# from search_query.parser_ebsco import EBSCOParser
-# from search_query.parser_pubmed import PubmedListParser
-# from search_query.parser_pubmed import PubmedParser
-# from search_query.parser_wos import WOSListParser
-# from search_query.parser_wos import WOSParser
+if typing.TYPE_CHECKING:  # pragma: no
+    from search_query.parse_cache import ParseCache
+    from search_query.parser_base import QueryListParser
+    from search_query.parser_base import QueryStringParser
+    from search_query.query import Query
 
-PARSERS = {
-    # PLATFORM.WOS.value: WOSParser,
-    # PLATFORM.PUBMED.value: PubmedParser,
-    # PLATFORM.EBSCO.value: EBSCOParser,
-}
+# Parsers are imported on first use
+# (plugins: entry points "search_query.parsers" and "search_query.list_parsers")
+PARSERS = Registry(
+    "search_query.parsers",
+    {
+        PLATFORM.PRE_NOTATION.value: "search_query.parser_pre_notation:PreNotationParser",
+        PLATFORM.WOS.value: "search_query.parser_wos:WOSParser",
+        PLATFORM.PUBMED.value: "search_query.parser_pubmed:PubmedParser",
+        PLATFORM.EBSCO.value: "search_query.parser_ebsco:EBSCOParser",
+    },
+)
 
-LIST_PARSERS = {
-    # PLATFORM.WOS.value: WOSListParser,
-    # PLATFORM.PUBMED.value: PubmedListParser,
-    # PLATFORM.EBSCO.value: EBSCOParser,
-}
+LIST_PARSERS = Registry(
+    "search_query.list_parsers",
+    {
+        PLATFORM.WOS.value: "search_query.parser_wos:WOSListParser",
+        PLATFORM.PUBMED.value: "search_query.parser_pubmed:PubmedListParser",
+        PLATFORM.EBSCO.value: "search_query.parser_ebsco:EBSCOListParser",
+    },
+)
 
 
-# pylint: disable=too-many-return-statements
-def parse(query_str: str, *, syntax: str = "wos") -> Query:
-    """Parse a query string."""
+def get_parser(
+    query_str: str, *, syntax: str = "wos", mode: str = "strict"
+) -> typing.Union[QueryStringParser, QueryListParser]:
+    """Get the parser (instance) for a query string."""
 
     syntax = syntax.lower()
 
-    if "1." in query_str[:10]:
+    if syntax != PLATFORM.PRE_NOTATION.value and "1." in query_str[:10]:
         if syntax not in LIST_PARSERS:
             raise ValueError(f"Invalid syntax: {syntax}")
 
-        return LIST_PARSERS[syntax](query_str).parse()
+        return LIST_PARSERS[syntax](query_str, mode=mode)
 
     if syntax not in PARSERS:
         raise ValueError(f"Invalid syntax: {syntax}")
 
-    return PARSERS[syntax](query_str).parse()
+    return PARSERS[syntax](query_str, mode=mode)
+
+
+def parse(
+    query_str: str,
+    *,
+    syntax: str = "wos",
+    mode: str = "strict",
+    cache: typing.Optional[ParseCache] = None,
+) -> Query:
+    """Parse a query string.
+
+    cache: returns cached queries (without tokenizing) and adds new ones."""
+
+    if cache is not None:
+        query = cache.get(query_str, syntax.lower(), mode)
+        if query is not None:
+            return query
+
+    query = get_parser(query_str, syntax=syntax, mode=mode).parse()
+    if cache is not None:
+        cache.put(query_str, syntax.lower(), query, mode)
+    return query
+
+
+def _parse_or_lint(
+    query_str: str, syntax: str
+) -> typing.Tuple[bool, typing.Union[Query, typing.List[dict]]]:
+    """(True, query) or (False, linter messages)"""
+    try:
+        parser = get_parser(query_str, syntax=syntax)
+        return True, parser.parse()
+    except search_query_exception.QuerySyntaxError:
+        return False, parser.linter_messages
+    except ValueError as exc:
+        return False, [{"level": "error", "msg": str(exc), "pos": (0, len(query_str))}]
+
+
+def _parse_to_bytes(
+    item: typing.Tuple[str, str]
+) -> typing.Tuple[bool, typing.Union[bytes, typing.List[dict]]]:
+    """Worker function for process pools (queries are returned in the binary
+    format, which is smaller and faster to pickle than query trees)"""
+    # pylint: disable=import-outside-toplevel
+    from search_query.query_store import dumps
+
+    success, result = _parse_or_lint(*item)
+    if success:
+        return True, dumps(result)  # type: ignore
+    return False, result
+
+
+def parse_many(
+    queries: typing.Iterable[str],
+    syntax: str = "wos",
+    *,
+    workers: typing.Optional[int] = None,
+    executor: str = "process",
+) -> typing.Iterator[typing.Tuple[int, typing.Union[Query, typing.List[dict]]]]:
+    """Parse query strings in parallel.
+
+    Yields (index, query) or, if a query cannot be parsed,
+    (index, linter messages) in the order of the queries.
+    workers: number of threads or processes (default: number of CPUs,
+    1: parse in the current thread)
+    executor: "process" (parallel parsing) or "thread" (e.g., in a
+    service that keeps queries in memory; parsing holds the GIL)."""
+
+    query_strs = list(queries)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if executor not in ("process", "thread"):
+        raise ValueError(f"Invalid executor: {executor}")
+
+    if workers <= 1 or len(query_strs) <= 1:
+        for index, query_str in enumerate(query_strs):
+            yield index, _parse_or_lint(query_str, syntax)[1]
+        return
+
+    items = [(query_str, syntax) for query_str in query_strs]
+    if executor == "thread":
+        with create_executor(workers, processes=False) as pool:
+            for index, (_, result) in enumerate(
+                pool.map(lambda item: _parse_or_lint(*item), items)
+            ):
+                yield index, result
+        return
+
+    # pylint: disable=import-outside-toplevel
+    from search_query.query_store import loads
+
+    # Chunks reduce the overhead of inter-process communication
+    chunksize = max(1, len(items) // (workers * 4))
+    with create_executor(workers) as pool:
+        for index, (success, result) in enumerate(
+            pool.map(_parse_to_bytes, items, chunksize=chunksize)
+        ):
+            yield index, loads(result) if success else result  # type: ignore
 
 
 def get_platform(platform_str: str) -> str:
@@ -48,5 +160,9 @@ def get_platform(platform_str: str) -> str:
     platform_str = platform_str.lower().rstrip().lstrip()
     if platform_str in ["web of science", "wos"]:
         return PLATFORM.WOS.value
+    if platform_str in ["pubmed", "medline"]:
+        return PLATFORM.PUBMED.value
+    if platform_str in ["ebsco", "ebscohost", "cinahl"]:
+        return PLATFORM.EBSCO.value
 
     raise ValueError(f"Invalid platform: {platform_str}")
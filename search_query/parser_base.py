@@ -2,56 +2,244 @@
 """Base query parser."""
 from __future__ import annotations
 
+import bisect
+import itertools
 import re
+import sys
 import typing
 
 import search_query.exception as search_query_exception
+from search_query.and_query import AndQuery
 from search_query.constants import Colors
+from search_query.constants import Operators
+from search_query.constants import TokenTypes
+from search_query.near_query import NearQuery
+from search_query.not_query import NotQuery
+from search_query.or_query import OrQuery
+from search_query.query import _anchor_positions
+from search_query.query import _build_query
+from search_query.query import _PositionAnchor
 from search_query.query import Query
+from search_query.query import SearchField
+from search_query.utils import SourceMap
+
+OPERATOR_CLASSES: typing.Dict[str, typing.Type[Query]] = {
+    Operators.AND: AndQuery,
+    Operators.OR: OrQuery,
+    Operators.NOT: NotQuery,
+    Operators.NEAR: NearQuery,
+}
+
+
+class Token(typing.NamedTuple):
+    """Token of a query string"""
+
+    value: str
+    type: TokenTypes
+    position: typing.Tuple[int, int]
+
+
+def _combine_terms(tokens: typing.List[Token]) -> typing.List[Token]:
+    # Combine subsequent terms (without quotes)
+    # This would be more challenging in the regex
+    combined_tokens: typing.List[Token] = []
+    for token in tokens:
+        if (
+            token.type == TokenTypes.SEARCH_TERM
+            and combined_tokens
+            and combined_tokens[-1].type == TokenTypes.SEARCH_TERM
+        ):
+            previous = combined_tokens[-1]
+            combined_tokens[-1] = Token(
+                previous.value + " " + token.value,
+                TokenTypes.SEARCH_TERM,
+                (previous.position[0], token.position[1]),
+            )
+        else:
+            combined_tokens.append(token)
+    return combined_tokens
 
 
 class QueryStringParser:
-    """QueryStringParser"""
+    """QueryStringParser
+
+    Platform parsers declare the regular expressions of their tokens
+    (TOKEN_PATTERNS, in order of precedence). The patterns are combined in
+    one regular expression (compiled once per parser class), which
+    assigns the type of each token when the query string is tokenized.
+    Patterns must not contain named groups.
+
+    parse_query_tree() builds the query from the tokens in one pass
+    (operator precedence parsing, see PRECEDENCE). Platform parsers adapt it
+    by overriding parse_operator(), translate_search_field() and
+    create_term()."""
 
-    tokens: list
-    linter_messages: typing.List[dict] = []
+    TOKEN_PATTERNS: typing.ClassVar[typing.Dict[TokenTypes, str]] = {}
+    token_regex: typing.ClassVar[typing.Optional[typing.Pattern[str]]] = None
+    _token_types: typing.ClassVar[typing.Dict[str, TokenTypes]] = {}
+
+    # For the classification of strings (tokens have a type)
+    OPERATOR_REGEX = re.compile(r"^(AND|OR|NOT)$", re.IGNORECASE)
+
+    # Binding power of the operators
+    # (operators with the same binding power are applied from left to right)
+    PRECEDENCE: typing.ClassVar[typing.Dict[str, int]] = {
+        Operators.NEAR: 0,
+        Operators.NOT: 0,
+        Operators.AND: 0,
+        Operators.OR: 0,
+    }
+    # Search fields precede their term or parentheses (e.g., TI=term)
+    # or follow their term (e.g., term[ti])
+    PREFIX_SEARCH_FIELDS: typing.ClassVar[bool] = True
+    # Subsequent terms (without operator) are combined by tokenize()
+    COMBINE_SUBSEQUENT_TERMS: typing.ClassVar[bool] = False
+
+    linter_messages: typing.List[dict]
+
+    def __init_subclass__(cls, **kwargs: typing.Any) -> None:
+        super().__init_subclass__(**kwargs)
+        if "TOKEN_PATTERNS" in cls.__dict__:
+            cls.token_regex = re.compile(
+                "|".join(
+                    f"(?P<{token_type.name}>{pattern})"
+                    for token_type, pattern in cls.TOKEN_PATTERNS.items()
+                )
+            )
+            cls._token_types = {
+                token_type.name: token_type for token_type in cls.TOKEN_PATTERNS
+            }
 
     def __init__(self, query_str: str, mode: str = "strict") -> None:
         self.query_str = query_str
         self.tokens = []
         self.mode = mode
+        self.linter_messages = []
+
+    @property
+    def tokens(self) -> typing.List[Token]:
+        """Tokens of the query_str"""
+        self._apply_token_shifts()
+        return self._tokens
+
+    @tokens.setter
+    def tokens(self, tokens: typing.List[Token]) -> None:
+        self._tokens = tokens
+        # Tokens from _shift_nrs[i] (to the next nr) are shifted by _shift_deltas[i]
+        self._shift_nrs: typing.List[int] = []
+        self._shift_deltas: typing.List[int] = []
+        # Anchor of the positions of the query (set by reparse())
+        self._anchor: typing.Optional[_PositionAnchor] = None
+
+    def _apply_token_shifts(self) -> None:
+        """Shift the tokens after previous edits (see reparse())"""
+        if self._shift_nrs:
+            tokens = self._tokens
+            make = Token._make
+            stops = self._shift_nrs[1:] + [len(tokens)]
+            for nr, stop, delta in zip(self._shift_nrs, stops, self._shift_deltas):
+                tokens[nr:stop] = [
+                    make((value, token_type, (token_start + delta, token_end + delta)))
+                    for value, token_type, (token_start, token_end) in tokens[nr:stop]
+                ]
+            self._shift_nrs = []
+            self._shift_deltas = []
+
+    def _token(self, nr: int) -> Token:
+        """Token nr (with the shifts of previous edits)"""
+        token = self._tokens[nr]
+        index = bisect.bisect_right(self._shift_nrs, nr) - 1
+        if index < 0 or not self._shift_deltas[index]:
+            return token
+        delta = self._shift_deltas[index]
+        start, end = token.position
+        return Token(token.value, token.type, (start + delta, end + delta))
+
+    def _splice_tokens(
+        self, first: int, stop: int, new_tokens: typing.List[Token], delta: int
+    ) -> None:
+        """Replace the tokens first...stop-1 (the tokens after them are shifted
+        by delta when they are read)"""
+        nrs, deltas = self._shift_nrs, self._shift_deltas
+        index = bisect.bisect_right(nrs, stop) - 1
+        after_delta = (deltas[index] if index >= 0 else 0) + delta
+        keep = bisect.bisect_left(nrs, first)
+        rest = bisect.bisect_right(nrs, stop)
+        nr_shift = len(new_tokens) - (stop - first)
+        nr_tokens = len(self._tokens) + nr_shift
+        candidates = (
+            list(zip(nrs[:keep], deltas[:keep]))
+            + [(first, 0), (first + len(new_tokens), after_delta)]
+            + [
+                (nr + nr_shift, nr_delta + delta)
+                for nr, nr_delta in zip(nrs[rest:], deltas[rest:])
+            ]
+        )
+        self._shift_nrs, self._shift_deltas = [], []
+        previous_delta = 0
+        for nr, nr_delta in candidates:
+            if self._shift_nrs and self._shift_nrs[-1] == nr:
+                # (the previous range is empty)
+                self._shift_nrs.pop()
+                self._shift_deltas.pop()
+                previous_delta = self._shift_deltas[-1] if self._shift_deltas else 0
+            if nr_delta != previous_delta and nr < nr_tokens:
+                self._shift_nrs.append(nr)
+                self._shift_deltas.append(nr_delta)
+                previous_delta = nr_delta
+        self._tokens[first:stop] = new_tokens
+
+    def tokenize(self) -> None:
+        """Tokenize the query_str."""
+        if self.token_regex is None:
+            raise NotImplementedError(
+                "TOKEN_PATTERNS or tokenize method must be implemented by inheriting classes"
+            )
+        token_types = self._token_types
+        make = Token._make
+        self.tokens = [
+            make((match.group(), token_types[match.lastgroup], match.span()))
+            for match in self.token_regex.finditer(self.query_str)
+        ]
+        if self.COMBINE_SUBSEQUENT_TERMS:
+            self.combine_subsequent_terms()
 
     def get_token_types(self, tokens: list, *, legend: bool = False) -> str:
         """Print the token types"""
 
         mismatch = False
 
-        for i in range(len(tokens) - 1):
-            _, (_, current_end) = tokens[i]
-            _, (next_start, _) = tokens[i + 1]
-            if current_end + 1 != next_start:
-                if re.match(r"\s*", self.query_str[current_end:next_start]):
-                    continue
+        for token, next_token in zip(tokens, tokens[1:]):
+            current_end = token.position[1]
+            next_start = next_token.position[0]
+            gap = self.query_str[current_end:next_start]
+            if gap and not gap.isspace():
                 # Position mismatch means: not tokenized
                 print(
                     "NOT-TOKENIZED: "
-                    f"{Colors.RED}{self.query_str[current_end:next_start]}{Colors.END} "
+                    f"{Colors.RED}{gap}{Colors.END} "
                     f"(positions {current_end}-{next_start} in query_str)"
                 )
                 mismatch = True
 
         output = ""
-        for token, _ in tokens:
-            if self.is_term(token):
-                output += token
-            elif self.is_search_field(token):
-                output += f"{Colors.GREEN}{token}{Colors.END}"
-            elif self.is_operator(token):
-                output += f" {Colors.ORANGE}{token}{Colors.END} "
-            elif self.is_parenthesis(token):
-                output += f"{Colors.BLUE}{token}{Colors.END}"
+        for token in tokens:
+            if token.type == TokenTypes.SEARCH_TERM:
+                output += token.value
+            elif token.type == TokenTypes.SEARCH_FIELD:
+                output += f"{Colors.GREEN}{token.value}{Colors.END}"
+            elif token.type in (
+                TokenTypes.LOGIC_OPERATOR,
+                TokenTypes.PROXIMITY_OPERATOR,
+            ):
+                output += f" {Colors.ORANGE}{token.value}{Colors.END} "
+            elif token.type in (
+                TokenTypes.PARENTHESIS_OPEN,
+                TokenTypes.PARENTHESIS_CLOSED,
+            ):
+                output += f"{Colors.BLUE}{token.value}{Colors.END}"
             else:
-                output += f"{Colors.RED}{token}{Colors.END}"
+                output += f"{Colors.RED}{token.value}{Colors.END}"
 
         if legend:
             output += f"\n Term\n {Colors.BLUE}Parenthesis{Colors.END}"
@@ -74,7 +262,7 @@ class QueryStringParser:
 
     def is_operator(self, token: str) -> bool:
         """Token is operator"""
-        return bool(re.match(r"^(AND|OR|NOT)$", token, re.IGNORECASE))
+        return bool(self.OPERATOR_REGEX.match(token))
 
     def is_term(self, token: str) -> bool:
         """Check if a token is a term."""
@@ -86,43 +274,679 @@ class QueryStringParser:
 
     def combine_subsequent_terms(self) -> None:
         """Combine subsequent terms in the list of tokens."""
-        # Combine subsequent terms (without quotes)
-        # This would be more challenging in the regex
-        combined_tokens = []
-        i = 0
-        while i < len(self.tokens):
+        self.tokens = _combine_terms(self.tokens)
+
+    def add_linter_message(self, msg: str, pos: tuple, level: str = "error") -> None:
+        """Add a linter message (error or warning)"""
+        self.linter_messages.append({"level": level, "msg": msg, "pos": pos})
+
+    def _raise(self, msg: str, pos: tuple) -> typing.NoReturn:
+        self.add_linter_message(msg, pos)
+        raise search_query_exception.QuerySyntaxError(
+            msg=msg, query_string=self.query_str, pos=pos
+        )
+
+    def _error(self, msg: str, pos: tuple) -> None:
+        """Add an error (raised in strict mode, the parser recovers otherwise)"""
+        if self.mode == "strict":
+            self._raise(msg, pos)
+        self.add_linter_message(msg, pos)
+
+    def parse_operator(self, token: Token) -> typing.Tuple[str, typing.Optional[int]]:
+        """Operator and near param of an operator token"""
+        return token.value.upper(), None
+
+    def translate_search_field(self, token: Token) -> SearchField:
+        """Translate a search field tag to the standard search field."""
+        raise NotImplementedError(
+            "translate_search_field method must be implemented by inheriting classes"
+        )
+
+    def create_term(
+        self, token: Token, search_field: typing.Optional[SearchField]
+    ) -> Query:
+        """Create the node of a search term."""
+        if search_field is None:
+            self.add_linter_message("Search field missing", token.position)
+        return _build_query(
+            Query,
+            sys.intern(token.value),
+            operator=False,
+            search_field=search_field,
+            children=[],
+            position=token.position,
+        )
+
+    # pylint: disable=too-many-branches
+    # pylint: disable=too-many-statements
+    def parse_query_tree(
+        self,
+        tokens: typing.List[Token],
+        *,
+        resolve_reference: typing.Optional[
+            typing.Callable[[Token], typing.Optional[Query]]
+        ] = None,
+        search_field: typing.Optional[SearchField] = None,
+    ) -> Query:
+        """Parse a query from a list of tokens.
+
+        Operator precedence parsing with explicit stacks (one pass over the
+        tokens, no recursion). Chains of the same operator (e.g., a OR b OR c)
+        become one node, unless they are in parentheses.
+        resolve_reference returns the sub-query of a reference term
+        (e.g., #1 in list format) or None (other terms).
+        search_field: search field of the context (e.g., when the tokens
+        of parentheses are parsed again).
+
+        In strict mode, the first syntax error is raised. Otherwise, errors are
+        added to the linter messages and the parser recovers (missing operators
+        are replaced by AND, other tokens that do not fit are skipped) to
+        report all errors in one pass."""
+
+        # Operands: nodes or operations that can still be extended:
+        # [operator, near param, children, position, in parentheses]
+        operands: typing.List[typing.Union[Query, list]] = []
+        # Operators: (operator, near param, token) or ("(", token, search field)
+        operators: typing.List[tuple] = []
+        # Search field of the current parentheses and of the next operand
+        next_search_field: typing.Optional[SearchField] = None
+        expect_operand = True
+        # Index after empty parentheses without an operand before them
+        empty_group_end = -1
+        precedence = self.PRECEDENCE
+        prefix_search_fields = self.PREFIX_SEARCH_FIELDS
+
+        def build(operand: typing.Union[Query, list]) -> Query:
+            if type(operand) is not list:  # pylint: disable=unidiomatic-typecheck
+                return operand  # type: ignore
+            operator, near_param, children, position, _ = operand
+            node = _build_query(
+                OPERATOR_CLASSES[operator],
+                operator,
+                operator=True,
+                search_field=None,
+                children=children,
+                position=position,
+            )
+            if near_param is not None:
+                node.near_param = near_param  # type: ignore
+            return node
+
+        def reduce() -> None:
+            operator, near_param, token = operators.pop()
+            right = build(operands.pop())
+            left = operands[-1]
             if (
-                i + 1 < len(self.tokens)
-                and self.is_term(self.tokens[i][0])
-                and self.is_term(self.tokens[i + 1][0])
+                type(left) is list  # pylint: disable=unidiomatic-typecheck
+                and left[0] == operator
+                and left[1] == near_param
+                and not left[4]
+            ):
+                left[2].append(right)
+                return
+            operands[-1] = [
+                operator,
+                near_param,
+                [build(left), right],
+                token.position,
+                False,
+            ]
+
+        def insert_operator(token: Token) -> None:
+            # Recovery: missing operators are replaced by AND
+            self._error("Missing operator", token.position)
+            while (
+                operators
+                and operators[-1][0] != "("
+                and precedence[operators[-1][0]] >= precedence[Operators.AND]
             ):
-                combined_token = (
-                    self.tokens[i][0] + " " + self.tokens[i + 1][0],
-                    (self.tokens[i][1][0], self.tokens[i + 1][1][1]),
+                reduce()
+            operators.append((Operators.AND, None, token))
+
+        nr_tokens = len(tokens)
+        i = 0
+        while i < nr_tokens:
+            token = tokens[i]
+            i += 1
+            token_type = token.type
+            if token_type == TokenTypes.SEARCH_TERM:
+                if not expect_operand:
+                    insert_operator(token)
+                if prefix_search_fields:
+                    term_search_field = next_search_field or search_field
+                    next_search_field = None
+                elif i < nr_tokens and tokens[i].type == TokenTypes.SEARCH_FIELD:
+                    term_search_field = self.translate_search_field(tokens[i])
+                    i += 1
+                else:
+                    term_search_field = None
+                subquery = (
+                    None if resolve_reference is None else resolve_reference(token)
                 )
-                combined_tokens.append(combined_token)
-                i += 2
+                if subquery is None:
+                    subquery = self.create_term(token, term_search_field)
+                operands.append(subquery)
+                expect_operand = False
+
+            elif token_type in (
+                TokenTypes.LOGIC_OPERATOR,
+                TokenTypes.PROXIMITY_OPERATOR,
+            ):
+                if expect_operand:
+                    # Recovery: the operator is skipped
+                    # (reported with the empty parentheses before it)
+                    if i - 1 != empty_group_end:
+                        self._error("Missing term before operator", token.position)
+                    continue
+                operator, near_param = self.parse_operator(token)
+                while (
+                    operators
+                    and operators[-1][0] != "("
+                    and precedence[operators[-1][0]] >= precedence[operator]
+                ):
+                    reduce()
+                operators.append((sys.intern(operator), near_param, token))
+                expect_operand = True
+
+            elif token_type == TokenTypes.SEARCH_FIELD:
+                if not prefix_search_fields:
+                    self._error("Search field must follow a term", token.position)
+                    continue
+                if not expect_operand:
+                    insert_operator(token)
+                    expect_operand = True
+                next_search_field = self.translate_search_field(token)
+
+            elif token_type == TokenTypes.PARENTHESIS_OPEN:
+                if not expect_operand:
+                    insert_operator(token)
+                    expect_operand = True
+                operators.append(("(", token, search_field))
+                search_field = next_search_field or search_field
+                next_search_field = None
+
+            elif token_type == TokenTypes.PARENTHESIS_CLOSED:
+                if expect_operand:
+                    self._error("Missing term", token.position)
+                    # Recovery: the operator (or the empty parentheses) is skipped
+                    if not operators:
+                        continue
+                    next_search_field = None
+                    if operators[-1][0] == "(":
+                        _, _, search_field = operators.pop()
+                        if operators and operators[-1][0] != "(":
+                            # The operator before the parentheses is skipped
+                            operators.pop()
+                            expect_operand = False
+                        else:
+                            empty_group_end = i
+                        continue
+                    operators.pop()
+                    expect_operand = False
+                while operators and operators[-1][0] != "(":
+                    reduce()
+                if not operators:
+                    # Recovery: the parenthesis is skipped
+                    self._error("Unbalanced parentheses", token.position)
+                    continue
+                _, _, search_field = operators.pop()
+                next_search_field = None
+                if type(operands[-1]) is list:  # pylint: disable=unidiomatic-typecheck
+                    operands[-1][4] = True  # type: ignore
+
             else:
-                combined_tokens.append(self.tokens[i])
-                i += 1
+                self._error("Unexpected character", token.position)
 
-        self.tokens = combined_tokens
+        if expect_operand:
+            end = tokens[-1].position[1] if tokens else len(self.query_str)
+            self._error("Missing term", (end, end))
+            # Recovery: the last operator (and open parentheses) are skipped
+            while operators and expect_operand:
+                if operators.pop()[0] != "(":
+                    expect_operand = False
+            if not operands:
+                raise search_query_exception.QuerySyntaxError(
+                    msg="Missing term", query_string=self.query_str, pos=(end, end)
+                )
+        while operators:
+            if operators[-1][0] == "(":
+                self._error("Unbalanced parentheses", operators[-1][1].position)
+                operators.pop()
+                continue
+            reduce()
+        return build(operands[0])
 
     def parse(self) -> Query:
-        """Parse the query."""
-        raise NotImplementedError(
-            "parse method must be implemented by inheriting classes"
+        """Parse a query string."""
+        self.tokenize()
+        query = self.parse_query_tree(self.tokens)
+        self.check_linter_messages()
+        return query
+
+    def check_linter_messages(self) -> None:
+        """Raise the first error (in strict mode)"""
+        if self.mode == "strict":
+            # Warnings do not stop the parser
+            for message in self.linter_messages:
+                if message["level"] == "error":
+                    raise search_query_exception.QuerySyntaxError(
+                        msg=message["msg"],
+                        query_string=self.query_str,
+                        pos=message["pos"],
+                    )
+
+    # pylint: disable=too-many-locals
+    def reparse(self, query: Query, span: tuple, replacement: str) -> Query:
+        """Parse the query_str again after an edit (incrementally).
+
+        query: result of the previous parse() or reparse() of the parser
+        span: replaced span of the (previous) query_str
+
+        Only the tokens around the edit are tokenized again and only the
+        innermost parentheses that contain the edit are parsed again. Other
+        nodes are reused. The query is updated in place and the (new) root
+        is returned.
+
+        The work per edit depends on the size of the parentheses, not on the
+        size of the query: the token list is spliced, and tokens and nodes after
+        the edit are shifted when their positions are read (the first call
+        prepares the positions of the query once). Edits that change the
+        parentheses around them (or are not in parentheses) parse the
+        query again (see benchmarks/bench_incremental_parse.py)."""
+
+        start, end = span
+        query_str = self.query_str[:start] + replacement + self.query_str[end:]
+        delta = len(replacement) - (end - start)
+        if (
+            type(self).tokenize is not QueryStringParser.tokenize
+            or not self._tokens
+            # Errors before the edit (lenient mode): unexpected characters
+            # and the recovery can change the tokens and the context
+            or any(
+                message["level"] == "error" and message["pos"][0] < end
+                for message in self.linter_messages
+            )
+        ):
+            return self._parse_again(query_str)
+        if self._anchor is None:
+            self._anchor = _PositionAnchor()
+            _anchor_positions(query, self._anchor)
+
+        first, old_stop, new_tokens = self._retokenize(
+            query_str, start, start + len(replacement), delta
         )
+        old_tokens = _TokenView(self)
+        # Skip the tokens (before the edit) that did not change
+        nr_equal = 0
+        while (
+            nr_equal < min(len(new_tokens), old_stop - first)
+            and new_tokens[nr_equal] == old_tokens[first + nr_equal]
+        ):
+            nr_equal += 1
+        first += nr_equal
+        new_tokens = new_tokens[nr_equal:]
+        new_stop = first + len(new_tokens)
+        tokens = _TokenView(self, first, old_stop, new_tokens, delta)
+
+        group = _find_group(tokens, first, new_stop)
+        if group is None:
+            return self._parse_again(query_str)
+        open_nr, close_nr = group
+        # Messages after the opening parenthesis are replaced
+        # (messages of the opening tokens can refer to the context)
+        inner_start = old_tokens[open_nr].position[1]
+        old_close_nr = close_nr - (new_stop - old_stop)
+        if _find_group(old_tokens, first, old_stop) != (open_nr, old_close_nr):
+            return self._parse_again(query_str)
+        prefix_search_field = (
+            self.PREFIX_SEARCH_FIELDS
+            and open_nr > 0
+            and tokens[open_nr - 1].type == TokenTypes.SEARCH_FIELD
+        )
+        if prefix_search_field:
+            open_nr -= 1
+        old_span = (
+            old_tokens[open_nr].position[0],
+            old_tokens[old_close_nr].position[1],
+        )
+
+        # Subtree of the parentheses in the previous query
+        terms = [
+            token.position[0]
+            for token in (old_tokens[nr] for nr in range(open_nr, old_close_nr))
+            if token.type == TokenTypes.SEARCH_TERM
+        ]
+        if not terms:
+            return self._parse_again(query_str)
+        old_group = _common_ancestor(
+            _find_leaf(query, terms[0], last=False),
+            _find_leaf(query, terms[-1], last=True),
+        )
+        search_field = None
+        if self.PREFIX_SEARCH_FIELDS and not prefix_search_field:
+            search_field = self._context_search_field(open_nr, old_group, old_span[0])
+
+        old_messages = self.linter_messages
+        self.query_str = query_str
+        self._splice_tokens(first, old_stop, new_tokens, delta)
+        self.linter_messages = []
+        try:
+            new_group = self.parse_query_tree(
+                [self._token(nr) for nr in range(open_nr, close_nr + 1)],
+                search_field=search_field,
+            )
+        except search_query_exception.QuerySyntaxError:
+            if self.mode != "strict":
+                # (e.g., empty parentheses, which are skipped in the context)
+                return self._parse_again(query_str)
+            self._merge_linter_messages(old_messages, inner_start, old_span[1], delta)
+            # The query was not updated: the next call parses the query again
+            self.tokens = []
+            raise
+        self._merge_linter_messages(old_messages, inner_start, old_span[1], delta)
+
+        # Nodes after the edit are shifted when their positions are read
+        parent = old_group.parent
+        index = None if parent is None else _child_index(parent, old_group)
+        if delta:
+            self._anchor = self._anchor.add_shift(end, delta)
+        _anchor_positions(new_group, self._anchor)
+        if parent is None:
+            query = new_group
+        else:
+            parent.children[index] = new_group  # type: ignore
+        if len(self._shift_nrs) > 64:
+            # (edits at many places)
+            self._apply_token_shifts()
+        try:
+            self.check_linter_messages()
+        except search_query_exception.QuerySyntaxError:
+            self.tokens = []
+            raise
+        return query
+
+    def _parse_again(self, query_str: str) -> Query:
+        self.query_str = query_str
+        self.linter_messages = []
+        self.tokenize()
+        query = self.parse_query_tree(self.tokens)
+        self.check_linter_messages()
+        return query
+
+    def _merge_linter_messages(
+        self, old_messages: typing.List[dict], start: int, end: int, delta: int
+    ) -> None:
+        """Replace the previous messages between start and end by the new messages
+        (and shift the previous messages after end)"""
+        kept = {
+            (message["msg"], message["pos"])
+            for message in old_messages
+            if message["pos"][0] < start
+        }
+        new_messages = [
+            message
+            for message in self.linter_messages
+            if (message["msg"], message["pos"]) not in kept
+        ]
+        self.linter_messages = [
+            message
+            if message["pos"][0] < start
+            else {
+                **message,
+                "pos": (message["pos"][0] + delta, message["pos"][1] + delta),
+            }
+            for message in old_messages
+            if not start <= message["pos"][0] < end
+        ]
+        self.linter_messages.extend(new_messages)
+        self.linter_messages.sort(key=lambda message: message["pos"][0])
+
+    def _retokenize(
+        self, query_str: str, start: int, new_end: int, delta: int
+    ) -> typing.Tuple[int, int, typing.List[Token]]:
+        """Tokenize the edited region again.
+
+        Returns the first token nr that was tokenized again, the (old) token nr
+        after the tokens that were tokenized again and the new tokens."""
+
+        old_tokens = _TokenView(self)
+        nr_tokens = len(old_tokens)
+        # Start before the edit, at a token that is not part of a combined term
+        first = _first_token_ending_after(old_tokens, start)
+        first = max(first - 1, 0)
+        while first > 0 and old_tokens[first].type == TokenTypes.SEARCH_TERM:
+            first -= 1
+        region_start = old_tokens[first].position[0] if first > 0 else 0
+
+        # Tokenize until a token (after the edit) matches a previous token
+        token_types = self._token_types
+        make = Token._make
+        new_tokens: typing.List[Token] = []
+        old_nr = first
+        old_stop = nr_tokens
+        for match in self.token_regex.finditer(query_str, region_start):  # type: ignore
+            token_type = token_types[match.lastgroup]  # type: ignore
+            match_start = match.start()
+            if match_start >= new_end and token_type != TokenTypes.SEARCH_TERM:
+                old_start = match_start - delta
+                while old_nr < nr_tokens and old_tokens[old_nr].position[0] < old_start:
+                    old_nr += 1
+                if (
+                    old_nr < nr_tokens
+                    and old_tokens[old_nr].position[0] == old_start
+                    and old_tokens[old_nr].type == token_type
+                ):
+                    old_stop = old_nr
+                    break
+            new_tokens.append(make((match.group(), token_type, match.span())))
+
+        if self.COMBINE_SUBSEQUENT_TERMS:
+            new_tokens = _combine_terms(new_tokens)
+        return first, old_stop, new_tokens
+
+    def _context_search_field(
+        self, token_nr: int, old_group: Query, group_start: int
+    ) -> typing.Optional[SearchField]:
+        """Search field of the parentheses around a token (prefix search fields)"""
+        # Terms of the previous group without a search field (or with the
+        # search field of the context) show the search field of the context
+        for node in old_group.walk():
+            if node.operator:
+                continue
+            search_field = node.search_field
+            if search_field is None:
+                return None
+            position = search_field.position
+            if position is not None and position[0] < group_start:
+                return search_field
+
+        tokens = self._tokens
+        closed = TokenTypes.PARENTHESIS_CLOSED
+        opened = TokenTypes.PARENTHESIS_OPEN
+        depth = 0
+        nr = token_nr
+        for token in itertools.islice(reversed(tokens), len(tokens) - token_nr, None):
+            nr -= 1
+            token_type = token.type
+            if token_type is closed:
+                depth += 1
+            elif token_type is opened:
+                if depth:
+                    depth -= 1
+                elif nr > 0 and tokens[nr - 1].type == TokenTypes.SEARCH_FIELD:
+                    # (messages of the search field were added before)
+                    nr_messages = len(self.linter_messages)
+                    search_field = self.translate_search_field(self._token(nr - 1))
+                    del self.linter_messages[nr_messages:]
+                    return search_field
+        return None
+
+
+class _TokenView:
+    """Tokens of a parser (with the shifts of previous edits), optionally
+    with the tokens first...old_stop-1 replaced by the new tokens of an edit
+    (and the tokens after them shifted by delta)"""
+
+    __slots__ = ("parser", "first", "old_stop", "new_tokens", "delta")
+
+    def __init__(
+        self,
+        parser: QueryStringParser,
+        first: int = 0,
+        old_stop: int = 0,
+        new_tokens: typing.Sequence[Token] = (),
+        delta: int = 0,
+    ) -> None:
+        self.parser = parser
+        self.first = first
+        self.old_stop = old_stop
+        self.new_tokens = new_tokens
+        self.delta = delta
+
+    def __len__(self) -> int:
+        return (
+            len(self.parser._tokens)
+            - (self.old_stop - self.first)
+            + len(self.new_tokens)
+        )
+
+    def __getitem__(self, nr: int) -> Token:
+        if nr < self.first:
+            return self.parser._token(nr)
+        nr -= self.first
+        if nr < len(self.new_tokens):
+            return self.new_tokens[nr]
+        token = self.parser._token(nr - len(self.new_tokens) + self.old_stop)
+        if not self.delta:
+            return token
+        start, end = token.position
+        return Token(token.value, token.type, (start + self.delta, end + self.delta))
+
+
+def _first_token_ending_after(tokens: typing.List[Token], pos: int) -> int:
+    """Nr of the first token that ends at or after pos (binary search)"""
+    low, high = 0, len(tokens)
+    while low < high:
+        middle = (low + high) // 2
+        if tokens[middle].position[1] < pos:
+            low = middle + 1
+        else:
+            high = middle
+    return low
+
+
+def _find_group(
+    tokens: typing.List[Token], first: int, stop: int
+) -> typing.Optional[typing.Tuple[int, int]]:
+    """Innermost parentheses (token nrs) around the tokens first...stop-1"""
+    open_nr = first
+    while True:
+        # Unmatched opening parenthesis before open_nr
+        depth = 0
+        for open_nr in range(open_nr - 1, -1, -1):
+            token_type = tokens[open_nr].type
+            if token_type == TokenTypes.PARENTHESIS_CLOSED:
+                depth += 1
+            elif token_type == TokenTypes.PARENTHESIS_OPEN:
+                if not depth:
+                    break
+                depth -= 1
+        else:
+            return None
+        if depth or tokens[open_nr].type != TokenTypes.PARENTHESIS_OPEN:
+            return None
+        # Matching closing parenthesis
+        depth = 0
+        for close_nr in range(open_nr + 1, len(tokens)):
+            token_type = tokens[close_nr].type
+            if token_type == TokenTypes.PARENTHESIS_OPEN:
+                depth += 1
+            elif token_type == TokenTypes.PARENTHESIS_CLOSED:
+                if not depth:
+                    break
+                depth -= 1
+        else:
+            return None
+        if close_nr >= stop:
+            return open_nr, close_nr
+        # The edit closes the parentheses: try the enclosing parentheses
+
+
+def _first_leaf_start(node: Query) -> int:
+    while node.children:
+        node = node.children[0]
+    return node.position[0]  # type: ignore
+
+
+def _find_leaf(query: Query, pos: int, *, last: bool) -> Query:
+    """First (or last) leaf that starts at pos (binary search)"""
+    node = query
+    while node.children:
+        children = node.children
+        # Nr of children that start before pos (or at pos, for the last leaf)
+        low, high = 0, len(children)
+        while low < high:
+            middle = (low + high) // 2
+            child_start = _first_leaf_start(children[middle])
+            if child_start < pos or (last and child_start == pos):
+                low = middle + 1
+            else:
+                high = middle
+        if last or low == len(children) or _first_leaf_start(children[low]) != pos:
+            low -= 1
+        node = children[max(low, 0)]
+    return node
+
+
+def _child_index(parent: Query, child: Query) -> int:
+    """Index of a child (binary search by the position of the first leaf)"""
+    children = parent.children
+    pos = _first_leaf_start(child)
+    low, high = 0, len(children)
+    while low < high:
+        middle = (low + high) // 2
+        if _first_leaf_start(children[middle]) < pos:
+            low = middle + 1
+        else:
+            high = middle
+    if low < len(children) and children[low] is child:
+        return low
+    return next(nr for nr, node in enumerate(children) if node is child)
+
+
+def _common_ancestor(first: Query, second: Query) -> Query:
+    ancestors = set()
+    node: typing.Optional[Query] = first
+    while node is not None:
+        ancestors.add(id(node))
+        node = node.parent
+    node = second
+    while id(node) not in ancestors:
+        node = node.parent  # type: ignore
+    return node  # type: ignore
 
 
 class QueryListParser:
-    """QueryListParser"""
+    """QueryListParser
+
+    Lines are tokenized once. References to other lines (e.g., #1) are
+    matched as whole tokens (see get_token_str()) and the referenced lines
+    are parsed first (in topological order). Their query trees are inserted
+    into the referencing lines (instead of replacing strings)."""
 
     LIST_ITEM_REGEX = r"^(\d+).\s+(.*)$"
 
-    def __init__(self, query_list: str, parser_class: type[QueryStringParser]) -> None:
+    def __init__(
+        self,
+        query_list: str,
+        parser_class: type[QueryStringParser],
+        mode: str = "strict",
+    ) -> None:
         self.query_list = query_list
         self.parser_class = parser_class
+        self.mode = mode
+        self.lines: typing.Dict[str, dict] = {}
+        self.linter_messages: typing.List[dict] = []
 
     def parse_dict(self) -> dict:
         """Tokenize the query_list."""
@@ -131,6 +955,7 @@ class QueryListParser:
         previous = 0
         for line in query_list.split("\n"):
             if line.strip() == "":
+                previous += len(line) + 1
                 continue
 
             match = re.match(self.LIST_ITEM_REGEX, line)
@@ -155,86 +980,156 @@ class QueryListParser:
             "get_token_str method must be implemented by inheriting classes"
         )
 
-    def _replace_token_nr_by_query(
-        self, query_list: list, token_nr: str, token_content: dict
-    ) -> None:
-        for i, (content, pos) in enumerate(query_list):
-            token_str = self.get_token_str(token_nr)
-            if token_str in content:
-                query_list.pop(i)
-
-                content_before = content[: content.find(token_str)]
-                content_before_pos = (pos[0], pos[0] + len(content_before))
-                content_after = content[content.find(token_str) + len(token_str) :]
-                content_after_pos = (
-                    content_before_pos[1] + len(token_str),
-                    content_before_pos[1] + len(content_after) + len(token_str),
-                )
+    def tokenize_line(self, line: dict) -> QueryStringParser:
+        """Tokenize a line (token positions refer to the query_list)."""
+        parser = self.parser_class(line["node_content"], mode=self.mode)
+        parser.tokenize()
+        offset = line["content_pos"][0]
+        parser.tokens = [
+            token._replace(
+                position=(token.position[0] + offset, token.position[1] + offset)
+            )
+            for token in parser.tokens
+        ]
+        # Errors are reported for the query_list
+        parser.query_str = self.query_list
+        return parser
 
-                new_content = token_content["node_content"]
-                new_pos = token_content["content_pos"]
+    def _raise(self, msg: str, pos: tuple) -> typing.NoReturn:
+        self.linter_messages.append({"level": "error", "msg": msg, "pos": pos})
+        raise search_query_exception.QuerySyntaxError(
+            msg=msg, query_string=self.query_list, pos=pos
+        )
 
-                if content_after:
-                    query_list.insert(i, (content_after, content_after_pos))
+    def _error(self, msg: str, pos: tuple) -> None:
+        """Add an error (raised in strict mode, the parser recovers otherwise)"""
+        if self.mode == "strict":
+            self._raise(msg, pos)
+        self.linter_messages.append({"level": "error", "msg": msg, "pos": pos})
 
-                # Insert the sub-query from the list with "artificial parentheses"
-                # (positions with length 0)
-                query_list.insert(i, (")", (-1, -1)))
-                query_list.insert(i, (new_content, new_pos))
-                query_list.insert(i, ("(", (-1, -1)))
+    def sort_lines(
+        self,
+    ) -> typing.Tuple[
+        typing.Dict[str, str], typing.Dict[str, QueryStringParser], typing.List[str]
+    ]:
+        """Tokenize the lines that are reachable from the last line (the query)
+        and sort them topologically (references first, without recursion).
 
-                if content_before:
-                    query_list.insert(i, (content_before, content_before_pos))
+        Returns the references (token string: line nr), the parsers of the
+        lines (with tokens) and the order of the line nrs."""
 
-                break
+        self.lines = lines = self.parse_dict()
+        if not lines:
+            self._raise("Missing query", (0, len(self.query_list)))
+        references = {self.get_token_str(node_nr): node_nr for node_nr in lines}
 
-    def dict_to_positioned_list(self, tokens: dict) -> list:
-        """Convert a node to a positioned list."""
+        parsers: typing.Dict[str, QueryStringParser] = {}
+        order: typing.List[str] = []
+        in_progress: typing.Set[str] = set()
+        stack = [(list(lines)[-1], False)]
+        while stack:
+            node_nr, dependencies_done = stack.pop()
+            if dependencies_done:
+                in_progress.discard(node_nr)
+                order.append(node_nr)
+                continue
+            if node_nr in parsers:
+                continue
+            parser = self.tokenize_line(lines[node_nr])
+            parsers[node_nr] = parser
+            in_progress.add(node_nr)
+            stack.append((node_nr, True))
+            for token in parser.tokens:
+                if token.type != TokenTypes.SEARCH_TERM:
+                    continue
+                reference = references.get(token.value)
+                if reference is None:
+                    continue
+                if reference in in_progress:
+                    # Recovery: the reference remains a term
+                    self._error("Circular reference", token.position)
+                    continue
+                if reference not in parsers:
+                    stack.append((reference, False))
+        return references, parsers, order
 
-        root_node = list(tokens.values())[-1]
-        query_list = [(root_node["node_content"], root_node["content_pos"])]
+    def expand(self) -> typing.Tuple[str, SourceMap]:
+        """Expand the query list to a search string.
 
-        for token_nr, token_content in reversed(tokens.items()):
-            # iterate over query_list if token_nr is in the content,
-            # split the content and insert the token_content, updating the content_pos
-            self._replace_token_nr_by_query(query_list, token_nr, token_content)
+        References are replaced by the (parenthesized) referenced lines.
+        The source map relates positions in the search string to
+        positions in the query_list."""
 
-        return query_list
+        references, parsers, order = self.sort_lines()
+        query_list = self.query_list
+        # Pieces of the expanded lines:
+        # (string, original start, original end, inserted)
+        expanded: typing.Dict[str, typing.List[tuple]] = {}
+        for node_nr in order:
+            parser = parsers[node_nr]
+            pieces: typing.List[tuple] = []
+            cursor, end = self.lines[node_nr]["content_pos"]
+            for token in parser.tokens:
+                reference = references.get(token.value)
+                if reference not in expanded or token.type != TokenTypes.SEARCH_TERM:
+                    continue
+                start, stop = token.position
+                pieces.append((query_list[cursor:start], cursor, start, False))
+                pieces.append(("(", start, stop, True))
+                pieces.extend(expanded[reference])
+                pieces.append((")", start, stop, True))
+                cursor = stop
+            pieces.append((query_list[cursor:end], cursor, end, False))
+            expanded[node_nr] = pieces
+
+        source_map = SourceMap()
+        position = 0
+        for string, original_start, original_end, inserted in expanded[order[-1]]:
+            if not string:
+                continue
+            source_map.add_segment(
+                position,
+                position + len(string),
+                original_start,
+                original_end,
+                inserted=inserted,
+            )
+            position += len(string)
+        return "".join(piece[0] for piece in expanded[order[-1]]), source_map
 
     def parse(self) -> Query:
         """Parse the query in list format."""
 
-        tokens = self.parse_dict()
+        references, parsers, order = self.sort_lines()
+        reference_errors = {message["pos"] for message in self.linter_messages}
 
-        query_list = self.dict_to_positioned_list(tokens)
-        query_string = "".join([query[0] for query in query_list])
+        # Parse the lines (each sub-query is inserted once, copies are used
+        # for further references)
+        subqueries: typing.Dict[str, Query] = {}
+        inserted: typing.Set[str] = set()
 
-        try:
-            query = self.parser_class(query_string).parse()
-
-        except search_query_exception.QuerySyntaxError as exc:
-            # Correct positions and query string
-            # to display the error for the original (list) query
-            new_pos = exc.pos
-            for content, pos in query_list:
-                # Note: artificial parentheses cannot be ignored here
-                # because they were counted in teh query_string
-                segment_length = len(content)
-
-                if new_pos[0] - segment_length >= 0:
-                    new_pos = (new_pos[0] - segment_length, new_pos[1] - segment_length)
-                    continue
-                segment_beginning = pos[0]
-                new_pos = (
-                    new_pos[0] + segment_beginning,
-                    new_pos[1] + segment_beginning,
-                )
-                exc.pos = new_pos
-                break
+        def resolve_reference(token: Token) -> typing.Optional[Query]:
+            reference = references.get(token.value)
+            if reference not in subqueries:
+                return None
+            if reference in inserted:
+                return subqueries[reference].copy()
+            inserted.add(reference)
+            return subqueries[reference]
 
-            exc.query_string = self.query_list
-            raise search_query_exception.QuerySyntaxError(
-                msg="", query_string=self.query_list, pos=exc.pos
-            )
+        for node_nr in order:
+            parser = parsers[node_nr]
+            try:
+                subqueries[node_nr] = parser.parse_query_tree(
+                    parser.tokens, resolve_reference=resolve_reference
+                )
+            finally:
+                # (without messages of references that are reported as errors)
+                self.linter_messages.extend(
+                    message
+                    for message in parser.linter_messages
+                    if message["pos"] not in reference_errors
+                )
+            parser.check_linter_messages()
 
-        return query
+        return subqueries[order[-1]]
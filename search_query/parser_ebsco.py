@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""EBSCO query parser."""
+from __future__ import annotations
+
+import typing
+
+from search_query.constants import Fields
+from search_query.constants import Operators
+from search_query.constants import PLATFORM
+from search_query.constants import PLATFORM_FIELD_TRANSLATION_MAP
+from search_query.constants import TokenTypes
+from search_query.parser_base import QueryListParser
+from search_query.parser_base import QueryStringParser
+from search_query.parser_base import Token
+from search_query.query import Query
+from search_query.query import SearchField
+
+
+class EBSCOParser(QueryStringParser):
+    """Parser for EBSCO queries (e.g., CINAHL)."""
+
+    FIELD_TRANSLATION_MAP = PLATFORM_FIELD_TRANSLATION_MAP[PLATFORM.EBSCO]
+
+    # Field codes are followed by a space (e.g., TI "digital health")
+    SEARCH_FIELD_REGEX = r"(?:TX|TI|AB|SU|MH)(?=\s)"
+    # Operators are capitalized (e.g., "and" is part of a term)
+    LOGIC_OPERATOR_REGEX = r'(?:AND|OR|NOT)(?=[\s()"]|$)'
+    # Near (N5: any order) and within (W5: in the order entered)
+    PROXIMITY_OPERATOR_REGEX = r'[NW]\d+(?=[\s()"]|$)'
+    SEARCH_TERM_REGEX = r'"[^"]*"|[^\s()"]+'
+
+    TOKEN_PATTERNS = {
+        TokenTypes.LOGIC_OPERATOR: LOGIC_OPERATOR_REGEX,
+        TokenTypes.PROXIMITY_OPERATOR: PROXIMITY_OPERATOR_REGEX,
+        TokenTypes.SEARCH_FIELD: SEARCH_FIELD_REGEX,
+        TokenTypes.PARENTHESIS_OPEN: r"\(",
+        TokenTypes.PARENTHESIS_CLOSED: r"\)",
+        TokenTypes.SEARCH_TERM: SEARCH_TERM_REGEX,
+        TokenTypes.UNKNOWN: r"\S",
+    }
+
+    # Subsequent terms (without operator) are combined
+    COMBINE_SUBSEQUENT_TERMS = True
+
+    # Proximity operators bind first,
+    # Boolean operators are applied from left to right
+    PRECEDENCE = {
+        Operators.NEAR: 1,
+        Operators.NOT: 0,
+        Operators.AND: 0,
+        Operators.OR: 0,
+    }
+
+    def is_search_field(self, token: str) -> bool:
+        """Token is search field"""
+        return token.strip() + " " in self.FIELD_TRANSLATION_MAP
+
+    def translate_search_field(self, token: Token) -> SearchField:
+        """Translate a search field code to the standard search field."""
+        return SearchField(
+            self.FIELD_TRANSLATION_MAP[token.value + " "], position=token.position
+        )
+
+    def parse_operator(self, token: Token) -> typing.Tuple[str, typing.Optional[int]]:
+        """Operator and near param of an operator token"""
+        if token.type != TokenTypes.PROXIMITY_OPERATOR:
+            return token.value, None
+        if token.value[0] == "W":
+            self.add_linter_message(
+                "Order of terms is not kept (W is parsed as N)",
+                token.position,
+                level="warning",
+            )
+        return Operators.NEAR, int(token.value[1:])
+
+    def create_term(
+        self, token: Token, search_field: typing.Optional[SearchField]
+    ) -> Query:
+        """Create the node of a search term.
+
+        Terms without field code are searched in the default fields."""
+        if search_field is None:
+            search_field = SearchField.intern(Fields.ALL)
+        return super().create_term(token, search_field)
+
+
+class EBSCOListParser(QueryListParser):
+    """Parser for EBSCO (list format) queries."""
+
+    def __init__(self, query_list: str, mode: str = "strict") -> None:
+        super().__init__(query_list, EBSCOParser, mode=mode)
+
+    def get_token_str(self, token_nr: str) -> str:
+        return f"S{token_nr}"
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Pre-notation query parser."""
+from __future__ import annotations
+
+import re
+import sys
+import typing
+
+import search_query.exception as search_query_exception
+from search_query.parser_base import OPERATOR_CLASSES
+from search_query.parser_base import QueryStringParser
+from search_query.query import _build_query
+from search_query.query import Query
+from search_query.query import SearchField
+
+
+class PreNotationParser(QueryStringParser):
+    """Parser for pre-notation queries (see Query.to_string("pre_notation")).
+
+    Format: value[search field](near param)[child, child, ...]
+    Operators have no search field, terms have no children.
+    The string is parsed in a single pass (without recursion)."""
+
+    # Node: operator (with near param, followed by the children)
+    # or term (with search field).
+    # Terms can contain quoted phrases, commas (not followed by a space)
+    # and parentheses.
+    NODE_REGEX = re.compile(
+        r"(AND|OR|NOT|NEAR)(?:\((\d+)\))?\["
+        r'|((?:"[^"]*"|[^\[\],"]|,(?! ))+)(?:\[([^\[\]]*)\])?'
+    )
+
+    def is_search_field(self, token: str) -> bool:
+        """Token is search field"""
+        return token.startswith("[") and token.endswith("]")
+
+    def parse(self) -> Query:
+        """Parse a query string."""
+
+        query_str = self.query_str
+        length = len(query_str)
+        pos = 0
+        # Open operators: (class, value, position, near param, children)
+        stack: typing.List[tuple] = []
+        while True:
+            match = self.NODE_REGEX.match(query_str, pos)
+            if not match:
+                if pos < length or not stack:
+                    self._raise("Missing term or operator", (pos, pos + 1))
+                # Lenient mode: the operators that are open at the end are closed
+                self._error("Missing term or operator", (pos, pos))
+                return self._close_operators(stack)
+            pos = match.end()
+            operator, near_param, value, search_field = match.groups()
+            if operator:
+                stack.append(
+                    (
+                        OPERATOR_CLASSES[operator],
+                        sys.intern(operator),
+                        match.span(1),
+                        None if near_param is None else int(near_param),
+                        [],
+                    )
+                )
+                continue
+
+            if query_str.startswith("[", pos):
+                self._raise("Invalid search field", (pos, length))
+            node = _build_query(
+                Query,
+                sys.intern(value),
+                operator=False,
+                search_field=None
+                if search_field is None
+                else SearchField.intern(search_field),
+                children=[],
+                position=match.span(3),
+            )
+
+            # Close operators (until the next sibling or the end of the string)
+            while True:
+                if not stack:
+                    if pos != length:
+                        # Lenient mode: the characters are skipped
+                        self._error("Unexpected characters", (pos, length))
+                    self.check_linter_messages()
+                    return node
+                stack[-1][4].append(node)
+                if query_str.startswith(", ", pos):
+                    pos += 2
+                    break
+                if not query_str.startswith("]", pos):
+                    if pos < length:
+                        self._raise("Missing closing bracket", (pos, pos + 1))
+                    self._error("Missing closing bracket", (pos, pos))
+                    return self._close_operators(stack)
+                pos += 1
+                node = self._build_operator(stack.pop())
+
+    @staticmethod
+    def _build_operator(operator: tuple) -> Query:
+        query_class, value, position, near_param, children = operator
+        node = _build_query(
+            query_class,
+            value,
+            operator=True,
+            search_field=None,
+            children=children,
+            position=position,
+        )
+        if near_param is not None:
+            node.near_param = near_param  # type: ignore
+        return node
+
+    def _close_operators(self, stack: typing.List[tuple]) -> Query:
+        """Close the open operators (lenient mode, at the end of the string)"""
+        node: typing.Optional[Query] = None
+        while stack:
+            operator = stack.pop()
+            if node is not None:
+                operator[4].append(node)
+            # (operators without children are skipped)
+            node = self._build_operator(operator) if operator[4] else None
+        if node is None:
+            # (nothing to recover: the error was added)
+            message = self.linter_messages[-1]
+            raise search_query_exception.QuerySyntaxError(
+                msg=message["msg"], query_string=self.query_str, pos=message["pos"]
+            )
+        return node
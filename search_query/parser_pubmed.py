@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""Pubmed query parser."""
+from __future__ import annotations
+
+import sys
+import typing
+
+from search_query.constants import Fields
+from search_query.constants import Operators
+from search_query.constants import PLATFORM
+from search_query.constants import PLATFORM_COMBINED_FIELDS_MAP
+from search_query.constants import PLATFORM_FIELD_TRANSLATION_MAP
+from search_query.constants import TokenTypes
+from search_query.or_query import OrQuery
+from search_query.parser_base import QueryListParser
+from search_query.parser_base import QueryStringParser
+from search_query.parser_base import Token
+from search_query.query import _build_query
+from search_query.query import Query
+from search_query.query import SearchField
+
+
+class PubmedParser(QueryStringParser):
+    """Parser for Pubmed queries."""
+
+    FIELD_TRANSLATION_MAP = PLATFORM_FIELD_TRANSLATION_MAP[PLATFORM.PUBMED]
+    COMBINED_FIELDS_MAP = PLATFORM_COMBINED_FIELDS_MAP[PLATFORM.PUBMED]
+
+    # Less common tags that are replaced by the default tag (n:1 matches)
+    FIELD_ALIASES = {
+        "[all fields]": "[all]",
+        "[title]": "[ti]",
+        "[abstract]": "[ab]",
+        "[title/abstract]": "[tiab]",
+        "[mesh]": "[mh]",
+        "[mesh terms]": "[mh]",
+    }
+
+    SEARCH_FIELD_REGEX = r"\[[^\[\]]*\]"
+    # Operators are capitalized (e.g., "and" is part of a term)
+    LOGIC_OPERATOR_REGEX = r'(?:AND|OR|NOT)(?=[\s()"]|$)'
+    SEARCH_TERM_REGEX = r'"[^"]*"|[^\s()"\[\]]+'
+
+    TOKEN_PATTERNS = {
+        TokenTypes.SEARCH_FIELD: SEARCH_FIELD_REGEX,
+        TokenTypes.LOGIC_OPERATOR: LOGIC_OPERATOR_REGEX,
+        TokenTypes.PARENTHESIS_OPEN: r"\(",
+        TokenTypes.PARENTHESIS_CLOSED: r"\)",
+        TokenTypes.SEARCH_TERM: SEARCH_TERM_REGEX,
+        TokenTypes.UNKNOWN: r"\S",
+    }
+
+    # Subsequent terms (without operator) are combined
+    COMBINE_SUBSEQUENT_TERMS = True
+
+    # Pubmed applies the operators from left to right
+    PRECEDENCE = {
+        Operators.NOT: 0,
+        Operators.AND: 0,
+        Operators.OR: 0,
+    }
+    PREFIX_SEARCH_FIELDS = False
+
+    def is_search_field(self, token: str) -> bool:
+        """Token is search field"""
+        return token.startswith("[") and token.endswith("]")
+
+    def translate_search_field(self, token: Token) -> SearchField:
+        """Translate a search field tag to the standard search field.
+
+        Combined fields (e.g., [tiab]) keep their tag (see create_term())."""
+        tag = "[" + " ".join(token.value[1:-1].split()).lower() + "]"
+        tag = self.FIELD_ALIASES.get(tag, tag)
+        if tag in self.COMBINED_FIELDS_MAP:
+            return SearchField(tag, position=token.position)
+        if tag not in self.FIELD_TRANSLATION_MAP:
+            self.add_linter_message(
+                f"Search field not supported ({tag})", token.position
+            )
+            return SearchField(tag, position=token.position)
+        return SearchField(self.FIELD_TRANSLATION_MAP[tag], position=token.position)
+
+    def create_term(
+        self, token: Token, search_field: typing.Optional[SearchField]
+    ) -> Query:
+        """Create the node of a search term.
+
+        Terms without search field are searched in all fields.
+        Terms with a combined field (e.g., term[tiab]) are expanded when they
+        are created: (term[ti] OR term[ab])."""
+        if search_field is None:
+            search_field = SearchField.intern(Fields.ALL)
+        fields = self.COMBINED_FIELDS_MAP.get(search_field.value)
+        if fields is None:
+            return super().create_term(token, search_field)
+
+        value = sys.intern(token.value)
+        return _build_query(
+            OrQuery,
+            Operators.OR,
+            operator=True,
+            search_field=None,
+            children=[
+                _build_query(
+                    Query,
+                    value,
+                    operator=False,
+                    search_field=SearchField(field, position=search_field.position),
+                    children=[],
+                    position=token.position,
+                )
+                for field in fields
+            ],
+            position=token.position,
+        )
+
+
+class PubmedListParser(QueryListParser):
+    """Parser for Pubmed (list format) queries."""
+
+    def __init__(self, query_list: str, mode: str = "strict") -> None:
+        super().__init__(query_list, PubmedParser, mode=mode)
+
+    def get_token_str(self, token_nr: str) -> str:
+        return f"#{token_nr}"
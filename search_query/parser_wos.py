@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""Web-of-Science query parser."""
+from __future__ import annotations
+
+import re
+import typing
+
+from search_query.constants import Operators
+from search_query.constants import PLATFORM
+from search_query.constants import PLATFORM_FIELD_TRANSLATION_MAP
+from search_query.constants import TokenTypes
+from search_query.parser_base import QueryListParser
+from search_query.parser_base import QueryStringParser
+from search_query.parser_base import Token
+from search_query.query import SearchField
+
+# Default distance of NEAR (without /x)
+DEFAULT_NEAR_DISTANCE = 15
+
+
+class WOSParser(QueryStringParser):
+    """Parser for Web-of-Science queries."""
+
+    FIELD_TRANSLATION_MAP = PLATFORM_FIELD_TRANSLATION_MAP[PLATFORM.WOS]
+
+    SEARCH_FIELD_REGEX = r"[A-Za-z]{2,3}\s*="
+    # Operators are followed by whitespace, a parenthesis or a quote
+    # (e.g., "AND-related" is a term)
+    LOGIC_OPERATOR_REGEX = r'(?i:AND|OR|NOT)(?=[\s()"]|$)'
+    PROXIMITY_OPERATOR_REGEX = r'(?i:NEAR|SAME)(?:/\d+)?(?=[\s()"]|$)'
+    SEARCH_TERM_REGEX = r'"[^"]*"|[^\s()"]+'
+
+    TOKEN_PATTERNS = {
+        TokenTypes.SEARCH_FIELD: SEARCH_FIELD_REGEX,
+        TokenTypes.LOGIC_OPERATOR: LOGIC_OPERATOR_REGEX,
+        TokenTypes.PROXIMITY_OPERATOR: PROXIMITY_OPERATOR_REGEX,
+        TokenTypes.PARENTHESIS_OPEN: r"\(",
+        TokenTypes.PARENTHESIS_CLOSED: r"\)",
+        TokenTypes.SEARCH_TERM: SEARCH_TERM_REGEX,
+        TokenTypes.UNKNOWN: r"\S",
+    }
+
+    # Subsequent terms (without operator) are combined
+    COMBINE_SUBSEQUENT_TERMS = True
+
+    # Binding power of the operators
+    # (WOS precedence: NEAR, SAME, NOT, AND, OR)
+    PRECEDENCE = {
+        Operators.NEAR: 4,
+        Operators.NOT: 3,
+        Operators.AND: 2,
+        Operators.OR: 1,
+    }
+
+    _search_field_regex = re.compile(SEARCH_FIELD_REGEX)
+
+    def is_search_field(self, token: str) -> bool:
+        """Token is search field"""
+        return bool(self._search_field_regex.fullmatch(token))
+
+    def translate_search_field(self, token: Token) -> SearchField:
+        """Translate a search field tag to the standard search field."""
+        tag = "".join(token.value.split()).upper()
+        if tag not in self.FIELD_TRANSLATION_MAP:
+            self.add_linter_message(
+                f"Search field not supported ({tag})", token.position
+            )
+            return SearchField(tag, position=token.position)
+        return SearchField(self.FIELD_TRANSLATION_MAP[tag], position=token.position)
+
+    def parse_operator(self, token: Token) -> typing.Tuple[str, typing.Optional[int]]:
+        """Operator and near param of an operator token"""
+        value = token.value.upper()
+        if token.type != TokenTypes.PROXIMITY_OPERATOR:
+            return value, None
+        operator, _, distance = value.partition("/")
+        if operator != Operators.NEAR:
+            self._error(f"Operator not supported ({operator})", token.position)
+        return Operators.NEAR, int(distance) if distance else DEFAULT_NEAR_DISTANCE
+
+
+class WOSListParser(QueryListParser):
+    """Parser for Web-of-Science (list format) queries."""
+
+    def __init__(self, query_list: str, mode: str = "strict") -> None:
+        super().__init__(query_list, WOSParser, mode=mode)
+
+    def get_token_str(self, token_nr: str) -> str:
+        return f"#{token_nr}"
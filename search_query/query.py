@@ -2,21 +2,96 @@
 """Query class."""
 from __future__ import annotations
 
+import io
+import sys
 import typing
 from abc import ABC
 
 from search_query.constants import Operators
 from search_query.constants import PLATFORM
-from search_query.serializer_pre_notation import to_string_pre_notation
-from search_query.serializer_pubmed import to_string_pubmed
-from search_query.serializer_structured import to_string_structured
-from search_query.serializer_wos import to_string_wos
+from search_query.registry import Registry
+from search_query.traversal import iter_postorder
+from search_query.traversal import iter_preorder
+from search_query.traversal import MultiVisitor
+from search_query.traversal import QueryVisitor
+from search_query.traversal import traverse
+
+if typing.TYPE_CHECKING:  # pragma: no
+    from search_query.serializer_base import SerializerVisitor
+
+# Serializers are imported on first use
+# (plugins: entry points "search_query.serializers")
+SERIALIZERS = Registry(
+    "search_query.serializers",
+    {
+        PLATFORM.PRE_NOTATION.value: "search_query.serializer_pre_notation:PreNotationVisitor",
+        PLATFORM.STRUCTURED.value: "search_query.serializer_structured:StructuredVisitor",
+        PLATFORM.WOS.value: "search_query.serializer_wos:WOSVisitor",
+        PLATFORM.PUBMED.value: "search_query.serializer_pubmed:PubmedVisitor",
+    },
+)
 
 # pylint: disable=too-few-public-methods
 
 
+class _PositionAnchor:
+    """Point in the edits of a query string (see QueryStringParser.reparse())
+
+    Positions of parsed nodes can refer to an anchor: (start, end, anchor).
+    Edits after the anchor are applied when the position is read, so an edit
+    does not visit the nodes after it."""
+
+    __slots__ = ("shift", "next")
+
+    def __init__(self) -> None:
+        # Edit (positions at or after pos are shifted by delta) and next anchor
+        self.shift: typing.Optional[typing.Tuple[int, int]] = None
+        self.next: typing.Optional[_PositionAnchor] = None
+
+    def add_shift(self, pos: int, delta: int) -> _PositionAnchor:
+        """records an edit and returns the anchor after it"""
+        self.shift = (pos, delta)
+        self.next = _PositionAnchor()
+        return self.next
+
+
+def _resolve_position(position: tuple) -> tuple:
+    """applies the edits after the anchor of a position (start, end, anchor)"""
+    start, end, anchor = position
+    if anchor.next is None:
+        return position
+    while anchor.next is not None:
+        pos, delta = anchor.shift
+        if start >= pos:
+            start += delta
+            end += delta
+        anchor = anchor.next
+    return (start, end, anchor)
+
+
+def _anchor_positions(query: Query, anchor: _PositionAnchor) -> None:
+    """refers the positions of the nodes and search fields to the anchor"""
+    for node in iter_preorder(query):
+        position = node._position
+        if position is not None and len(position) == 2:
+            node._position = (position[0], position[1], anchor)
+        search_field = node._search_field
+        if search_field is not None and not search_field._is_interned():
+            position = search_field._position
+            if position is not None and len(position) == 2:
+                search_field._position = (position[0], position[1], anchor)
+
+
 class SearchField:
-    """SearchField class."""
+    """SearchField class.
+
+    The value is read-only (cached hashes and strings of the nodes depend on
+    it): the search field of a node is changed by replacing it."""
+
+    __slots__ = ("_value", "_position")
+
+    # Shared instances (without position), one per field code
+    _interned: typing.ClassVar[typing.Dict[str, SearchField]] = {}
 
     def __init__(
         self,
@@ -25,16 +100,206 @@ class SearchField:
         position: typing.Optional[tuple] = None,
     ) -> None:
         """init method"""
-        self.value = value
-        self.position = position
+        self._value = value
+        self._position = position
+
+    @property
+    def value(self) -> str:
+        """field code (read-only)"""
+        return self._value
+
+    @property
+    def position(self) -> typing.Optional[tuple]:
+        """position (start, end) in the query string"""
+        position = self._position
+        if position is not None and len(position) == 3:
+            resolved = _resolve_position(position)
+            if resolved is not position:
+                self._position = resolved
+            return resolved[:2]
+        return position
+
+    @position.setter
+    def position(self, position: typing.Optional[tuple]) -> None:
+        self._position = position
 
     def __str__(self) -> str:
-        return self.value
+        return self._value
+
+    @classmethod
+    def intern(cls, value: str) -> SearchField:
+        """returns the shared SearchField for the value (immutable)"""
+        try:
+            return SearchField._interned[value]
+        except KeyError:
+            # setdefault: threads share one instance per value
+            return SearchField._interned.setdefault(value, _InternedSearchField(value))
+
+    def _is_interned(self) -> bool:
+        return False
+
+
+class _InternedSearchField(SearchField):
+    """Shared SearchField (without position), which cannot be modified"""
+
+    __slots__ = ()
+
+    def __init__(self, value: str) -> None:  # pylint: disable=super-init-not-called
+        object.__setattr__(self, "_value", value)
+        object.__setattr__(self, "_position", None)
+
+    def __setattr__(self, name: str, value: typing.Any) -> None:
+        raise AttributeError("Interned search fields cannot be modified")
+
+    def __reduce__(self) -> tuple:
+        return (SearchField.intern, (self.value,))
+
+    def _is_interned(self) -> bool:
+        return True
+
+
+class _QueryChildren(list):
+    """List of child nodes, which keeps parents and cached hashes consistent"""
+
+    __slots__ = ("owner",)
+
+    owner: Query
+
+    def __reduce__(self) -> tuple:
+        return (_restore_query_children, (self.owner, list(self)))
+
+    def _attach(self, children: typing.List[Query]) -> typing.List[Query]:
+        children = self.owner._prepare_children(children, replaced=[])
+        for child in children:
+            if not child._is_interned():
+                child.parent = self.owner
+        self.owner._invalidate()
+        return children
+
+    def _detach(self, children: typing.Iterable[Query]) -> None:
+        for child in children:
+            if child.parent is self.owner:
+                child.parent = None
+        self.owner._invalidate()
+
+    def append(self, child: Query) -> None:
+        super().append(self._attach([child])[0])
+
+    def extend(self, children: typing.Iterable[Query]) -> None:
+        super().extend(self._attach(list(children)))
+
+    def __iadd__(self, children: typing.Iterable[Query]) -> _QueryChildren:  # type: ignore
+        self.extend(children)
+        return self
+
+    def __imul__(self, times: int) -> _QueryChildren:  # type: ignore
+        if times > 1 and self:
+            raise ValueError("Building Query Tree failed")
+        if times < 1:
+            self.clear()
+        return self
+
+    def insert(self, index: typing.SupportsIndex, child: Query) -> None:
+        super().insert(index, self._attach([child])[0])
+
+    def __setitem__(self, index: typing.Any, value: typing.Any) -> None:
+        new_children = list(value) if isinstance(index, slice) else [value]
+        old_children = self[index] if isinstance(index, slice) else [self[index]]
+        new_children = self.owner._prepare_children(new_children, replaced=old_children)
+        super().__setitem__(
+            index, new_children if isinstance(index, slice) else new_children[0]
+        )
+        self._detach(old_children)
+        for child in new_children:
+            if not child._is_interned():
+                child.parent = self.owner
+
+    def __delitem__(self, index: typing.Any) -> None:
+        old_children = self[index] if isinstance(index, slice) else [self[index]]
+        super().__delitem__(index)
+        self._detach(old_children)
+
+    def remove(self, child: Query) -> None:
+        # (by identity: equal siblings are different nodes)
+        for index, node in enumerate(self):
+            if node is child:
+                del self[index]
+                return
+        raise ValueError("Query is not a child")
+
+    def pop(self, index: typing.SupportsIndex = -1) -> Query:
+        child = self[index]
+        del self[index]
+        return child
+
+    def clear(self) -> None:
+        del self[:]
+
+    def sort(self, *args: typing.Any, **kwargs: typing.Any) -> None:
+        super().sort(*args, **kwargs)
+        self.owner._invalidate()
+
+    def reverse(self) -> None:
+        super().reverse()
+        self.owner._invalidate()
+
+
+def _restore_query_children(owner: Query, children: list) -> _QueryChildren:
+    """restores the children (for pickle/copy), parents are restored by the nodes"""
+    query_children = _QueryChildren()
+    query_children.owner = owner
+    list.extend(query_children, children)
+    return query_children
+
+
+def _build_query(
+    query_class: typing.Type[Query],
+    value: str,
+    *,
+    operator: bool,
+    search_field: typing.Optional[SearchField],
+    children: typing.List[Query],
+    position: typing.Optional[tuple],
+) -> Query:
+    """builds a node without validation (for loaders)
+
+    The value must be interned and the children must be new nodes
+    without parent (e.g., when a stored tree is loaded bottom-up)."""
+    # pylint: disable=protected-access
+    node = object.__new__(query_class)
+    node._value = value
+    node.operator = operator
+    node._search_field = None if operator else search_field
+    query_children = _QueryChildren(children)
+    query_children.owner = node
+    node._children = query_children
+    node.parent = None
+    node._position = position
+    node._marked = False
+    node._hash = None
+    node._serialized = None
+    for child in children:
+        child.parent = node
+    return node
 
 
 class Query(ABC):
     """Query class."""
 
+    # Compact layout: trees are kept in memory in large numbers.
+    # Subclasses must declare __slots__ as well.
+    __slots__ = (
+        "_value",
+        "operator",
+        "_search_field",
+        "_children",
+        "parent",
+        "_position",
+        "_marked",
+        "_hash",
+        "_serialized",
+    )
+
     # pylint: disable=too-many-arguments
     # @abstractmethod
     def __init__(
@@ -48,66 +313,330 @@ class Query(ABC):
     ) -> None:
         """init method - abstract"""
 
-        self.value = value
+        # Terms and operators are interned (repeated terms share one string)
+        self._value = sys.intern(value)
         self.operator = operator
         if operator:
             assert value in [
                 Operators.AND,
                 Operators.OR,
                 Operators.NOT,
+                Operators.NEAR,
                 "NOT_INITIALIZED",
             ]
 
-        self.children: typing.List[Query] = []
+        self._marked = False
+        self._hash: typing.Optional[int] = None
+        # Cached strings per syntax: (text, start, end), see to_string()
+        self._serialized: typing.Optional[typing.Dict[str, tuple]] = None
+        self.parent: typing.Optional[Query] = None
+        self._children: typing.Union[_QueryChildren, tuple] = _QueryChildren()
+        self._children.owner = self
         if children:
-            for child in children:
-                if isinstance(child, str):
-                    self.children.append(
-                        Query(child, operator=False, search_field=search_field)
-                    )
-                else:
-                    self.children.append(child)
+            self._attach_children(
+                [
+                    Query(child, operator=False, search_field=search_field)
+                    if isinstance(child, str)
+                    else child
+                    for child in children
+                ]
+            )
 
-        self.marked = False
-        self.search_field = search_field
+        self._search_field = search_field
         if operator:
-            self.search_field = None
-        self.position = position
+            self._search_field = None
+        self._position = position
+
+    @property
+    def value(self) -> str:
+        """value of the node (operator or search term)"""
+        return self._value
+
+    @value.setter
+    def value(self, value: str) -> None:
+        self._ensure_not_interned()
+        self._value = sys.intern(value)
+        self._invalidate()
+
+    @property
+    def search_field(self) -> typing.Optional[SearchField]:
+        """search field of the node"""
+        return self._search_field
+
+    @search_field.setter
+    def search_field(self, search_field: typing.Optional[SearchField]) -> None:
+        self._ensure_not_interned()
+        self._search_field = search_field
+        self._invalidate()
+
+    @property
+    def position(self) -> typing.Optional[tuple]:
+        """position (start, end) in the query string"""
+        position = self._position
+        if position is not None and len(position) == 3:
+            resolved = _resolve_position(position)
+            if resolved is not position:
+                self._position = resolved
+            return resolved[:2]
+        return position
+
+    @position.setter
+    def position(self, position: typing.Optional[tuple]) -> None:
+        self._ensure_not_interned()
+        self._position = position
+
+    @property
+    def marked(self) -> bool:
+        """whether the node is marked (see mark())"""
+        return self._marked
 
-        self._ensure_children_not_circular()
+    @marked.setter
+    def marked(self, marked: bool) -> None:
+        self._ensure_not_interned()
+        self._marked = marked
+
+    @property
+    def children(self) -> typing.List[Query]:
+        """children of the node"""
+        return self._children  # type: ignore
+
+    @children.setter
+    def children(self, children: typing.List[Query]) -> None:
+        self._ensure_not_interned()
+        self._children[:] = children
 
     def get_nr_leaves(self) -> int:
         """Returns the number of leaves in the query tree"""
-        return self._get_nr_leaves_from_node(self)
+        nr_leaves = 0
+        stack = [self]
+        while stack:
+            for child in stack.pop().children:
+                if child.operator:
+                    stack.append(child)
+                else:
+                    nr_leaves += 1
+        return nr_leaves
+
+    def accept(self, visitor: QueryVisitor) -> None:
+        """visits the query tree (see traversal.QueryVisitor)"""
+        traverse(self, visitor)
+
+    def walk(self, *, order: str = "preorder") -> typing.Iterator[Query]:
+        """iterates over the nodes of the query tree (preorder or postorder)"""
+        if order == "preorder":
+            return iter_preorder(self)
+        if order == "postorder":
+            return iter_postorder(self)
+        raise ValueError(f"Order not supported ({order})")
+
+    def _attach_children(self, children: typing.List[Query]) -> None:
+        """attaches the children (each node can only have one parent)"""
+        children = self._prepare_children(children, replaced=[])
+        for child in children:
+            if not isinstance(child._children, tuple):
+                child.parent = self
+        list.extend(self._children, children)  # type: ignore
+
+    def _prepare_children(
+        self, children: typing.List[Query], *, replaced: typing.List[Query]
+    ) -> typing.List[Query]:
+        """returns the children to attach (subtrees of other queries are copied)
+
+        Raises a ValueError if a node would occur twice in the tree or if
+        attaching the children would create a cycle."""
+
+        # Each node has one parent. New nodes (without parent) are checked
+        # in O(1). A node that already has a parent is copied if it belongs
+        # to another query (e.g., a term that is used in two queries).
+        # It is rejected if it belongs to this tree or is below one of the
+        # children (a shared node or a cycle). A root that is attached below
+        # one of its own descendants is ruled out by walking up from this node.
+        # Interned nodes are immutable and can be shared.
+        # All children are checked before any of them is modified.
+        replaced_ids = {id(child) for child in replaced}
+        child_ids = {id(child) for child in children}
+        own_root = self
+        while own_root.parent is not None:
+            own_root = own_root.parent
+
+        prepared = []
+        attached_ids = set()
+        for child in children:
+            if child._is_interned():
+                prepared.append(child)
+                continue
+            if child is self or id(child) in attached_ids:
+                raise ValueError("Building Query Tree failed")
+            attached_ids.add(id(child))
+            if child.parent is not None and id(child) not in replaced_ids:
+                root = child.parent
+                while True:
+                    if id(root) in child_ids:
+                        raise ValueError("Building Query Tree failed")
+                    if root.parent is None:
+                        break
+                    root = root.parent
+                if root is own_root:
+                    raise ValueError("Building Query Tree failed")
+                child = child.copy()
+            prepared.append(child)
+
+        ancestor = self.parent
+        while ancestor is not None:
+            if id(ancestor) in attached_ids:
+                raise ValueError("Building Query Tree failed")
+            ancestor = ancestor.parent
+        return prepared
+
+    def copy(self) -> Query:
+        """returns a copy of the query tree (with positions, without parent)
 
-    def _get_nr_leaves_from_node(self, node: Query) -> int:
-        return sum(
-            self._get_nr_leaves_from_node(n) if n.operator else 1 for n in node.children
+        Nodes are copied slot by slot (without the checks of the setters and
+        of the children list). Search fields shared by nodes remain shared."""
+        # pylint: disable=protected-access
+        new = object.__new__
+        search_fields: typing.Dict[int, SearchField] = {}
+
+        def copy_node(node: Query) -> Query:
+            copy = new(type(node))
+            copy._value = node._value
+            copy.operator = node.operator
+            search_field = node._search_field
+            if search_field is not None:
+                try:
+                    search_field = search_fields[id(node._search_field)]
+                except KeyError:
+                    if not search_field._is_interned():
+                        search_field = SearchField(
+                            search_field.value, position=search_field.position
+                        )
+                    search_fields[id(node._search_field)] = search_field
+            copy._search_field = search_field
+            children = _QueryChildren()
+            children.owner = copy
+            copy._children = children
+            copy.parent = None
+            position = node._position
+            if type(node._children) is tuple:  # interned (without position)
+                position = None
+            elif position is not None and len(position) == 3:
+                position = node.position
+            copy._position = position
+            copy._marked = False
+            copy._hash = None
+            copy._serialized = None
+            if node.operator and hasattr(node, "_near_param"):
+                copy._near_param = node._near_param  # type: ignore
+            return copy
+
+        root = copy_node(self)
+        stack = [(self, root)]
+        while stack:
+            node, copy = stack.pop()
+            if node._children:
+                copies = [copy_node(child) for child in node._children]
+                for child in copies:
+                    child.parent = copy
+                list.extend(copy._children, copies)  # type: ignore
+                stack.extend(zip(node._children, copies))
+        return root
+
+    def _is_interned(self) -> bool:
+        """interned (hash-consed) nodes are immutable and may be shared"""
+        return isinstance(self._children, tuple)
+
+    def _ensure_not_interned(self) -> None:
+        if self._is_interned():
+            raise AttributeError("Interned queries cannot be modified")
+
+    def _invalidate(self) -> None:
+        """resets cached hashes and strings of the node and its ancestors"""
+        node: typing.Optional[Query] = self
+        while node is not None:
+            node._hash = None
+            node._serialized = None
+            node = node.parent
+
+    def _get_serialized(self, syntax: str) -> typing.Optional[str]:
+        """returns the cached string of the node (or None)"""
+        if self._serialized is None or syntax not in self._serialized:
+            return None
+        text, start, end = self._serialized[syntax]
+        if start != 0 or end != len(text):
+            # Keep the substring instead of the string of the ancestor
+            text = text[start:end]
+            self._serialized[syntax] = (text, 0, len(text))
+        return text
+
+    def _set_serialized(self, syntax: str, text: str, start: int, end: int) -> None:
+        """caches the string of the node (a span of the text, sliced on access)"""
+        if self._serialized is None:
+            self._serialized = {}
+        self._serialized[syntax] = (text, start, end)
+
+    def _structural_key(self) -> tuple:
+        return (
+            self._value,
+            self.operator,
+            None if self._search_field is None else self._search_field.value,
+            getattr(self, "near_param", None),
         )
 
-    def _ensure_children_not_circular(
-        self,
-    ) -> None:
-        """parse the query provided, build nodes&tree structure"""
+    def __hash__(self) -> int:
+        """structural hash (cached, positions are ignored)"""
+        if self._hash is None:
+            # Compute missing hashes bottom-up (without recursion)
+            stack = [self]
+            while stack:
+                node = stack[-1]
+                missing = [child for child in node._children if child._hash is None]
+                if missing:
+                    stack.extend(missing)
+                    continue
+                stack.pop()
+                node._hash = hash(
+                    (
+                        node._structural_key(),
+                        tuple(child._hash for child in node._children),
+                    )
+                )
+        return self._hash  # type: ignore
 
-        # Mark nodes to prevent circular references
-        self.mark()
-        # Remove marks
-        self.remove_marks()
+    def __eq__(self, other: object) -> bool:
+        """structural equality (positions are ignored)"""
+        if self is other:
+            return True
+        if not isinstance(other, Query):
+            return NotImplemented
+        if hash(self) != hash(other):
+            return False
+        stack = [(self, other)]
+        while stack:
+            node, other_node = stack.pop()
+            if node is other_node:
+                continue
+            if node._structural_key() != other_node._structural_key() or len(
+                node._children
+            ) != len(other_node._children):
+                return False
+            stack.extend(zip(node._children, other_node._children))
+        return True
 
     def mark(self) -> None:
-        """marks the node"""
-        if self.marked:
-            raise ValueError("Building Query Tree failed")
-        self.marked = True
-        for child in self.children:
-            child.mark()
+        """marks the node (interned nodes are shared and cannot be marked)"""
+        nodes = list(iter_preorder(self))
+        if any(node._is_interned() for node in nodes):
+            raise AttributeError("Interned queries cannot be modified")
+        for node in nodes:
+            if node.marked:
+                raise ValueError("Building Query Tree failed")
+            node.marked = True
 
     def remove_marks(self) -> None:
         """removes the mark from the node"""
-        self.marked = False
-        for child in self.children:
-            child.remove_marks()
+        for node in iter_preorder(self):
+            if not node._is_interned():
+                node._marked = False
 
     def print_node(self) -> str:
         """returns a string with all information to the node"""
@@ -119,14 +648,94 @@ class Query(ABC):
 
     def to_string(self, syntax: str = "pre_notation") -> str:
         """prints the query in the selected syntax"""
+        return self.to_strings([syntax])[syntax]
+
+    def to_strings(self, syntaxes: typing.Iterable[str]) -> typing.Dict[str, str]:
+        """prints the query in several syntaxes (in a single pass)"""
+
+        # The strings of the query and its subqueries are cached
+        # (until the query or one of its subqueries is modified)
+        strings: typing.Dict[str, str] = {}
+        visitors: typing.List[SerializerVisitor] = []
+        streams: typing.List[io.StringIO] = []
+        for syntax in syntaxes:
+            serialized = self._get_serialized(syntax)
+            strings[syntax] = serialized or ""
+            if serialized is not None:
+                continue
+            stream = io.StringIO()
+            visitors.append(self._get_serializer(syntax)(stream, spans=[]))
+            streams.append(stream)
+
+        if len(visitors) == 1:
+            traverse(self, visitors[0])
+        elif visitors:
+            traverse(self, MultiVisitor(visitors))  # type: ignore
+
+        for visitor, stream in zip(visitors, streams):
+            text = stream.getvalue()
+            for node, start, end in visitor.spans:  # type: ignore
+                node._set_serialized(visitor.syntax, text, start, end)
+            strings[visitor.syntax] = text
+        return strings
+
+    def write(self, syntax: str, stream: typing.TextIO) -> None:
+        """writes the query in the selected syntax to a stream (e.g., a file)"""
+        traverse(self, self._get_serializer(syntax)(stream))
+
+    @staticmethod
+    def _get_serializer(syntax: str) -> typing.Type[SerializerVisitor]:
+        if syntax not in SERIALIZERS:
+            raise ValueError(f"Syntax not supported ({syntax})")
+        return SERIALIZERS[syntax]
+
+
+class QueryInterner:
+    """Hash-consing factory for queries.
+
+    Returns one shared instance for structurally identical (sub)queries,
+    which can be used across trees and across a corpus of queries.
+    Interned queries are immutable and do not have positions."""
+
+    def __init__(self) -> None:
+        self._table: typing.Dict[Query, Query] = {}
+
+    def __len__(self) -> int:
+        return len(self._table)
+
+    def intern(self, query: Query) -> Query:
+        """returns the shared instance for the query"""
 
-        if syntax == PLATFORM.PRE_NOTATION.value:
-            return to_string_pre_notation(self)
-        if syntax == PLATFORM.STRUCTURED.value:
-            return to_string_structured(self)
-        if syntax == PLATFORM.WOS.value:
-            return to_string_wos(self)
-        if syntax == PLATFORM.PUBMED.value:
-            return to_string_pubmed(self)
+        interned: typing.Dict[int, Query] = {}
+        # Intern bottom-up (post-order, without recursion)
+        stack = [(query, False)]
+        while stack:
+            node, children_done = stack.pop()
+            if node._is_interned() and self._table.get(node) is node:
+                interned[id(node)] = node
+                continue
+            if not children_done:
+                stack.append((node, True))
+                stack.extend((child, False) for child in node.children)
+                continue
+            candidate = self._copy(
+                node, tuple(interned[id(child)] for child in node.children)
+            )
+            interned[id(node)] = self._table.setdefault(candidate, candidate)
+        return interned[id(query)]
 
-        raise ValueError(f"Syntax not supported ({syntax})")
+    def _copy(self, node: Query, children: tuple) -> Query:
+        copy = object.__new__(type(node))
+        for cls in type(node).__mro__:
+            for slot in getattr(cls, "__slots__", ()):
+                if hasattr(node, slot):
+                    setattr(copy, slot, getattr(node, slot))
+        if node.search_field is not None:
+            copy._search_field = SearchField.intern(node.search_field.value)
+        copy._children = children
+        copy.parent = None
+        copy._position = None
+        copy._marked = False
+        copy._hash = None
+        copy._serialized = None
+        return copy
@@ -205,6 +205,12 @@ class QueryAdvisor():
         
         children_list = []
 
+        # index yields once (queries are hashed structurally);
+        # the first entry of a query is used, as in get_yield_by_query
+        yield_by_query = {}
+        for item in yield_list:
+            yield_by_query.setdefault(item["query"], item["yield"])
+
         for child in query.children:
-            children_list.append({"query": child, "yield": self.get_yield_by_query(yield_list=yield_list, query=child)})
+            children_list.append({"query": child, "yield": yield_by_query.get(child)})
         return children_list
\ No newline at end of file
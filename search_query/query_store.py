@@ -0,0 +1,329 @@
+#!/usr/bin/env python3
+"""Binary format for query trees (loaded lazily, e.g., from a memory-mapped file)."""
+from __future__ import annotations
+
+import io
+import mmap
+import struct
+import sys
+import typing
+
+from search_query.and_query import AndQuery
+from search_query.constants import Operators
+from search_query.near_query import NearQuery
+from search_query.not_query import NotQuery
+from search_query.or_query import OrQuery
+from search_query.query import _QueryChildren
+from search_query.query import Query
+from search_query.query import SearchField
+
+# Layout (little-endian):
+#   header
+#   tree index: (nr_trees + 1) offsets of the trees in the node data
+#   string index: (nr_strings + 1) offsets of the strings in the string data
+#   string data: UTF-8 encoded terms, operators and field codes (each once)
+#   node data: node records of each tree in post-order (root last)
+# Node record: kind, flags, nr_children, value (string nr), search field
+# (string nr), followed by the positions of the node and of the search field
+# and the near param (only if the flags are set).
+
+MAGIC = b"SQRY"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHxxII")
+_TREE_OFFSET = struct.Struct("<Q")
+_STRING_OFFSET = struct.Struct("<I")
+_NODE = struct.Struct("<BBIII")
+_POSITION = struct.Struct("<ii")
+_NEAR_PARAM = struct.Struct("<i")
+
+_NO_STRING = 0xFFFFFFFF
+
+# Node kinds
+_TERM = 0
+_OPERATORS = [Operators.AND, Operators.OR, Operators.NOT, Operators.NEAR]
+_NODE_CLASSES: typing.List[typing.Type[Query]] = [
+    Query,
+    AndQuery,
+    OrQuery,
+    NotQuery,
+    NearQuery,
+]
+
+# Flags
+_HAS_POSITION = 1
+_HAS_FIELD_POSITION = 2
+_HAS_NEAR_PARAM = 4
+
+
+class _StringTable:
+    """Terms, operators and field codes of all trees (stored once)"""
+
+    def __init__(self) -> None:
+        self.numbers: typing.Dict[str, int] = {}
+        self.strings: typing.List[str] = []
+
+    def number(self, string: typing.Optional[str]) -> int:
+        """returns the number of the string (added if new)"""
+        if string is None:
+            return _NO_STRING
+        try:
+            return self.numbers[string]
+        except KeyError:
+            self.numbers[string] = len(self.strings)
+            self.strings.append(string)
+            return len(self.strings) - 1
+
+
+def _encode_tree(query: Query, strings: _StringTable, out: bytearray) -> None:
+    stack: typing.List[tuple] = [(query, False)]
+    while stack:
+        node, children_visited = stack.pop()
+        if not children_visited:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.children))
+            continue
+
+        if node.operator:
+            if node.value not in _OPERATORS:
+                raise ValueError(f"Operator not supported ({node.value})")
+            kind = _OPERATORS.index(node.value) + 1
+        else:
+            kind = _TERM
+        search_field = node.search_field
+        flags = 0
+        if node.position is not None:
+            flags |= _HAS_POSITION
+        if search_field is not None and search_field.position is not None:
+            flags |= _HAS_FIELD_POSITION
+        near_param = getattr(node, "near_param", None)
+        if near_param is not None:
+            flags |= _HAS_NEAR_PARAM
+
+        out += _NODE.pack(
+            kind,
+            flags,
+            len(node.children),
+            strings.number(node.value),
+            strings.number(None if search_field is None else search_field.value),
+        )
+        if flags & _HAS_POSITION:
+            out += _POSITION.pack(*node.position)
+        if flags & _HAS_FIELD_POSITION:
+            out += _POSITION.pack(*search_field.position)  # type: ignore
+        if flags & _HAS_NEAR_PARAM:
+            out += _NEAR_PARAM.pack(near_param)
+
+
+def dump_queries(queries: typing.Iterable[Query], stream: typing.BinaryIO) -> None:
+    """writes the queries to a binary stream (e.g., a file opened with "wb")"""
+    strings = _StringTable()
+    nodes = bytearray()
+    tree_offsets = [0]
+    for query in queries:
+        _encode_tree(query, strings, nodes)
+        tree_offsets.append(len(nodes))
+
+    encoded = [string.encode("utf-8") for string in strings.strings]
+    string_offsets = [0]
+    for data in encoded:
+        string_offsets.append(string_offsets[-1] + len(data))
+
+    stream.write(
+        _HEADER.pack(MAGIC, VERSION, len(tree_offsets) - 1, len(strings.strings))
+    )
+    stream.write(b"".join(_TREE_OFFSET.pack(offset) for offset in tree_offsets))
+    stream.write(b"".join(_STRING_OFFSET.pack(offset) for offset in string_offsets))
+    stream.write(b"".join(encoded))
+    stream.write(nodes)
+
+
+def dumps(query: Query) -> bytes:
+    """returns the binary representation of the query"""
+    stream = io.BytesIO()
+    dump_queries([query], stream)
+    return stream.getvalue()
+
+
+def loads(data: bytes) -> Query:
+    """returns the query of a binary representation (see dumps())"""
+    store = QueryStore(data)
+    if len(store) != 1:
+        raise ValueError(f"Expected one query (found {len(store)})")
+    # All strings are needed for the query
+    store._decode_strings()  # pylint: disable=protected-access
+    return store[0]
+
+
+class QueryStore(typing.Sequence[Query]):
+    """Queries in the binary format (materialized on access)
+
+    Only the header is read when the store is opened: strings are decoded
+    and trees are built when a query is accessed. Each access returns
+    a new (independent) query tree."""
+
+    def __init__(
+        self, buffer: typing.Union[bytes, bytearray, memoryview, mmap.mmap]
+    ) -> None:
+        self._mmap: typing.Optional[mmap.mmap] = None
+        self._buffer = memoryview(buffer)
+        if len(self._buffer) < _HEADER.size:
+            raise ValueError("Invalid query store (too short)")
+        magic, version, self._nr_trees, nr_strings = _HEADER.unpack_from(
+            self._buffer, 0
+        )
+        if magic != MAGIC:
+            raise ValueError("Invalid query store (magic number)")
+        if version != VERSION:
+            raise ValueError(f"Query store version not supported ({version})")
+
+        self._tree_index = _HEADER.size
+        self._string_index = self._tree_index + (self._nr_trees + 1) * _TREE_OFFSET.size
+        self._string_data = self._string_index + (nr_strings + 1) * _STRING_OFFSET.size
+        (string_data_size,) = _STRING_OFFSET.unpack_from(
+            self._buffer, self._string_data - _STRING_OFFSET.size
+        )
+        self._node_data = self._string_data + string_data_size
+        self._strings: typing.List[typing.Optional[str]] = [None] * nr_strings
+        self._search_fields: typing.Dict[int, SearchField] = {}
+
+    @classmethod
+    def open(cls, path: str) -> QueryStore:
+        """opens a file written by dump_queries() (memory-mapped)"""
+        with open(path, "rb") as file:
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        store = cls(mapped)
+        store._mmap = mapped
+        return store
+
+    def close(self) -> None:
+        """releases the buffer (queries that were accessed remain valid)"""
+        self._buffer.release()
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+
+    def __enter__(self) -> QueryStore:
+        return self
+
+    def __exit__(self, *args: typing.Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return self._nr_trees
+
+    def __getitem__(self, index: typing.Any) -> typing.Any:
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(self._nr_trees))]
+        if index < 0:
+            index += self._nr_trees
+        if not 0 <= index < self._nr_trees:
+            raise IndexError("Query index out of range")
+        return self._load_tree(index)
+
+    def _string(self, number: int) -> str:
+        string = self._strings[number]
+        if string is None:
+            start, end = struct.unpack_from(
+                "<II", self._buffer, self._string_index + number * _STRING_OFFSET.size
+            )
+            string = sys.intern(
+                str(
+                    self._buffer[self._string_data + start : self._string_data + end],
+                    "utf-8",
+                )
+            )
+            self._strings[number] = string
+        return string
+
+    def _decode_strings(self) -> None:
+        """decodes all strings at once (instead of on access)"""
+        nr_strings = len(self._strings)
+        offsets = struct.unpack_from(
+            f"<{nr_strings + 1}I", self._buffer, self._string_index
+        )
+        data = self._buffer[self._string_data : self._string_data + offsets[-1]]
+        intern = sys.intern
+        self._strings = [
+            intern(str(data[start:end], "utf-8"))
+            for start, end in zip(offsets, offsets[1:])
+        ]
+
+    def _search_field(self, number: int) -> SearchField:
+        try:
+            return self._search_fields[number]
+        except KeyError:
+            search_field = SearchField.intern(self._string(number))
+            self._search_fields[number] = search_field
+            return search_field
+
+    def _load_tree(self, index: int) -> Query:
+        buffer = self._buffer
+        start, end = struct.unpack_from(
+            "<QQ", buffer, self._tree_index + index * _TREE_OFFSET.size
+        )
+        offset = self._node_data + start
+        end += self._node_data
+
+        # Nodes are built slot by slot (see _build_query()), search fields
+        # with the same position are shared (as in parsed trees)
+        # pylint: disable=protected-access
+        strings = self._strings
+        search_fields: typing.Dict[tuple, SearchField] = {}
+        new = object.__new__
+        node_unpack = _NODE.unpack_from
+        position_unpack = _POSITION.unpack_from
+        stack: typing.List[Query] = []
+        while offset < end:
+            kind, flags, nr_children, value, field = node_unpack(buffer, offset)
+            offset += _NODE.size
+            position = None
+            if flags & _HAS_POSITION:
+                position = position_unpack(buffer, offset)
+                offset += _POSITION.size
+            search_field = None
+            if field != _NO_STRING:
+                if flags & _HAS_FIELD_POSITION:
+                    field_position = position_unpack(buffer, offset)
+                    offset += _POSITION.size
+                    try:
+                        search_field = search_fields[(field, field_position)]
+                    except KeyError:
+                        search_field = SearchField(
+                            strings[field] or self._string(field),
+                            position=field_position,
+                        )
+                        search_fields[(field, field_position)] = search_field
+                else:
+                    search_field = self._search_field(field)
+
+            node = new(_NODE_CLASSES[kind])
+            node._value = strings[value] or self._string(value)
+            node.operator = kind != _TERM
+            node._search_field = None if kind != _TERM else search_field
+            children = _QueryChildren()
+            children.owner = node
+            node._children = children
+            node.parent = None
+            node._position = position
+            node._marked = False
+            node._hash = None
+            node._serialized = None
+            if flags & _HAS_NEAR_PARAM:
+                (node._near_param,) = _NEAR_PARAM.unpack_from(  # type: ignore
+                    buffer, offset
+                )
+                offset += _NEAR_PARAM.size
+
+            if nr_children:
+                if nr_children > len(stack):
+                    raise ValueError("Invalid query store (node data)")
+                list.extend(children, stack[len(stack) - nr_children :])
+                del stack[len(stack) - nr_children :]
+                for child in children:
+                    child.parent = node
+            stack.append(node)
+
+        if len(stack) != 1:
+            raise ValueError("Invalid query store (node data)")
+        return stack[0]
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Registry of parsers and serializers (imported on first use)."""
+from __future__ import annotations
+
+import importlib
+import sys
+import threading
+import typing
+
+
+class Registry(typing.Mapping[str, typing.Any]):
+    """Maps names (e.g., syntaxes) to classes that are imported on first use.
+
+    Entries are registered with a path ("module:attribute") or with the
+    class. Plugins can add entries with entry points of the group
+    (e.g., [tool.poetry.plugins."search_query.parsers"] in pyproject.toml),
+    which are only looked up when a name is not registered."""
+
+    def __init__(self, group: str, paths: typing.Dict[str, str]) -> None:
+        self.group = group
+        self._paths = dict(paths)
+        self._loaded: typing.Dict[str, typing.Any] = {}
+        self._entry_points_loaded = False
+        self._lock = threading.Lock()
+
+    def register(self, name: str, target: typing.Any) -> None:
+        """registers a class (or a "module:attribute" path) for a name"""
+        with self._lock:
+            self._loaded.pop(name, None)
+            if isinstance(target, str):
+                self._paths[name] = target
+            else:
+                self._paths[name] = f"{target.__module__}:{target.__qualname__}"
+                self._loaded[name] = target
+
+    def unregister(self, name: str) -> None:
+        """removes a name"""
+        with self._lock:
+            self._paths.pop(name, None)
+            self._loaded.pop(name, None)
+
+    def _load_entry_points(self) -> None:
+        with self._lock:
+            if self._entry_points_loaded:
+                return
+            self._entry_points_loaded = True
+            # pylint: disable=import-outside-toplevel
+            import importlib.metadata
+
+            if sys.version_info >= (3, 10):
+                group = importlib.metadata.entry_points(group=self.group)
+            else:  # pragma: no cover
+                group = importlib.metadata.entry_points().get(self.group, [])
+            for entry_point in group:
+                self._paths.setdefault(entry_point.name, entry_point.value)
+
+    def __contains__(self, name: object) -> bool:
+        if name in self._paths:
+            return True
+        if not self._entry_points_loaded:
+            self._load_entry_points()
+        return name in self._paths
+
+    def __getitem__(self, name: str) -> typing.Any:
+        target = self._loaded.get(name)
+        if target is not None:
+            return target
+        if name not in self:
+            raise KeyError(name)
+        module_name, _, attribute = self._paths[name].partition(":")
+        target = importlib.import_module(module_name)
+        for part in attribute.split("."):
+            target = getattr(target, part)
+        self._loaded[name] = target
+        return target
+
+    def __iter__(self) -> typing.Iterator[str]:
+        self._load_entry_points()
+        return iter(list(self._paths))
+
+    def __len__(self) -> int:
+        self._load_entry_points()
+        return len(self._paths)
@@ -3,6 +3,7 @@
 from __future__ import annotations
 
 import json
+import os
 import re
 import typing
 
@@ -37,10 +38,56 @@ class SearchFile:
     linked_protocol: typing.Optional[str] = None
     linked_report: typing.Optional[str] = None
 
+    _REQUIRED_KEYS = (
+        "record_info",
+        "authors",
+        "date",
+        "platform",
+        "database",
+        "search_string",
+    )
+    _OPTIONAL_KEYS = (
+        "parsed",
+        "string_name",
+        "keywords",
+        "related_records",
+        "parent_record",
+        "database_time_coverage",
+        "search_language",
+        "settings",
+        "quality_assurance",
+        "validation_report",
+        "peer_review",
+        "description",
+        "review_question",
+        "review_type",
+        "linked_protocol",
+        "linked_report",
+    )
+
     def __init__(self, filepath: str) -> None:
         with open(filepath, encoding="utf-8") as file:
             data = json.load(file)
 
+        self._load(data)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> SearchFile:
+        """SearchFile of a record (e.g., a line of a JSON Lines corpus)"""
+        search_file = cls.__new__(cls)
+        search_file._load(data)
+        return search_file
+
+    def to_dict(self) -> dict:
+        """Record of the SearchFile (optional keys only if they are set)"""
+        data = {key: getattr(self, key) for key in self._REQUIRED_KEYS}
+        for key in self._OPTIONAL_KEYS:
+            value = getattr(self, key)
+            if value is not None:
+                data[key] = value
+        return data
+
+    def _load(self, data: dict) -> None:
         self._validate(data)
 
         self.record_info = data["record_info"]
@@ -49,8 +96,9 @@ class SearchFile:
         self.platform = data["platform"]
         self.database = data["database"]
         self.search_string = data["search_string"]
-        if "parsed" in data:
-            self.parsed = data["parsed"]
+        for key in self._OPTIONAL_KEYS:
+            if key in data:
+                setattr(self, key, data[key])
 
     def _validate(self, data: dict) -> None:
         # Note: validate without pydantic to keep zero dependencies
@@ -95,3 +143,70 @@ class SearchFile:
                     raise TypeError("Email must be a string.")
                 if not re.match(r"^\S+@\S+\.\S+$", author["email"]):
                     raise ValueError("Invalid email.")
+
+
+def _is_json_lines(path: str) -> bool:
+    return path.endswith((".jsonl", ".jsonl.gz", ".ndjson", ".ndjson.gz"))
+
+
+def _open_text(path: str, mode: str) -> typing.TextIO:
+    """Open a text file (gzip-compressed if the path ends with .gz)"""
+    if path.endswith(".gz"):
+        # (imported here: only needed for compressed corpora)
+        import gzip  # pylint: disable=import-outside-toplevel
+
+        return gzip.open(path, mode + "t", encoding="utf-8")  # type: ignore
+    return open(path, mode, encoding="utf-8")  # pylint: disable=consider-using-with
+
+
+def _walk(directory: str) -> typing.Iterator[str]:
+    """Paths of the files in a directory (sorted, without hidden files and directories)"""
+    for dir_path, dir_names, file_names in os.walk(directory):
+        dir_names[:] = sorted(
+            dir_name for dir_name in dir_names if not dir_name.startswith(".")
+        )
+        for file_name in sorted(file_names):
+            if not file_name.startswith("."):
+                yield os.path.join(dir_path, file_name)
+
+
+def read_json_lines(path: str) -> typing.Iterator[SearchFile]:
+    """SearchFiles of a JSON Lines corpus (one record per line, optionally .gz)
+
+    Records are read and validated one at a time."""
+    with _open_text(path, "r") as file:
+        for line_nr, line in enumerate(file, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield SearchFile.from_dict(json.loads(line))
+            except (TypeError, ValueError) as exc:
+                raise ValueError(f"{path}:{line_nr}: {exc}") from exc
+
+
+def write_json_lines(search_files: typing.Iterable[SearchFile], path: str) -> int:
+    """Write SearchFiles to a JSON Lines corpus (gzip-compressed if the path
+    ends with .gz) and return the number of records"""
+    count = 0
+    with _open_text(path, "w") as file:
+        for search_file in search_files:
+            file.write(json.dumps(search_file.to_dict(), ensure_ascii=False))
+            file.write("\n")
+            count += 1
+    return count
+
+
+def iter_search_files(path: str) -> typing.Iterator[SearchFile]:
+    """SearchFiles of a path: a JSON Lines corpus (*.jsonl, *.jsonl.gz),
+    a search file (*.json), or a directory with search files and corpora"""
+    if not os.path.isdir(path):
+        if _is_json_lines(path):
+            yield from read_json_lines(path)
+        else:
+            yield SearchFile(path)
+        return
+    for file_path in _walk(path):
+        if file_path.endswith(".json"):
+            yield SearchFile(file_path)
+        elif _is_json_lines(file_path):
+            yield from read_json_lines(file_path)
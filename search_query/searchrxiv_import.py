@@ -23,10 +23,10 @@ SYNTAX_MAP = {
     "scopus": "scopus",
     "embase.com": "embase",
     "embase": "embase",
-    "ebscohost": "ebscohost",
-    "ebsco": "ebscohost",
-    "ebsco host": "ebscohost",
-    "ebscohost research databases": "ebscohost",
+    "ebscohost": "ebsco",
+    "ebsco": "ebsco",
+    "ebsco host": "ebsco",
+    "ebscohost research databases": "ebsco",
     "ovid": "ovid",
     "ovid sp": "ovid",
     "psycinfo": "psycinfo",
@@ -40,7 +40,7 @@ SYNTAX_MAP = {
     "ieee": "ieee",
     "scielo": "scielo",
     "emerald full text": "emerald",
-    "cinahl complete": "cinahl",
+    "cinahl complete": "ebsco",
     "clinicaltrials.gov": "clinicaltrials",
     "springerlink": "springer",
     "agris": "agris",
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""Base serializer."""
+from __future__ import annotations
+
+import typing
+
+from search_query.traversal import QueryVisitor
+
+if typing.TYPE_CHECKING:  # pragma: no
+    from search_query.query import Query
+
+# Start position of a node whose cached string was written
+_FROM_CACHE = -1
+
+
+class SerializerVisitor(QueryVisitor):
+    """Base class of the serializer visitors.
+
+    Writes to a stream and reuses the cached strings of subqueries.
+    If spans is a list, the (node, start, end) positions of the strings of
+    subqueries in the output are appended (to cache them afterwards).
+    Serializers call begin()/end() where the string of a subquery
+    (i.e., the result of subquery.to_string(syntax)) starts/ends."""
+
+    syntax: str
+
+    def __init__(
+        self, stream: typing.TextIO, *, spans: typing.Optional[list] = None
+    ) -> None:
+        self.spans = spans
+        self.position = 0
+        self._starts: typing.List[typing.Optional[int]] = []
+        self._stream_write = stream.write
+        self.write = stream.write if spans is None else self._write_and_count
+        self._search_fields: typing.Dict[str, str] = {}
+
+    def _write_and_count(self, text: str) -> None:
+        self._stream_write(text)
+        self.position += len(text)
+
+    def translate_search_field(self, search_field: str) -> str:
+        """translates a (standard) search field to the syntax"""
+        raise NotImplementedError(
+            "translate_search_field method must be implemented by inheriting classes"
+        )
+
+    def search_field(self, node: Query) -> str:
+        """search field of the node in the syntax (translated once per field)"""
+        search_field = str(node.search_field)
+        try:
+            return self._search_fields[search_field]
+        except KeyError:
+            translated = self.translate_search_field(search_field)
+            self._search_fields[search_field] = translated
+            return translated
+
+    def begin(self, node: Query) -> bool:
+        """beginning of the node string (returns False if the cached string was written)"""
+        # pylint: disable=protected-access
+        serialized = node._get_serialized(self.syntax)
+        if serialized is not None:
+            self.write(serialized)
+            self._starts.append(_FROM_CACHE)
+            return False
+        self._starts.append(self.position if self.spans is not None else None)
+        return True
+
+    def from_cache(self) -> bool:
+        """whether the cached string was written for the current node (before end())"""
+        return self._starts[-1] == _FROM_CACHE
+
+    def end(self, node: Query) -> None:
+        """end of the node string"""
+        start = self._starts.pop()
+        if start is not None and start != _FROM_CACHE:
+            self.spans.append((node, start, self.position))  # type: ignore
@@ -2,33 +2,63 @@
 """Pre-notation serializer."""
 from __future__ import annotations
 
+import io
 import typing
 
+from search_query.constants import PLATFORM
+from search_query.serializer_base import SerializerVisitor
+from search_query.traversal import traverse
 
 if typing.TYPE_CHECKING:  # pragma: no
     from search_query.query import Query
 
 
-def to_string_pre_notation(node: Query) -> str:
+class PreNotationVisitor(SerializerVisitor):
+    """Writes the pre-notation string to a stream"""
+
+    syntax = PLATFORM.PRE_NOTATION.value
+
+    def enter(
+        self, node: Query, index: int, parent: typing.Optional[Query]
+    ) -> typing.Optional[bool]:
+        prefix = ", " if index else ""
+        if node.children or parent is None:
+            # Strings of subqueries are cached (leaves are written directly)
+            if prefix:
+                self.write(prefix)
+                prefix = ""
+            if not self.begin(node):
+                return False
+
+        node_content = node.value
+        if node.search_field:
+            node_content += f"[{node.search_field}]"
+        if hasattr(node, "near_param"):
+            node_content += f"({node.near_param})"
+        if node.children:
+            node_content += "["
+        self.write(prefix + node_content)
+        return None
+
+    def leave(self, node: Query, index: int, parent: typing.Optional[Query]) -> None:
+        if not node.children and parent is not None:
+            return
+        if node.children and not self.from_cache():
+            self.write("]")
+        self.end(node)
+
+
+def write_pre_notation(
+    node: Query, stream: typing.TextIO, *, spans: typing.Optional[list] = None
+) -> None:
     """actual translation logic for pre-notation"""
 
-    if not hasattr(node, "value"):
-        return " (?) "
-
-    result = ""
-    node_content = node.value
-    if node.search_field:
-        node_content += f"[{node.search_field}]"
-
-    if hasattr(node, "near_param"):
-        node_content += f"({node.near_param})"
-    result = f"{result}{node_content}"
-    if node.children == []:
-        return result
-
-    result = f"{result}["
-    for child in node.children:
-        result = f"{result}{to_string_pre_notation(child)}"
-        if child != node.children[-1]:
-            result = f"{result}, "
-    return f"{result}]"
+    traverse(node, PreNotationVisitor(stream, spans=spans))
+
+
+def to_string_pre_notation(node: Query) -> str:
+    """translates the query to pre-notation"""
+
+    stream = io.StringIO()
+    write_pre_notation(node, stream)
+    return stream.getvalue()
@@ -2,57 +2,87 @@
 """Pubmed serializer."""
 from __future__ import annotations
 
+import io
 import typing
 
 from search_query.constants import PLATFORM
 from search_query.constants import PLATFORM_FIELD_MAP
+from search_query.serializer_base import SerializerVisitor
+from search_query.traversal import traverse
 
 if typing.TYPE_CHECKING:  # pragma: no
     from search_query.query import Query
 
 
-def to_string_pubmed(node: Query) -> str:
-    """actual translation logic for PubMed"""
+class PubmedVisitor(SerializerVisitor):
+    """Writes the PubMed string to a stream"""
 
-    # to do combine nodes for SYNTAX_COMBINED_FIELDS_MAP
+    syntax = PLATFORM.PUBMED.value
+
+    def translate_search_field(self, search_field: str) -> str:
+        return get_search_field_pubmed(search_field)
 
-    result = ""
-    for child in node.children:
-        if not child.operator:
+    def enter(
+        self, node: Query, index: int, parent: typing.Optional[Query]
+    ) -> typing.Optional[bool]:
+        # The root only contributes through its children
+        if parent is None:
+            return self.begin(node)
+
+        last_index = len(parent.children) - 1
+        if not node.operator:
             # node is not an operator
-            if (child == node.children[0]) & (child != node.children[-1]):
+            search_field = self.search_field(node)
+            if (index == 0) & (index != last_index):
                 # current element is first but not only child element
                 # -->operator does not need to be appended again
-                result = (
-                    f"{result}({child.value}"
-                    f"{get_search_field_pubmed(str(child.search_field))}"
-                )
-
+                self.write(f"({node.value}{search_field}")
             else:
                 # current element is not first child
-                result = (
-                    f"{result} {node.value} {child.value}"
-                    f"{get_search_field_pubmed(str(child.search_field))}"
-                )
+                self.write(f" {parent.value} {node.value}{search_field}")
 
-            if child == node.children[-1]:
+            if index == last_index:
                 # current Element is last Element -> closing parenthesis
-                result = f"{result})"
-
+                self.write(")")
+            return False
+
+        # node is operator node
+        if node.value == "NOT":
+            # current element is NOT Operator -> no parenthesis in PubMed
+            pass
+        elif (index == 0) & (index != last_index):
+            self.write("(")
         else:
-            # node is operator node
-            if child.value == "NOT":
-                # current element is NOT Operator -> no parenthesis in PubMed
-                result = f"{result}{to_string_pubmed(child)}"
+            self.write(f" {parent.value} ")
+        return self.begin(node)
+
+    def leave(self, node: Query, index: int, parent: typing.Optional[Query]) -> None:
+        if parent is None:
+            self.end(node)
+            return
+        if not node.operator:
+            return
+        self.end(node)
+        if (index == len(parent.children) - 1) & (node.value != "NOT"):
+            self.write(")")
+
+
+def write_pubmed(
+    node: Query, stream: typing.TextIO, *, spans: typing.Optional[list] = None
+) -> None:
+    """actual translation logic for PubMed"""
 
-            elif (child == node.children[0]) & (child != node.children[-1]):
-                result = f"{result}({to_string_pubmed(child)}"
-            else:
-                result = f"{result} {node.value} {to_string_pubmed(child)}"
+    # to do combine nodes for SYNTAX_COMBINED_FIELDS_MAP
+
+    traverse(node, PubmedVisitor(stream, spans=spans))
+
+
+def to_string_pubmed(node: Query) -> str:
+    """translates the query to PubMed"""
 
-            if (child == node.children[-1]) & (child.value != "NOT"):
-                result = f"{result})"
-    return f"{result}"
+    stream = io.StringIO()
+    write_pubmed(node, stream)
+    return stream.getvalue()
 
 
 PUBMED_FIELD_MAP = PLATFORM_FIELD_MAP[PLATFORM.PUBMED]
@@ -2,17 +2,32 @@
 """Structured serializer."""
 from __future__ import annotations
 
+import io
 import textwrap
 import typing
 
+from search_query.constants import PLATFORM
+from search_query.serializer_base import SerializerVisitor
+from search_query.traversal import traverse
 
 if typing.TYPE_CHECKING:  # pragma: no
     from search_query.query import Query
 
 
+def _wrap(input_str: str) -> typing.List[str]:
+    if (
+        len(input_str) <= 100
+        and input_str[:1] not in ("", " ")
+        and input_str.isprintable()
+    ):
+        # Fits on one line: textwrap would only drop trailing spaces
+        return [input_str.rstrip(" ")]
+    return textwrap.wrap(input_str, 100, break_long_words=False)
+
+
 def _reindent(input_str: str, num_spaces: int) -> str:
     """_reindents the input string by num_spaces spaces."""
-    lines = textwrap.wrap(input_str, 100, break_long_words=False)
+    lines = _wrap(input_str)
     prefix = num_spaces * 3 * " "
     if num_spaces >= 1:
         prefix = "|" + num_spaces * 3 * " "
@@ -22,30 +37,73 @@ def _reindent(input_str: str, num_spaces: int) -> str:
     return "\n".join(lines)
 
 
-def to_string_structured(node: Query, *, level: int = 0) -> str:
-    """actual translation logic for structured syntax"""
+class StructuredVisitor(SerializerVisitor):
+    """Writes the structured string to a stream"""
+
+    syntax = PLATFORM.STRUCTURED.value
+
+    def __init__(
+        self,
+        stream: typing.TextIO,
+        *,
+        level: int = 0,
+        spans: typing.Optional[list] = None,
+    ) -> None:
+        super().__init__(stream, spans=spans)
+        self.level = level
+
+    def _is_cached(self, parent: typing.Optional[Query]) -> bool:
+        # Indentation depends on the level: only the root string is cached
+        return parent is None and self.level == 0
 
-    indent = "   "
-    result = ""
+    def enter(
+        self, node: Query, index: int, parent: typing.Optional[Query]
+    ) -> typing.Optional[bool]:
+        if self._is_cached(parent) and not self.begin(node):
+            return False
 
-    if not hasattr(node, "value"):
-        return f"{indent} (?)"
+        search_field = ""
+        if not node.operator:
+            search_field = f"[{node.search_field}]"
 
-    search_field = ""
-    if not node.operator:
-        search_field = f"[{node.search_field}]"
+        node_value = node.value
+        if hasattr(node, "near_param"):
+            node_value += f"/{node.near_param}"
+        self.write(_reindent(f"{node_value} {search_field}", self.level))
 
-    node_value = node.value
-    if hasattr(node, "near_param"):
-        node_value += f"/{node.near_param}"
-    result = _reindent(f"{node_value} {search_field}", level)
+        if node.children:
+            self.write("[\n")
+            self.level += 1
+        return None
 
-    if node.children == []:
-        return result
+    def leave(self, node: Query, index: int, parent: typing.Optional[Query]) -> None:
+        if self._is_cached(parent) and self.from_cache():
+            self.end(node)
+            return
+        if node.children:
+            self.level -= 1
+            self.write(f"{'|' + ' ' * self.level * 3 + ' '}]")
+        if parent is not None:
+            self.write("\n")
+        elif self._is_cached(parent):
+            self.end(node)
 
-    result = f"{result}[\n"
-    for child in node.children:
-        result = f"{result}{to_string_structured(child, level = level +1 )}\n"
-    result = f"{result}{'|' + ' ' *level*3 + ' '}]"
 
-    return result
+def write_structured(
+    node: Query,
+    stream: typing.TextIO,
+    *,
+    level: int = 0,
+    spans: typing.Optional[list] = None,
+) -> None:
+    """actual translation logic for structured syntax"""
+
+    traverse(node, StructuredVisitor(stream, level=level, spans=spans))
+
+
+def to_string_structured(node: Query, *, level: int = 0) -> str:
+    """translates the query to structured syntax"""
+
+    stream = io.StringIO()
+    write_structured(node, stream, level=level)
+    return stream.getvalue()
@@ -2,63 +2,100 @@
 """WOS serializer."""
 from __future__ import annotations
 
+import io
 import typing
 
-from search_query.constants import Fields
+from search_query.constants import PLATFORM
+from search_query.constants import PLATFORM_FIELD_MAP
+from search_query.serializer_base import SerializerVisitor
+from search_query.traversal import traverse
 
 if typing.TYPE_CHECKING:  # pragma: no
     from search_query.query import Query
 
 
-def to_string_wos(node: Query) -> str:
-    """actual translation logic for WOS syntax"""
+class WOSVisitor(SerializerVisitor):
+    """Writes the WOS string to a stream"""
+
+    syntax = PLATFORM.WOS.value
+
+    def translate_search_field(self, search_field: str) -> str:
+        return _get_search_field_wos(search_field)
+
+    def enter(
+        self, node: Query, index: int, parent: typing.Optional[Query]
+    ) -> typing.Optional[bool]:
+        # The root only contributes through its children
+        if parent is None:
+            return self.begin(node)
 
-    result = ""
-    for child in node.children:
-        if not child.operator:
+        last_index = len(parent.children) - 1
+        if not node.operator:
             # node is not an operator
-            if (child == node.children[0]) & (child != node.children[-1]):
+            if (index == 0) & (index != last_index):
                 # current element is first but not only child element
                 # -->operator does not need to be appended again
-                result = (
-                    f"{result}"
-                    f"{_get_search_field_wos(str(child.search_field))}="
-                    f"({child.value}"
-                )
-
+                self.write(f"{self.search_field(node)}=({node.value}")
             else:
                 # current element is not first child
-                result = f"{result} {node.value} {child.value}"
+                self.write(f" {_operator(parent)} {node.value}")
 
-            if child == node.children[-1]:
+            if index == last_index:
                 # current Element is last Element -> closing parenthesis
-                result = f"{result})"
+                self.write(")")
+            return False
 
+        # node is operator node
+        if node.value == "NOT":
+            # current element is NOT Operator -> no parenthesis in WoS
+            pass
+        elif (index == 0) & (index != last_index):
+            self.write("(")
         else:
-            # node is operator node
-            if child.value == "NOT":
-                # current element is NOT Operator -> no parenthesis in WoS
-                result = f"{result}{to_string_wos(child)}"
+            self.write(f" {_operator(parent)} ")
+        return self.begin(node)
+
+    def leave(self, node: Query, index: int, parent: typing.Optional[Query]) -> None:
+        if parent is None:
+            self.end(node)
+            return
+        if not node.operator:
+            return
+        self.end(node)
+        if (index == len(parent.children) - 1) & (node.value != "NOT"):
+            self.write(")")
+
+
+def _operator(node: Query) -> str:
+    near_param = getattr(node, "near_param", None)
+    if near_param is None:
+        return node.value
+    return f"{node.value}/{near_param}"
+
+
+def write_wos(
+    node: Query, stream: typing.TextIO, *, spans: typing.Optional[list] = None
+) -> None:
+    """actual translation logic for WOS syntax"""
+
+    traverse(node, WOSVisitor(stream, spans=spans))
+
+
+def to_string_wos(node: Query) -> str:
+    """translates the query to WOS syntax"""
+
+    stream = io.StringIO()
+    write_wos(node, stream)
+    return stream.getvalue()
 
-            elif (child == node.children[0]) & (child != node.children[-1]):
-                result = f"{result}({to_string_wos(child)}"
-            else:
-                result = f"{result} {node.value} {to_string_wos(child)}"
 
-            if (child == node.children[-1]) & (child.value != "NOT"):
-                result = f"{result})"
-    return f"{result}"
+WOS_FIELD_MAP = PLATFORM_FIELD_MAP[PLATFORM.WOS]
 
 
-# https://pubmed.ncbi.nlm.nih.gov/help/
 # https://images.webofknowledge.com/images/help/WOS/hs_advanced_fieldtags.html
 # https://images.webofknowledge.com/images/help/WOS/hs_wos_fieldtags.html
 def _get_search_field_wos(search_field: str) -> str:
     """transform search field to WoS Syntax"""
-    if search_field == Fields.ABSTRACT:
-        result = "AB"
-    elif search_field == Fields.TITLE:
-        result = "TI"
-    else:
+    if search_field not in WOS_FIELD_MAP:
         raise ValueError(f"Search field not supported ({search_field})")
-    return result
+    return WOS_FIELD_MAP[search_field].rstrip("=")
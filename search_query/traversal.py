@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Traversal of query trees (explicit stack, no recursion)."""
+from __future__ import annotations
+
+import typing
+
+if typing.TYPE_CHECKING:  # pragma: no
+    from search_query.query import Query
+
+
+class QueryVisitor:
+    """Visitor for query trees.
+
+    enter() is called before the children of a node are visited (pre-order),
+    leave() after the children were visited (post-order).
+    index is the position of the node in parent.children (0 for the root).
+    If enter() returns False, the children of the node are skipped
+    (leave() is still called)."""
+
+    def enter(
+        self, node: Query, index: int, parent: typing.Optional[Query]
+    ) -> typing.Optional[bool]:
+        """called before the children of the node are visited"""
+        return None
+
+    def leave(self, node: Query, index: int, parent: typing.Optional[Query]) -> None:
+        """called after the children of the node were visited"""
+
+
+def traverse(query: Query, visitor: QueryVisitor) -> None:
+    """Visit all nodes of the query (depth-first, without recursion)"""
+
+    enter = visitor.enter
+    leave = visitor.leave
+    # Stack entries: (node, index, parent, children_visited)
+    stack: typing.List[tuple] = [(query, 0, None, False)]
+    pop = stack.pop
+    push = stack.append
+    while stack:
+        node, index, parent, children_visited = pop()
+        if children_visited:
+            leave(node, index, parent)
+            continue
+        skip_children = enter(node, index, parent) is False
+        push((node, index, parent, True))
+        if skip_children:
+            continue
+        children = node.children
+        for child_index in range(len(children) - 1, -1, -1):
+            push((children[child_index], child_index, node, False))
+
+
+def iter_preorder(query: Query) -> typing.Iterator[Query]:
+    """Iterate over the nodes of the query (parents before children)"""
+
+    stack = [query]
+    while stack:
+        node = stack.pop()
+        yield node
+        stack.extend(reversed(node.children))
+
+
+def iter_postorder(query: Query) -> typing.Iterator[Query]:
+    """Iterate over the nodes of the query (children before parents)"""
+
+    stack: typing.List[tuple] = [(query, False)]
+    while stack:
+        node, children_visited = stack.pop()
+        if children_visited:
+            yield node
+            continue
+        stack.append((node, True))
+        stack.extend((child, False) for child in reversed(node.children))
+
+
+class MultiVisitor(QueryVisitor):
+    """Runs several visitors in a single traversal.
+
+    If a visitor skips the children of a node, it does not receive the
+    events of the descendants (but leave() for the node itself)."""
+
+    def __init__(self, visitors: typing.List[QueryVisitor]) -> None:
+        self.visitors = visitors
+        self._enters = [visitor.enter for visitor in visitors]
+        self._leaves = [visitor.leave for visitor in visitors]
+        # Node at which the visitor skipped the children (or None)
+        self.skipped_at: typing.List[typing.Optional[Query]] = [None] * len(visitors)
+        self._nr_skipping = 0
+
+    def enter(
+        self, node: Query, index: int, parent: typing.Optional[Query]
+    ) -> typing.Optional[bool]:
+        skipped_at = self.skipped_at
+        if not node.children and not self._nr_skipping:
+            # Nothing to skip (fast path for leaves)
+            for enter in self._enters:
+                enter(node, index, parent)
+            return False
+        for i, enter in enumerate(self._enters):
+            if skipped_at[i] is None and enter(node, index, parent) is False:
+                skipped_at[i] = node
+                self._nr_skipping += 1
+        return False if self._nr_skipping == len(skipped_at) else None
+
+    def leave(self, node: Query, index: int, parent: typing.Optional[Query]) -> None:
+        if not self._nr_skipping:
+            for leave in self._leaves:
+                leave(node, index, parent)
+            return
+        skipped_at = self.skipped_at
+        for i, leave in enumerate(self._leaves):
+            if skipped_at[i] is node:
+                skipped_at[i] = None
+                self._nr_skipping -= 1
+            elif skipped_at[i] is not None:
+                continue
+            leave(node, index, parent)
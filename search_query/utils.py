@@ -1,7 +1,16 @@
 #!/usr/bin/env python3
 """Utilities for SearchQuery."""
+from __future__ import annotations
+
+import bisect
+import os
+import typing
+
 from search_query.constants import Colors
 
+if typing.TYPE_CHECKING:  # pragma: no
+    import concurrent.futures
+
 
 def format_query_string_pos(
     query_str: str, pos: tuple, color: str = Colors.ORANGE
@@ -12,3 +21,156 @@ def format_query_string_pos(
         + f"{color}{query_str[pos[0]:pos[1]]}{Colors.END}"
         + query_str[pos[1] :]
     )
+
+
+def write_atomic(path: str, data: typing.Union[str, bytes]) -> None:
+    """Write a file (to a temporary file that is renamed: readers never see partial files)"""
+    # (imported here: tempfile is slow to import)
+    import tempfile  # pylint: disable=import-outside-toplevel
+
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, exist_ok=True)
+    handle, temp_path = tempfile.mkstemp(dir=directory)
+    try:
+        with os.fdopen(handle, "wb") as file:
+            file.write(data.encode("utf-8") if isinstance(data, str) else data)
+        os.replace(temp_path, path)
+    except OSError:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+
+
+def create_executor(
+    workers: int, *, processes: bool = True
+) -> concurrent.futures.Executor:
+    """Process (or thread) pool with the number of workers"""
+    # (imported here: concurrent.futures is slow to import)
+    import concurrent.futures  # pylint: disable=import-outside-toplevel
+
+    if processes:
+        return concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    return concurrent.futures.ThreadPoolExecutor(max_workers=workers)
+
+
+class SourceMap:
+    """Maps positions between an expanded string and its source
+
+    The expanded string (e.g., a query list with resolved references)
+    consists of segments, which are either copied from the source or
+    inserted (e.g., parentheses, which are mapped to the span of the
+    reference). Segments are added in the order of the expanded string
+    and positions are mapped by binary search (O(log n))."""
+
+    def __init__(self) -> None:
+        # Segments: expanded start/end and source start/end
+        self._starts: typing.List[int] = []
+        self._ends: typing.List[int] = []
+        self._source_starts: typing.List[int] = []
+        self._source_ends: typing.List[int] = []
+        self._inserted: typing.List[bool] = []
+        # Segment nrs ordered by source position (for to_expanded())
+        self._by_source: typing.Optional[typing.List[int]] = None
+        self._sorted_source_starts: typing.List[int] = []
+
+    def add_segment(
+        self,
+        start: int,
+        end: int,
+        source_start: int,
+        source_end: int,
+        *,
+        inserted: bool = False,
+    ) -> None:
+        """Add a segment (after the previous segments of the expanded string)"""
+        if self._ends and start < self._ends[-1]:
+            raise ValueError("Segments must be added in order")
+        if not inserted and end - start != source_end - source_start:
+            raise ValueError("Copied segments must have the length of the source")
+        self._inserted.append(inserted)
+        self._starts.append(start)
+        self._ends.append(end)
+        self._source_starts.append(source_start)
+        self._source_ends.append(source_end)
+        self._by_source = None
+
+    def __len__(self) -> int:
+        return len(self._starts)
+
+    def to_source(self, pos: int, *, end: bool = False) -> int:
+        """Source position of a position in the expanded string
+
+        end: the position is the (exclusive) end of a span."""
+        if not self._starts:
+            return pos
+        if end:
+            nr = bisect.bisect_left(self._starts, pos) - 1
+        else:
+            nr = bisect.bisect_right(self._starts, pos) - 1
+        if nr < 0:
+            return self._source_starts[0]
+        start, seg_end = self._starts[nr], self._ends[nr]
+        source_start, source_end = self._source_starts[nr], self._source_ends[nr]
+        if pos >= seg_end:
+            return source_end
+        if self._inserted[nr]:
+            return source_end if end else source_start
+        return source_start + pos - start
+
+    def span_to_source(self, span: tuple) -> tuple:
+        """Source span of a span in the expanded string"""
+        start, end = span
+        source_start = self.to_source(start)
+        if end <= start:
+            return (source_start, source_start)
+        return (source_start, self.to_source(end, end=True))
+
+    def to_expanded(self, pos: int, *, end: bool = False) -> int:
+        """Position in the expanded string of a source position
+        (the first one if the source is expanded several times)
+
+        end: the position is the (exclusive) end of a span."""
+        if self._by_source is None:
+            self._by_source = sorted(
+                range(len(self._starts)),
+                # (repeated segments: the first one is found first)
+                key=lambda nr: (self._source_starts[nr], -nr),
+            )
+            self._sorted_source_starts = [
+                self._source_starts[nr] for nr in self._by_source
+            ]
+        index = bisect.bisect_right(self._sorted_source_starts, pos) - 1
+        # Copied segments do not overlap in the source: the copied segment
+        # with the last start (before pos) is the only candidate
+        while index >= 0:
+            nr = self._by_source[index]
+            seg_start = self._starts[nr]
+            source_start, source_end = self._source_starts[nr], self._source_ends[nr]
+            if not self._inserted[nr]:
+                if pos < source_end or (end and pos == source_end):
+                    return seg_start + pos - source_start
+                break
+            index -= 1
+        raise ValueError(f"Position not in the expanded string ({pos})")
+
+    def span_to_expanded(self, span: tuple) -> tuple:
+        """Span in the expanded string of a source span"""
+        start, end = span
+        expanded_start = self.to_expanded(start)
+        if end <= start:
+            return (expanded_start, expanded_start)
+        return (expanded_start, self.to_expanded(end, end=True))
+
+    def remap_linter_messages(self, linter_messages: typing.List[dict]) -> list:
+        """Linter messages with positions in the source
+        (messages that are repeated in the expanded string are reported once)"""
+        remapped: typing.List[dict] = []
+        seen: typing.Set[tuple] = set()
+        for message in linter_messages:
+            pos = self.span_to_source(message["pos"])
+            key = (message["level"], message["msg"], pos)
+            if key in seen:
+                continue
+            seen.add(key)
+            remapped.append({**message, "pos": pos})
+        return remapped
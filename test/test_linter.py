@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""Tests for the linter (search-file-lint)."""
+from __future__ import annotations
+
+import json
+import os
+import typing
+from pathlib import Path
+
+import pytest
+
+import search_query.linter
+from search_query.constants import ExitCodes
+
+# to run (from top-level dir): pytest test/test_linter.py
+
+
+def _write_search_file(path: Path, search_string: str) -> None:
+    path.write_text(
+        json.dumps(
+            {
+                "record_info": {},
+                "authors": [{"name": "Wagner, G."}],
+                "date": {},
+                "platform": "Web of Science",
+                "database": ["SCI-EXPANDED"],
+                "search_string": search_string,
+            }
+        ),
+        encoding="utf-8",
+    )
+
+
+@pytest.fixture(autouse=True)
+def fixture_cache_home(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Path:
+    """User cache directory (of the default cache file)"""
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    return tmp_path / "cache"
+
+
+@pytest.fixture(name="search_dir")
+def fixture_search_dir(tmp_path: Path) -> Path:
+    """Directory with search files (one with an error)"""
+    (tmp_path / "searches" / "sub").mkdir(parents=True)
+    _write_search_file(tmp_path / "searches" / "a.json", "TS=(a OR b)")
+    _write_search_file(tmp_path / "searches" / "sub" / "b.json", "TS=(c OR d)")
+    _write_search_file(tmp_path / "searches" / "sub" / "c.json", "TS=(e OR f) AND g")
+    (tmp_path / "searches" / "notes.txt").write_text("not a search file")
+    return tmp_path / "searches"
+
+
+def test_iter_file_paths(search_dir: Path) -> None:
+    """Test whether directories are searched for JSON files."""
+    assert [
+        Path(path).relative_to(search_dir).as_posix()
+        for path in search_query.linter.iter_file_paths([str(search_dir)])
+    ] == ["a.json", "sub/b.json", "sub/c.json"]
+
+
+@pytest.mark.parametrize("jobs", ["1", "2"])
+def test_main(
+    search_dir: Path,
+    tmp_path: Path,
+    jobs: str,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """Test the exit codes and the output of the linter."""
+    cache_file = str(tmp_path / "cache.json")
+    args = [str(search_dir), "-j", jobs, "--cache-file", cache_file]
+    assert search_query.linter.main(args) == ExitCodes.FAIL
+    output = capsys.readouterr().out
+    assert "c.json (wos)" in output
+    assert "Search field missing" in output
+    assert "a.json" not in output
+
+    assert (
+        search_query.linter.main([str(search_dir / "a.json"), "--no-cache"])
+        == ExitCodes.SUCCESS
+    )
+
+
+def test_cache(
+    search_dir: Path, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Test whether unchanged files are not linted again."""
+    cache_file = str(tmp_path / "cache.json")
+    args = [str(search_dir), "-j", "1", "--cache-file", cache_file]
+    search_query.linter.main(args)
+
+    linted: typing.List[str] = []
+    lint_file = search_query.linter.lint_file
+
+    def counting_lint_file(file_path: str, **kwargs: typing.Any) -> dict:
+        linted.append(Path(file_path).name)
+        return lint_file(file_path, **kwargs)
+
+    monkeypatch.setattr(search_query.linter, "lint_file", counting_lint_file)
+    assert search_query.linter.main(args) == ExitCodes.FAIL
+    assert not linted
+
+    _write_search_file(search_dir / "sub" / "c.json", "TS=(e OR f) AND TI=g")
+    assert search_query.linter.main(args) == ExitCodes.SUCCESS
+    assert linted == ["c.json"]
+
+    # Results of other library versions are not used
+    with open(cache_file, encoding="utf-8") as file:
+        data = json.load(file)
+    data["version"] = "0.0.0"
+    with open(cache_file, "w", encoding="utf-8") as file:
+        json.dump(data, file)
+    search_query.linter.main(args)
+    assert len(linted) == 4
+
+    # Results of files that are not in the run are dropped
+    search_query.linter.main([str(search_dir / "a.json")] + args[1:])
+    with open(cache_file, encoding="utf-8") as file:
+        assert len(json.load(file)["results"]) == 1
+
+
+def test_rules_and_timing(search_dir: Path, capsys: pytest.CaptureFixture) -> None:
+    """Test the selection of rules and the timing report."""
+    _write_search_file(search_dir / "a.json", "TS=(a OR a)")
+    args = [str(search_dir / "a.json"), "--no-cache", "--timing"]
+    assert search_query.linter.main(args) == ExitCodes.FAIL
+    output = capsys.readouterr().out
+    assert "Redundant term (a)" in output
+    assert any(line.startswith("redundant-term ") for line in output.splitlines())
+
+    args += ["--rules", "suspicious-wildcard"]
+    assert search_query.linter.main(args) == ExitCodes.SUCCESS
+    with pytest.raises(SystemExit):
+        search_query.linter.main([str(search_dir), "--rules", "xy"])
+
+
+def test_watch(search_dir: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test whether the watcher lints new and changed files only."""
+    linted: typing.List[str] = []
+    lint_file = search_query.linter.lint_file
+
+    def counting_lint_file(file_path: str, **kwargs: typing.Any) -> dict:
+        linted.append(Path(file_path).name)
+        return lint_file(file_path, **kwargs)
+
+    monkeypatch.setattr(search_query.linter, "lint_file", counting_lint_file)
+    watcher = search_query.linter.LintWatcher([str(search_dir)], workers=1)
+    results, removed = watcher.poll()
+    assert len(results) == 3
+    assert sorted(linted) == ["a.json", "b.json", "c.json"]
+    assert watcher.exit_code() == ExitCodes.FAIL
+
+    assert watcher.poll() == ([], [])
+    assert len(linted) == 3
+
+    _write_search_file(search_dir / "sub" / "c.json", "TS=(e OR f) AND TI=g")
+    _write_search_file(search_dir / "d.json", "TS=(x OR y)")
+    (search_dir / "a.json").unlink()
+    results, removed = watcher.poll()
+    assert sorted(Path(file_path).name for file_path, _ in results) == [
+        "c.json",
+        "d.json",
+    ]
+    assert [Path(file_path).name for file_path in removed] == ["a.json"]
+    assert linted[3:] == ["d.json", "c.json"]
+    assert len(watcher.results) == 3
+    assert watcher.exit_code() == ExitCodes.SUCCESS
+
+    # Same content (e.g., touched files): the result of the cache is used
+    _write_search_file(search_dir / "d.json", "TS=(x OR y)")
+    os.utime(search_dir / "d.json", ns=(1, 1))
+    results, _ = watcher.poll()
+    assert [Path(file_path).name for file_path, _ in results] == ["d.json"]
+    assert len(linted) == 5
+
+
+def test_main_watch(search_dir: Path, capsys: pytest.CaptureFixture) -> None:
+    """Test the output of the watch mode."""
+    watcher = search_query.linter.LintWatcher([str(search_dir)], workers=1)
+    assert watcher.watch(interval=0.01, rounds=2) == ExitCodes.FAIL
+    output = capsys.readouterr().out
+    assert "Search field missing" in output
+    assert output.count("Linted 3 file(s): 1 of 3 file(s) with messages") == 1
+
+
+def test_main_twice_in_directory(
+    search_dir: Path,
+    tmp_path: Path,
+    monkeypatch: pytest.MonkeyPatch,
+    capsys: pytest.CaptureFixture,
+) -> None:
+    """Test whether the default cache file is in the user cache directory."""
+    _write_search_file(search_dir / "sub" / "c.json", "TS=(e OR f) AND TI=g")
+    (search_dir / "notes.txt").unlink()
+    monkeypatch.chdir(search_dir)
+    assert search_query.linter.main([".", "-j", "1"]) == ExitCodes.SUCCESS
+    cache_file = Path(search_query.linter.default_cache_file())
+    assert cache_file.parent == tmp_path / "cache" / "search-query"
+    assert cache_file.exists()
+    assert sorted(path.name for path in search_dir.iterdir()) == ["a.json", "sub"]
+    assert search_query.linter.main([".", "-j", "1"]) == ExitCodes.SUCCESS
+    assert capsys.readouterr().out == ""
+
+    # Other directories have other cache files
+    monkeypatch.chdir(search_dir / "sub")
+    assert search_query.linter.default_cache_file() != str(cache_file)
+    monkeypatch.setenv("XDG_CACHE_HOME", "relative")
+    assert search_query.linter.default_cache_file().startswith(
+        os.path.join(os.path.expanduser("~"), ".cache")
+    )
+
+
+def test_print_error_with_path(search_dir: Path, capsys: pytest.CaptureFixture) -> None:
+    """Test whether errors of files are printed with the path."""
+    (search_dir / "broken.json").write_text("{}", encoding="utf-8")
+    args = [str(search_dir), "-j", "1", "--no-cache"]
+    assert search_query.linter.main(args) == ExitCodes.FAIL
+    assert f"{search_dir / 'broken.json'}: Data must have an 'authors' key." in (
+        capsys.readouterr().out
+    )
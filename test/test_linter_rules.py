@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Tests for the linter rules."""
+from __future__ import annotations
+
+import typing
+
+import pytest
+
+from search_query.constants import TokenTypes
+from search_query.linter import run_linter
+from search_query.linter_rules import Rule
+from search_query.linter_rules import RuleContext
+from search_query.linter_rules import RuleEngine
+from search_query.linter_rules import RULES
+from search_query.linter_rules import TERM
+
+# to run (from top-level dir): pytest test/test_linter_rules.py
+
+
+@pytest.mark.parametrize(
+    "query_string, syntax, messages",
+    [
+        (
+            "TS=(digital OR health OR digital)",
+            "wos",
+            [("redundant-term", "Redundant term (digital)", (25, 32))],
+        ),
+        (
+            "TS=(ab* OR *tion)",
+            "wos",
+            [
+                ("suspicious-wildcard", "Wildcard after a short stem (ab*)", (4, 7)),
+                (
+                    "suspicious-wildcard",
+                    "Wildcard at the start of a term (*tion)",
+                    (11, 16),
+                ),
+            ],
+        ),
+        (
+            'TS=("digital health OR app)',
+            "wos",
+            [(None, "Unexpected character", (4, 5))],
+        ),
+        (
+            "1. TS=(a OR a)\n2. #1 AND TS=b",
+            "wos",
+            [("redundant-term", "Redundant term (a)", (12, 13))],
+        ),
+    ],
+)
+def test_rules(query_string: str, syntax: str, messages: list) -> None:
+    """Test the messages of the rules (with the messages of the parser)."""
+    assert [
+        (message.get("rule"), message["msg"], message["pos"])
+        for message in run_linter(query_string, syntax)
+    ] == messages
+
+
+def test_rule_selection() -> None:
+    """Test whether only the selected rules are checked."""
+    engine = RuleEngine(["redundant-term"])
+    assert [
+        message["rule"] for message in run_linter("TS=(a* OR a*)", "wos", engine)
+    ] == ["redundant-term"]
+    with pytest.raises(ValueError):
+        RuleEngine(["xy"])
+
+
+def test_single_pass_and_timing() -> None:
+    """Test whether rules are only called for their node kinds and token types."""
+
+    visited: typing.List[tuple] = []
+
+    class _CountingRule(Rule):
+        name = "counting"
+        NODE_KINDS = ("OR", TERM)
+        TOKEN_TYPES = (TokenTypes.SEARCH_FIELD,)
+
+        def visit_token(self, token: typing.Any, context: RuleContext) -> None:
+            visited.append(("token", token.value))
+
+        def visit_node(self, node: typing.Any, context: RuleContext) -> None:
+            visited.append(("node", node.value))
+
+    RULES.register("counting", _CountingRule)
+    try:
+        engine = RuleEngine(["counting", "redundant-term"], timing=True)
+        run_linter("TS=(a OR b) AND TI=c", "wos", engine)
+    finally:
+        RULES.unregister("counting")
+
+    assert visited == [
+        ("token", "TS="),
+        ("token", "TI="),
+        ("node", "OR"),
+        ("node", "a"),
+        ("node", "b"),
+        ("node", "c"),
+    ]
+    assert engine.calls["counting"] == 8
+    assert engine.calls["redundant-term"] == 4
+    report = engine.timing_report()
+    assert "counting" in report and "redundant-term" in report
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""Tests for the linter server (search-file-lint-server)."""
+from __future__ import annotations
+
+import io
+import json
+import typing
+
+import search_query.linter
+import search_query.linter_server
+from search_query.linter_server import Document
+from search_query.linter_server import LinterServer
+
+# to run (from top-level dir): pytest test/test_linter_server.py
+
+
+def _frame(message: dict) -> bytes:
+    body = json.dumps({"jsonrpc": "2.0", **message}).encode("utf-8")
+    return f"Content-Length: {len(body)}\r\n\r\n".encode("ascii") + body
+
+
+def _run(messages: typing.List[dict]) -> typing.Tuple[int, typing.List[dict]]:
+    """Exit code and messages of the server"""
+    reader = io.BytesIO(b"".join(_frame(message) for message in messages))
+    writer = io.BytesIO()
+    exit_code = LinterServer(reader, writer).serve()
+
+    responses = []
+    output = io.BytesIO(writer.getvalue())
+    server = LinterServer(output, io.BytesIO())
+    while True:
+        message = server.read_message()
+        if message is None:
+            return exit_code, responses
+        responses.append(message)
+
+
+def _change(uri: str, start: int, end: int, text: str) -> dict:
+    return {
+        "method": "textDocument/didChange",
+        "params": {
+            "textDocument": {"uri": uri, "version": 2},
+            "contentChanges": [
+                {
+                    "range": {
+                        "start": {"line": 0, "character": start},
+                        "end": {"line": 0, "character": end},
+                    },
+                    "text": text,
+                }
+            ],
+        },
+    }
+
+
+def test_session() -> None:
+    uri = "file:///search.txt"
+    exit_code, responses = _run(
+        [
+            {
+                "id": 1,
+                "method": "initialize",
+                "params": {"initializationOptions": {"syntax": "wos"}},
+            },
+            {"method": "initialized", "params": {}},
+            {
+                "method": "textDocument/didOpen",
+                "params": {
+                    "textDocument": {
+                        "uri": uri,
+                        "languageId": "plaintext",
+                        "version": 1,
+                        "text": "TS=(a OR b)",
+                    }
+                },
+            },
+            # TS=(a OR b) -> TS=(a OR b OR b)
+            _change(uri, 10, 10, " OR b"),
+            # -> TS=(a OR b OR b OR OR c)
+            _change(uri, 15, 15, " OR OR c"),
+            {"id": 2, "method": "unknown/method", "params": {}},
+            {
+                "method": "textDocument/didClose",
+                "params": {"textDocument": {"uri": uri}},
+            },
+            {"id": 3, "method": "shutdown"},
+            {"method": "exit"},
+        ]
+    )
+    assert exit_code == 0
+    assert responses[0]["id"] == 1
+    assert responses[0]["result"]["capabilities"]["textDocumentSync"]["change"] == 2
+
+    diagnostics = [
+        response["params"]["diagnostics"]
+        for response in responses
+        if response.get("method") == "textDocument/publishDiagnostics"
+    ]
+    assert len(diagnostics) == 4
+    assert diagnostics[0] == []
+    assert diagnostics[1] == [
+        {
+            "range": {
+                "start": {"line": 0, "character": 14},
+                "end": {"line": 0, "character": 15},
+            },
+            "severity": 2,
+            "source": "search-file-lint-server",
+            "message": "Redundant term (b)",
+            "data": {"pos": [14, 15], "text": "b"},
+            "code": "redundant-term",
+        }
+    ]
+    assert [diagnostic["data"] for diagnostic in diagnostics[2]] == [
+        {"pos": [14, 15], "text": "b"},
+        {"pos": [19, 21], "text": "OR"},
+    ]
+    assert diagnostics[2][1]["severity"] == 1
+    assert diagnostics[3] == []
+
+    results = {response["id"]: response for response in responses if "id" in response}
+    assert results[2]["error"]["code"] == -32601
+    assert results[3] == {"jsonrpc": "2.0", "id": 3, "result": None}
+
+
+def test_exit_without_shutdown() -> None:
+    exit_code, responses = _run([{"method": "exit"}])
+    assert exit_code == 1
+    assert responses == []
+
+
+def test_lint_request() -> None:
+    _, responses = _run(
+        [
+            {
+                "id": 1,
+                "method": "searchQuery/lint",
+                "params": {"text": "TI=(a OR\nb*) AND\n*c", "syntax": "wos"},
+            },
+            {"id": 2, "method": "searchQuery/lint", "params": {}},
+        ]
+    )
+    diagnostics = responses[0]["result"]
+    assert diagnostics[-1]["range"] == {
+        "start": {"line": 2, "character": 0},
+        "end": {"line": 2, "character": 2},
+    }
+    assert diagnostics[-1]["code"] == "suspicious-wildcard"
+    assert responses[1]["error"]["code"] == -32602
+
+
+def test_document_matches_linter() -> None:
+    """Incremental edits result in the messages of run_linter()"""
+    query_str = "TS=(a OR b) AND (c OR d) AND TI=e"
+    document = Document(query_str, "wos")
+    edits = [(5, 5, " OR x*"), (0, 0, "("), (2, 4, ""), (20, 21, ") OR (")]
+    for start, end, text in edits:
+        document.change(
+            [
+                {
+                    "range": {
+                        "start": {"line": 0, "character": start},
+                        "end": {"line": 0, "character": end},
+                    },
+                    "text": text,
+                }
+            ]
+        )
+        query_str = query_str[:start] + text + query_str[end:]
+        assert document.text == query_str
+        expected = search_query.linter.run_linter(query_str, "wos")
+        assert [(message["msg"], list(message["pos"])) for message in expected] == [
+            (diagnostic["message"], diagnostic["data"]["pos"])
+            for diagnostic in document.diagnostics()
+        ]
+
+    query_list = "1. TS=(a)\n2. #1 AND b"
+    document.change([{"text": query_list}])
+    assert document.parser is None
+    assert [
+        (diagnostic["message"], diagnostic["data"]["pos"])
+        for diagnostic in document.diagnostics()
+    ] == [
+        (message["msg"], list(message["pos"]))
+        for message in search_query.linter.run_linter(query_list, "wos")
+    ]
+    assert document.diagnostics()[0]["range"]["start"]["line"] == 1
+
+
+def test_utf16_positions() -> None:
+    """LSP characters are UTF-16 code units (unless utf-32 is negotiated)"""
+    query_str = "TI=(\U0001f600 OR a OR a)"
+    document = Document(query_str, "wos")
+    diagnostic = document.diagnostics()[0]
+    assert diagnostic["data"] == {"pos": [14, 15], "text": "a"}
+    assert diagnostic["range"]["start"] == {"line": 0, "character": 15}
+    assert document.offset({"line": 0, "character": 15}) == 14
+
+    # Insert after the emoji (character 6: after the surrogate pair)
+    document.change(
+        [
+            {
+                "range": {
+                    "start": {"line": 0, "character": 6},
+                    "end": {"line": 0, "character": 6},
+                },
+                "text": "x",
+            }
+        ]
+    )
+    assert document.text == "TI=(\U0001f600x OR a OR a)"
+
+    document = Document(query_str, "wos", encoding="utf-32")
+    assert document.diagnostics()[0]["range"]["start"] == {"line": 0, "character": 14}
+
+
+def test_position_encoding_and_internal_error(monkeypatch: typing.Any) -> None:
+    def _fail(*args: typing.Any) -> None:
+        raise RuntimeError("failure")
+
+    monkeypatch.setattr(search_query.linter_server, "run_rules", _fail)
+    _, responses = _run(
+        [
+            {
+                "id": 1,
+                "method": "initialize",
+                "params": {
+                    "capabilities": {
+                        "general": {"positionEncodings": ["utf-8", "utf-32"]}
+                    }
+                },
+            },
+            {"id": 2, "method": "searchQuery/lint", "params": {"text": "TI=a"}},
+            {"id": 3, "method": "shutdown"},
+        ]
+    )
+    assert responses[0]["result"]["capabilities"]["positionEncoding"] == "utf-32"
+    assert responses[1]["error"] == {"code": -32603, "message": "failure"}
+    assert responses[2]["result"] is None
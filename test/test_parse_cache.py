@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Tests for the parse cache."""
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+import search_query.exception as search_query_exception
+import search_query.parse_cache
+from search_query.parse_cache import cache_key
+from search_query.parse_cache import ParseCache
+from search_query.parser import parse
+
+# to run (from top-level dir): pytest test/test_parse_cache.py
+
+
+def test_memory_tier() -> None:
+    """Test whether cached queries are returned (as new trees)."""
+    cache = ParseCache()
+    first = parse("TS=(a OR b)", syntax="wos", cache=cache)
+    second = parse("TS=(a OR b)", syntax="WOS", cache=cache)
+    assert second.to_string() == first.to_string() == "OR[a[ts], b[ts]]"
+    assert second is not first
+    assert second.children[0].position == (4, 5)
+    assert cache.stats() == {
+        "hits": 1,
+        "disk_hits": 0,
+        "misses": 1,
+        "entries": 1,
+        "bytes": cache.nr_bytes,
+    }
+
+
+def test_memory_tier_keeps_trees(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Test whether memory hits are copies (without decoding the binary format)."""
+    cache = ParseCache()
+    first = parse("TS=(a OR b)", syntax="wos", cache=cache)
+    first.children[0].value = "changed"
+
+    def _fail(data: bytes) -> None:
+        raise AssertionError("decoded")
+
+    monkeypatch.setattr(search_query.parse_cache, "loads", _fail)
+    second = parse("TS=(a OR b)", syntax="wos", cache=cache)
+    assert second.to_string() == "OR[a[ts], b[ts]]"
+    second.children[1].value = "changed"
+    assert parse("TS=(a OR b)", syntax="wos", cache=cache).children[1].value == "b"
+
+
+def test_keys() -> None:
+    """Test whether syntax and mode are part of the key."""
+    assert cache_key("a", "wos", "strict") != cache_key("a", "pubmed", "strict")
+    assert cache_key("a", "wos", "strict") != cache_key("a", "wos", "lenient")
+    cache = ParseCache()
+    parse("a[ti]", syntax="pubmed", cache=cache)
+    assert cache.get("a[ti]", "pubmed", "lenient") is None
+
+
+def test_errors_not_cached() -> None:
+    """Test whether syntax errors are raised (again)."""
+    cache = ParseCache()
+    for _ in range(2):
+        with pytest.raises(search_query_exception.QuerySyntaxError):
+            parse("TS=(a OR", syntax="wos", cache=cache)
+    assert len(cache) == 0
+    assert cache.misses == 2
+
+
+def test_eviction() -> None:
+    """Test whether the least recently used queries are evicted."""
+    cache = ParseCache()
+    parse("TS=a", syntax="wos", cache=cache)
+    size = cache.nr_bytes
+    cache = ParseCache(max_bytes=2 * size)
+    parse("TS=a", syntax="wos", cache=cache)
+    parse("TS=b", syntax="wos", cache=cache)
+    parse("TS=a", syntax="wos", cache=cache)
+    parse("TS=c", syntax="wos", cache=cache)
+    assert len(cache) == 2
+    assert cache.nr_bytes <= 2 * size
+    assert cache.get("TS=a", "wos") is not None
+    assert cache.get("TS=b", "wos") is None
+
+
+def test_disk_tier(tmp_path: Path) -> None:
+    """Test whether queries are shared through the disk tier."""
+    parse("TS=(a OR b)", syntax="wos", cache=ParseCache(directory=str(tmp_path)))
+    cache = ParseCache(directory=str(tmp_path))
+    query = parse("TS=(a OR b)", syntax="wos", cache=cache)
+    assert query.to_string() == "OR[a[ts], b[ts]]"
+    assert (cache.hits, cache.disk_hits, cache.misses) == (0, 1, 0)
+    # Queries from the disk tier are kept in memory
+    parse("TS=(a OR b)", syntax="wos", cache=cache)
+    assert cache.hits == 1
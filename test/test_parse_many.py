@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Tests for parsing many queries (in parallel)."""
+from __future__ import annotations
+
+import concurrent.futures
+
+import pytest
+
+from search_query.parser import parse_many
+from search_query.parser_wos import WOSParser
+from search_query.query import Query
+
+# to run (from top-level dir): pytest test/test_parse_many.py
+
+QUERIES = [
+    "TS=(a OR b)",
+    "TS=(a OR",
+    "1. TI=c\n2. TS=d\n3. #1 AND #2",
+    "TS=((x AND y) OR z)",
+]
+
+
+def test_parser_state_per_instance() -> None:
+    """Test whether parsers do not share linter messages."""
+    first = WOSParser("a OR TS=b", mode="lenient")
+    first.parse()
+    second = WOSParser("TS=(a OR b)")
+    second.parse()
+    assert len(first.linter_messages) == 1
+    assert second.linter_messages == []
+
+
+def test_parser_state_threads() -> None:
+    """Test whether parsers in threads report their own messages."""
+
+    def lint(nr: int) -> list:
+        parser = WOSParser(f"TS=(a{nr} OR b{nr}) OR c{nr}", mode="lenient")
+        parser.parse()
+        return parser.linter_messages
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=8) as pool:
+        for nr, messages in enumerate(pool.map(lint, range(200))):
+            assert len(messages) == 1
+            assert messages[0]["pos"][1] - messages[0]["pos"][0] == len(f"c{nr}")
+
+
+@pytest.mark.parametrize(
+    "workers, executor",
+    [(1, "process"), (2, "thread"), (2, "process")],
+)
+def test_parse_many(workers: int, executor: str) -> None:
+    """Test whether results are returned in order (queries or linter messages)."""
+    results = list(parse_many(QUERIES, "wos", workers=workers, executor=executor))
+    assert [index for index, _ in results] == [0, 1, 2, 3]
+    assert isinstance(results[0][1], Query)
+    assert results[0][1].to_string() == "OR[a[ts], b[ts]]"
+    assert results[1][1] == [{"level": "error", "msg": "Missing term", "pos": (8, 8)}]
+    assert results[2][1].to_string() == "AND[c[ti], d[ts]]"  # type: ignore
+    assert results[3][1].to_string() == "OR[AND[x[ts], y[ts]], z[ts]]"  # type: ignore
+
+
+def test_parse_many_invalid() -> None:
+    """Test invalid arguments."""
+    with pytest.raises(ValueError):
+        list(parse_many(QUERIES, "wos", workers=2, executor="gpu"))
+    assert list(parse_many(["a"], "xy", workers=1)) == [
+        (0, [{"level": "error", "msg": "Invalid syntax: xy", "pos": (0, 1)}])
+    ]
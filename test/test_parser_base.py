@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""Tests for the base parser (tokenizer)."""
+from __future__ import annotations
+
+import random
+import re
+
+import pytest
+
+import search_query.exception as search_query_exception
+from search_query.constants import TokenTypes
+from search_query.parser_base import QueryStringParser
+from search_query.parser_base import Token
+from search_query.parser_ebsco import EBSCOParser
+from search_query.parser_pubmed import PubmedParser
+from search_query.parser_wos import WOSListParser
+from search_query.parser_wos import WOSParser
+from search_query.query import Query
+
+
+class _TestParser(QueryStringParser):
+    TOKEN_PATTERNS = {
+        TokenTypes.SEARCH_FIELD: r"\b(?:TI|AB)=",
+        TokenTypes.LOGIC_OPERATOR: r"\b(?i:AND|OR|NOT)\b",
+        TokenTypes.PARENTHESIS_OPEN: r"\(",
+        TokenTypes.PARENTHESIS_CLOSED: r"\)",
+        TokenTypes.SEARCH_TERM: r'"[^"]*"|[\w*]+',
+    }
+
+
+def test_tokenize() -> None:
+    """Test whether tokens are matched and typed in a single pass."""
+
+    parser = _TestParser('TI=(digital health or "AI")')
+    parser.tokenize()
+    assert parser.tokens == [
+        Token("TI=", TokenTypes.SEARCH_FIELD, (0, 3)),
+        Token("(", TokenTypes.PARENTHESIS_OPEN, (3, 4)),
+        Token("digital", TokenTypes.SEARCH_TERM, (4, 11)),
+        Token("health", TokenTypes.SEARCH_TERM, (12, 18)),
+        Token("or", TokenTypes.LOGIC_OPERATOR, (19, 21)),
+        Token('"AI"', TokenTypes.SEARCH_TERM, (22, 26)),
+        Token(")", TokenTypes.PARENTHESIS_CLOSED, (26, 27)),
+    ]
+
+    parser.combine_subsequent_terms()
+    assert parser.tokens[2] == Token("digital health", TokenTypes.SEARCH_TERM, (4, 18))
+    assert len(parser.tokens) == 6
+
+
+def test_token_regex_compiled_once() -> None:
+    """Test whether the token regex is compiled per parser class."""
+
+    assert _TestParser.token_regex is not None
+    assert _TestParser("a").token_regex is _TestParser("b").token_regex
+    assert QueryStringParser.token_regex is None
+
+
+def test_get_token_types() -> None:
+    """Test whether characters that were not tokenized are reported."""
+
+    parser = _TestParser("TI=(robot* AND ai)")
+    parser.tokenize()
+    assert "robot*" in parser.get_token_types(parser.tokens)
+
+    parser = _TestParser("TI=(robot# AND ai)")
+    parser.tokenize()
+    with pytest.raises(ValueError):
+        parser.get_token_types(parser.tokens)
+
+
+def test_list_references() -> None:
+    """Test whether references are matched as whole tokens (#1 is not part of #12)."""
+
+    query_list = "\n".join(f"{i}. TS=t{i}" for i in range(1, 13)) + "\n13. #1 OR #12"
+    query = WOSListParser(query_list).parse()
+    assert query.to_string() == "OR[t1[ts], t12[ts]]"
+
+
+def test_list_positions() -> None:
+    """Test whether positions refer to the query_list."""
+
+    query_list = "1. TS=(a OR b)\n2. TI=c\n3. #1 AND #2 AND #1"
+    query = WOSListParser(query_list).parse()
+    assert query.to_string() == "AND[OR[a[ts], b[ts]], c[ti], OR[a[ts], b[ts]]]"
+    assert query.position == (29, 32)
+    assert query.children[1].position == (21, 22)
+    # Sub-queries that are referenced twice are copied
+    assert query.children[0] is not query.children[2]
+    assert query.children[2].parent is query
+    assert query.children[0].position == query.children[2].position == (9, 11)
+
+
+@pytest.mark.parametrize(
+    "query_list, msg, pos",
+    [
+        ("1. TS=(a OR\n2. #1 AND TS=b", "Missing term", (11, 11)),
+        ("1. TS=a\n2. #1 AND b", "Search field missing", (18, 19)),
+        ("1. #2\n2. #1 AND TS=b", "Circular reference", (3, 5)),
+    ],
+)
+def test_list_syntax_errors(query_list: str, msg: str, pos: tuple) -> None:
+    """Test whether errors are reported for the query_list."""
+
+    parser = WOSListParser(query_list)
+    with pytest.raises(search_query_exception.QuerySyntaxError) as exc_info:
+        parser.parse()
+    assert exc_info.value.pos == pos
+    assert exc_info.value.query_string == query_list
+    assert parser.linter_messages[0]["msg"] == msg
+
+
+def test_list_lenient_mode() -> None:
+    """Test whether circular references remain terms (lenient mode)."""
+
+    parser = WOSListParser("1. TS=a OR #2\n2. TS=b AND #1\n3. #1", mode="lenient")
+    query = parser.parse()
+    assert query.to_string() == "OR[a[ts], AND[b[ts], #1]]"
+    assert [(m["msg"], m["pos"]) for m in parser.linter_messages] == [
+        ("Circular reference", (26, 28)),
+    ]
+
+
+def _nodes(query: Query) -> list:
+    nodes = []
+    stack = [query]
+    while stack:
+        node = stack.pop()
+        search_field = node.search_field
+        nodes.append(
+            (
+                node.value,
+                node.position,
+                search_field.value if search_field else None,
+                search_field.position if search_field else None,
+                getattr(node, "near_param", None),
+            )
+        )
+        for child in node.children:
+            assert child.parent is node
+        stack.extend(reversed(node.children))
+    return nodes
+
+
+@pytest.mark.parametrize(
+    "parser_class, query_str",
+    [
+        (WOSParser, "TS=(a AND (b OR c) AND (d NEAR/2 e)) AND TI=(f OR (g AND h i))"),
+        (PubmedParser, "(a[ti] OR (b[tiab] AND c)) AND (d[mh] OR e[ti])"),
+        (EBSCOParser, "TI (a OR (b N3 c)) AND (AB d OR e)"),
+    ],
+)
+def test_reparse(parser_class: type, query_str: str) -> None:
+    """Test whether incremental re-parsing matches parsing the edited query."""
+
+    rng = random.Random(0)
+    replacements = ["", "x", " ", "(", ")", " OR ", " AND z"]
+    for _ in range(300):
+        parser = parser_class(query_str)
+        query = parser.parse()
+        for _ in range(5):
+            start = rng.randint(0, len(parser.query_str))
+            span = (start, min(start + rng.randint(0, 3), len(parser.query_str)))
+            replacement = rng.choice(replacements)
+            edited = (
+                parser.query_str[: span[0]] + replacement + parser.query_str[span[1] :]
+            )
+            expected_parser = parser_class(edited)
+            try:
+                expected = expected_parser.parse()
+            except search_query_exception.QuerySyntaxError as exc:
+                with pytest.raises(search_query_exception.QuerySyntaxError) as exc_info:
+                    parser.reparse(query, span, replacement)
+                assert exc_info.value.pos == exc.pos
+                break
+            query = parser.reparse(query, span, replacement)
+            assert query.parent is None
+            assert parser.query_str == edited
+            assert parser.tokens == expected_parser.tokens
+            assert _nodes(query) == _nodes(expected)
+            assert [(m["msg"], m["pos"]) for m in parser.linter_messages] == [
+                (m["msg"], m["pos"]) for m in expected_parser.linter_messages
+            ]
+
+
+def test_reparse_many_edits() -> None:
+    """Test whether shifts of many edits are applied (tokens and positions are
+    only read after the last edit or now and then)."""
+
+    query_str = " AND ".join(
+        f"TS=(a{nr} OR (b{nr} AND c{nr}) OR d{nr})" for nr in range(30)
+    )
+    rng = random.Random(2)
+    for reads in (False, True):
+        parser = WOSParser(query_str)
+        query = parser.parse()
+        for _ in range(200):
+            # Rename a term (the edits are spread over the query)
+            match = rng.choice(list(re.finditer(r"\b[a-z]\w*", parser.query_str)))
+            replacement = rng.choice(["x", "yyy", "z1"])
+            query = parser.reparse(query, match.span(), replacement)
+            if reads and rng.random() < 0.2:
+                node = rng.choice(list(query.walk()))
+                assert node.position is not None
+        expected_parser = WOSParser(parser.query_str)
+        expected = expected_parser.parse()
+        assert parser.tokens == expected_parser.tokens
+        assert _nodes(query) == _nodes(expected)
+
+
+def test_reparse_after_error() -> None:
+    """Test whether re-parsing after a syntax error parses the query again."""
+
+    parser = WOSParser("TS=(a OR b) AND TI=(c OR d)")
+    query = parser.parse()
+    with pytest.raises(search_query_exception.QuerySyntaxError):
+        parser.reparse(query, (9, 10), "")
+    query = parser.reparse(query, (9, 9), "b")
+    assert query.to_string() == "AND[OR[a[ts], b[ts]], OR[c[ti], d[ti]]]"
+
+
+@pytest.mark.parametrize(
+    "parser_class, query_str",
+    [
+        (WOSParser, "TS=(a AND (b OR c) AND (d NEAR/2 e)) AND TI=(f OR (g AND h i))"),
+        (PubmedParser, "(a[ti] OR (b[tiab] AND c)) AND (d[mh] OR e[ti])"),
+    ],
+)
+def test_reparse_lenient(parser_class: type, query_str: str) -> None:
+    """Test whether incremental re-parsing in lenient mode matches parsing."""
+
+    rng = random.Random(1)
+    replacements = ["", "x", "(", ")", " OR ", " AND AND "]
+    for _ in range(100):
+        parser = parser_class(query_str, mode="lenient")
+        query = parser.parse()
+        for _ in range(5):
+            start = rng.randint(0, len(parser.query_str))
+            span = (start, min(start + rng.randint(0, 3), len(parser.query_str)))
+            replacement = rng.choice(replacements)
+            edited = (
+                parser.query_str[: span[0]] + replacement + parser.query_str[span[1] :]
+            )
+            expected_parser = parser_class(edited, mode="lenient")
+            try:
+                expected = expected_parser.parse()
+            except search_query_exception.QuerySyntaxError:
+                break
+            query = parser.reparse(query, span, replacement)
+            assert parser.tokens == expected_parser.tokens
+            assert _nodes(query) == _nodes(expected)
+            assert sorted(
+                (m["msg"], m["pos"]) for m in parser.linter_messages
+            ) == sorted((m["msg"], m["pos"]) for m in expected_parser.linter_messages)
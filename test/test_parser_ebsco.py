@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Tests for the EBSCO parser."""
+from __future__ import annotations
+
+import pytest
+
+import search_query.exception as search_query_exception
+from search_query.constants import TokenTypes
+from search_query.linter import run_linter
+from search_query.parser import parse
+from search_query.parser_base import Token
+from search_query.parser_ebsco import EBSCOParser
+
+# flake8: noqa: E501
+
+# to run (from top-level dir): pytest test/test_parser_ebsco.py
+
+
+@pytest.mark.parametrize(
+    "query_string, tokens",
+    [
+        (
+            'TI ("digital health" OR tele medicine*) N5 MH "Diabetes+" and TIME',
+            [
+                Token("TI", TokenTypes.SEARCH_FIELD, (0, 2)),
+                Token("(", TokenTypes.PARENTHESIS_OPEN, (3, 4)),
+                Token('"digital health"', TokenTypes.SEARCH_TERM, (4, 20)),
+                Token("OR", TokenTypes.LOGIC_OPERATOR, (21, 23)),
+                Token("tele medicine*", TokenTypes.SEARCH_TERM, (24, 38)),
+                Token(")", TokenTypes.PARENTHESIS_CLOSED, (38, 39)),
+                Token("N5", TokenTypes.PROXIMITY_OPERATOR, (40, 42)),
+                Token("MH", TokenTypes.SEARCH_FIELD, (43, 45)),
+                Token('"Diabetes+" and TIME', TokenTypes.SEARCH_TERM, (46, 66)),
+            ],
+        ),
+    ],
+)
+def test_tokenization_ebsco(query_string: str, tokens: list) -> None:
+    """Test the tokenization of EBSCO queries."""
+    parser = EBSCOParser(query_string)
+    parser.tokenize()
+    assert parser.tokens == tokens
+
+
+@pytest.mark.parametrize(
+    "query_string, expected",
+    [
+        (
+            'TI ("digital health" OR telemedicine*) AND AB (app NOT android)',
+            'AND[OR["digital health"[ti], telemedicine*[ti]], NOT[app[ab], android[ab]]]',
+        ),
+        (
+            'SU diabetes OR MH "Diabetes Mellitus+"',
+            'OR[diabetes[su], "Diabetes Mellitus+"[mh]]',
+        ),
+        # Terms without field code are searched in the default fields
+        ("a OR TX b", "OR[a[all], b[all]]"),
+        # Proximity operators bind first, Boolean operators from left to right
+        ("TI a OR b N3 c AND d", "AND[OR[a[ti], NEAR(3)[b[all], c[all]]], d[all]]"),
+        ("TI (a W2 b)", "NEAR(2)[a[ti], b[ti]]"),
+    ],
+)
+def test_parser_ebsco(query_string: str, expected: str) -> None:
+    """Test the parsing of EBSCO queries."""
+    query = parse(query_string, syntax="ebsco")
+    assert query.to_string() == expected
+
+
+def test_list_parser_ebsco() -> None:
+    """Test the parsing of EBSCO queries in list format."""
+    query_list = "1. TI (a OR b)\n2. MH c\n3. S1 AND S2"
+    query = parse(query_list, syntax="ebsco")
+    assert query.to_string() == "AND[OR[a[ti], b[ti]], c[mh]]"
+
+
+@pytest.mark.parametrize(
+    "query_string, msg, pos",
+    [
+        ("TI (a OR", "Missing term", (8, 8)),
+        ("TI a AB b", "Missing operator", (5, 7)),
+        ("TI (a OR b", "Unbalanced parentheses", (3, 4)),
+    ],
+)
+def test_syntax_errors(query_string: str, msg: str, pos: tuple) -> None:
+    """Test whether syntax errors are reported with their positions."""
+    parser = EBSCOParser(query_string)
+    with pytest.raises(search_query_exception.QuerySyntaxError) as exc_info:
+        parser.parse()
+    assert exc_info.value.pos == pos
+    assert parser.linter_messages[0]["msg"] == msg
+
+
+@pytest.mark.parametrize(
+    "query_string, expected, messages",
+    [
+        ("(TI ) N5 ethic*", "ethic*[all]", [("Missing term", (4, 5))]),
+        ("a AND (TI ) OR b", "OR[a[all], b[all]]", [("Missing term", (10, 11))]),
+        ("TI (AB a OR ()) OR b", "OR[a[ab], b[all]]", [("Missing term", (13, 14))]),
+    ],
+)
+def test_lenient_mode(query_string: str, expected: str, messages: list) -> None:
+    """Test whether field tags do not apply after empty parentheses (lenient mode)."""
+    parser = EBSCOParser(query_string, mode="lenient")
+    query = parser.parse()
+    assert query.to_string() == expected
+    assert [(m["msg"], m["pos"]) for m in parser.linter_messages] == messages
+
+
+def test_run_linter() -> None:
+    """Test the linter with EBSCO queries (warnings do not stop the parser)."""
+    assert run_linter("TI (a N2 b)", "ebsco") == []
+    assert run_linter("TI (a W2 b)", "ebsco") == [
+        {
+            "level": "warning",
+            "msg": "Order of terms is not kept (W is parsed as N)",
+            "pos": (6, 8),
+        }
+    ]
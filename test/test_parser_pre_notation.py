@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""Tests for the pre-notation parser."""
+from __future__ import annotations
+
+import typing
+
+import pytest
+
+import search_query.exception as search_query_exception
+from search_query.and_query import AndQuery
+from search_query.constants import Fields
+from search_query.linter import run_linter
+from search_query.near_query import NearQuery
+from search_query.not_query import NotQuery
+from search_query.or_query import OrQuery
+from search_query.parser import parse
+from search_query.parser_pre_notation import PreNotationParser
+from search_query.query import Query
+
+# flake8: noqa: E501
+
+
+@pytest.mark.parametrize(
+    "query_string",
+    [
+        'AND[OR["AI"[ti], "Artificial Intelligence"[ti], NOT[robot*[ti]]], OR["health care"[ti], medicine[ti]], OR[ethic*[ab], moral*[ab]]]',
+        'OR["health, care"[ti], f(x)[ab], covid-19.1, a,b[ti]]',
+        "NEAR(5)[digital[ti], health[ti]]",
+        "robot*[ti]",
+    ],
+)
+def test_round_trip(query_string: str) -> None:
+    """Test whether pre-notation strings are parsed to identical queries."""
+
+    query = parse(query_string, syntax="pre_notation")
+    assert query.to_string() == query_string
+    assert parse(query.to_string(), syntax="pre_notation") == query
+
+
+def test_parsed_tree() -> None:
+    """Test the classes, search fields and near param of the parsed query."""
+
+    expected = AndQuery(
+        [
+            NearQuery(["digital", "health"], search_field=Fields.TITLE, near_param=3),
+            NotQuery(
+                [Query("robot*", search_field=None)], search_field=Fields.ABSTRACT
+            ),
+        ],
+        search_field=Fields.TITLE,
+    )
+    query = PreNotationParser(expected.to_string()).parse()
+
+    assert query == expected
+    assert isinstance(query.children[0], NearQuery)
+    assert query.children[0].near_param == 3  # type: ignore
+    assert isinstance(query.children[1], NotQuery)
+    assert query.children[0].children[1].search_field.value == Fields.TITLE  # type: ignore
+    assert query.children[1].children[0].search_field is None
+    assert query.children[0].parent is query
+    assert query.children[0].position == (4, 8)
+
+
+def test_deep_query() -> None:
+    """Test whether deeply nested queries are parsed (without recursion)."""
+
+    query_string = "AND[" * 20_000 + "a[ti]" + "]" * 20_000
+    query = parse(query_string, syntax="pre_notation")
+    assert query.get_nr_leaves() == 1
+    assert query.to_string() == query_string
+
+
+@pytest.mark.parametrize(
+    "query_string",
+    ["AND[a[ti], b[ti]", "AND[a[ti]]]", "OR[, a]", "a[ti"],
+)
+def test_invalid_query(query_string: str) -> None:
+    """Test whether invalid pre-notation strings raise an exception."""
+
+    with pytest.raises(search_query_exception.QuerySyntaxError):
+        parse(query_string, syntax="pre_notation")
+
+    parser = PreNotationParser(query_string)
+    with pytest.raises(search_query_exception.QuerySyntaxError):
+        parser.parse()
+    assert parser.linter_messages
+
+
+@pytest.mark.parametrize(
+    "query_string, expected, messages",
+    [
+        ("AND[a[ti], ", "AND[a[ti]]", [("Missing term or operator", (11, 11))]),
+        (
+            "AND[a[ti], b[ti]",
+            "AND[a[ti], b[ti]]",
+            [("Missing closing bracket", (16, 16))],
+        ),
+        ("AND[a[ti]] x", "AND[a[ti]]", [("Unexpected characters", (10, 12))]),
+        ("AND[", None, [("Missing term or operator", (4, 4))]),
+    ],
+)
+def test_lenient_mode(
+    query_string: str, expected: typing.Optional[str], messages: list
+) -> None:
+    """Test whether the linter reports errors (and the parser recovers)."""
+
+    assert [
+        (message["msg"], message["pos"])
+        for message in run_linter(query_string, "pre_notation")
+    ] == messages
+
+    parser = PreNotationParser(query_string, mode="lenient")
+    if expected is None:
+        with pytest.raises(search_query_exception.QuerySyntaxError):
+            parser.parse()
+    else:
+        assert parser.parse().to_string() == expected
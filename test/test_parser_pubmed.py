@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""Tests for the Pubmed parser."""
+from __future__ import annotations
+
+import pytest
+
+import search_query.exception as search_query_exception
+from search_query.constants import TokenTypes
+from search_query.parser import parse
+from search_query.parser_base import Token
+from search_query.parser_pubmed import PubmedParser
+
+# flake8: noqa: E501
+
+# to run (from top-level dir): pytest test/test_parser_pubmed.py
+
+
+@pytest.mark.parametrize(
+    "query_string, tokens",
+    [
+        (
+            '("digital health"[tiab] OR tele medicine*[Title]) and AND app',
+            [
+                Token("(", TokenTypes.PARENTHESIS_OPEN, (0, 1)),
+                Token('"digital health"', TokenTypes.SEARCH_TERM, (1, 17)),
+                Token("[tiab]", TokenTypes.SEARCH_FIELD, (17, 23)),
+                Token("OR", TokenTypes.LOGIC_OPERATOR, (24, 26)),
+                Token("tele medicine*", TokenTypes.SEARCH_TERM, (27, 41)),
+                Token("[Title]", TokenTypes.SEARCH_FIELD, (41, 48)),
+                Token(")", TokenTypes.PARENTHESIS_CLOSED, (48, 49)),
+                Token("and", TokenTypes.SEARCH_TERM, (50, 53)),
+                Token("AND", TokenTypes.LOGIC_OPERATOR, (54, 57)),
+                Token("app", TokenTypes.SEARCH_TERM, (58, 61)),
+            ],
+        ),
+    ],
+)
+def test_tokenization_pubmed(query_string: str, tokens: list) -> None:
+    """Test the tokenization of Pubmed queries."""
+    parser = PubmedParser(query_string)
+    parser.tokenize()
+    assert parser.tokens == tokens
+
+
+@pytest.mark.parametrize(
+    "query_string, expected",
+    [
+        (
+            '("digital health"[ti] OR telemedicine*[ab]) AND app[mh]',
+            'AND[OR["digital health"[ti], telemedicine*[ab]], app[mh]]',
+        ),
+        # Combined fields are expanded (and kept in their own group)
+        (
+            "a[tiab] OR b[ti]",
+            "OR[OR[a[ti], a[ab]], b[ti]]",
+        ),
+        # Aliases
+        (
+            "a[MeSH Terms] AND b[Title/Abstract] AND c[mesh]",
+            "AND[a[mh], OR[b[ti], b[ab]], c[mh]]",
+        ),
+        # Terms without search field are searched in all fields
+        ("a OR b[ti]", "OR[a[all], b[ti]]"),
+        # Operators are applied from left to right
+        ("a[ti] OR b[ti] AND c[ti]", "AND[OR[a[ti], b[ti]], c[ti]]"),
+        ("a[ti] AND b[ti] OR c[ti]", "OR[AND[a[ti], b[ti]], c[ti]]"),
+    ],
+)
+def test_parser_pubmed(query_string: str, expected: str) -> None:
+    """Test the parsing of Pubmed queries."""
+    query = parse(query_string, syntax="pubmed")
+    assert query.to_string() == expected
+
+
+def test_combined_field_positions() -> None:
+    """Test whether expanded terms keep the positions of the term and the field."""
+    query_string = "x AND diabet*[tiab]"
+    query = parse(query_string, syntax="pubmed")
+    expanded = query.children[1]
+    assert expanded.position == (6, 13)
+    for term in expanded.children:
+        assert term.position == (6, 13)
+        assert term.search_field.position == (13, 19)  # type: ignore
+
+
+def test_list_parser_pubmed() -> None:
+    """Test the parsing of Pubmed queries in list format."""
+    query_list = "1. a[ti] OR b[tiab]\n2. c[mh]\n3. #1 AND #2"
+    query = parse(query_list, syntax="pubmed")
+    assert query.to_string() == "AND[OR[a[ti], OR[b[ti], b[ab]]], c[mh]]"
+
+
+@pytest.mark.parametrize(
+    "query_string, msg, pos",
+    [
+        ("a[ti] OR", "Missing term", (8, 8)),
+        ("[ti]a", "Search field must follow a term", (0, 4)),
+        ("(a OR b)[ti]", "Search field must follow a term", (8, 12)),
+        ("a[xy]", "Search field not supported ([xy])", (1, 5)),
+        ("(a[ti] OR b[ti]", "Unbalanced parentheses", (0, 1)),
+    ],
+)
+def test_syntax_errors(query_string: str, msg: str, pos: tuple) -> None:
+    """Test whether syntax errors are reported with their positions."""
+    parser = PubmedParser(query_string)
+    with pytest.raises(search_query_exception.QuerySyntaxError) as exc_info:
+        parser.parse()
+    assert exc_info.value.pos == pos
+    assert parser.linter_messages[0]["msg"] == msg
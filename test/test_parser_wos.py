@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""Tests for the Web-of-Science parser."""
+from __future__ import annotations
+
+import pytest
+
+import search_query.exception as search_query_exception
+from search_query.constants import TokenTypes
+from search_query.linter import run_linter
+from search_query.parser import parse
+from search_query.parser_base import Token
+from search_query.parser_wos import WOSParser
+
+# flake8: noqa: E501
+
+# to run (from top-level dir): pytest test/test_parser_wos.py
+
+
+@pytest.mark.parametrize(
+    "query_string, tokens",
+    [
+        (
+            'TS=("digital health" OR tele medicine) NEAR/5 AND-related',
+            [
+                Token("TS=", TokenTypes.SEARCH_FIELD, (0, 3)),
+                Token("(", TokenTypes.PARENTHESIS_OPEN, (3, 4)),
+                Token('"digital health"', TokenTypes.SEARCH_TERM, (4, 20)),
+                Token("OR", TokenTypes.LOGIC_OPERATOR, (21, 23)),
+                Token("tele medicine", TokenTypes.SEARCH_TERM, (24, 37)),
+                Token(")", TokenTypes.PARENTHESIS_CLOSED, (37, 38)),
+                Token("NEAR/5", TokenTypes.PROXIMITY_OPERATOR, (39, 45)),
+                Token("AND-related", TokenTypes.SEARCH_TERM, (46, 57)),
+            ],
+        ),
+    ],
+)
+def test_tokenization_wos(query_string: str, tokens: list) -> None:
+    """Test the tokenization of WOS queries."""
+    parser = WOSParser(query_string)
+    parser.tokenize()
+    assert parser.tokens == tokens
+
+
+@pytest.mark.parametrize(
+    "query_string, expected",
+    [
+        (
+            'TS=("digital health" OR telemedicine*) AND TI=(app NOT android)',
+            'AND[OR["digital health"[ts], telemedicine*[ts]], NOT[app[ti], android[ti]]]',
+        ),
+        # Precedence: NEAR, NOT, AND, OR
+        (
+            "TS=(a OR b AND c NOT d NEAR/3 e)",
+            "OR[a[ts], AND[b[ts], NOT[c[ts], NEAR(3)[d[ts], e[ts]]]]]",
+        ),
+        # Chains of the same operator form one node (unless in parentheses)
+        ("TI=(a OR b OR c)", "OR[a[ti], b[ti], c[ti]]"),
+        ("TI=((a OR b) OR c)", "OR[OR[a[ti], b[ti]], c[ti]]"),
+        # NEAR without distance (default: 15)
+        ("TS=(a NEAR b)", "NEAR(15)[a[ts], b[ts]]"),
+        # Field tags apply to the next term or parentheses
+        ("ab = a OR TI=(b AND AB=c)", "OR[a[ab], AND[b[ti], c[ab]]]"),
+    ],
+)
+def test_parser_wos(query_string: str, expected: str) -> None:
+    """Test the parsing of WOS queries."""
+    query = parse(query_string, syntax="wos")
+    assert query.to_string() == expected
+
+
+def test_positions() -> None:
+    """Test whether positions are kept (e.g., for linter messages)."""
+    query_string = 'TS=("digital health" OR app*)'
+    query = parse(query_string, syntax="wos")
+    assert query.position == (21, 23)
+    term = query.children[1]
+    assert query_string[term.position[0] : term.position[1]] == "app*"
+    assert term.search_field.position == (0, 3)  # type: ignore
+
+
+def test_list_parser_wos() -> None:
+    """Test the parsing of WOS queries in list format."""
+    query_list = "1. TS=(a OR b)\n2. TI=c\n3. #1 AND #2"
+    query = parse(query_list, syntax="wos")
+    assert query.to_string() == "AND[OR[a[ts], b[ts]], c[ti]]"
+
+
+def test_deep_query() -> None:
+    """Test whether deeply nested parentheses are parsed (without recursion)."""
+    query_string = "TS=" + "(a AND " * 5_000 + "b" + ")" * 5_000
+    query = parse(query_string, syntax="wos")
+    assert query.get_nr_leaves() == 5_001
+
+
+@pytest.mark.parametrize(
+    "query_string, msg, pos",
+    [
+        ("TS=(a OR", "Missing term", (8, 8)),
+        ("TS=(a OR b))", "Unbalanced parentheses", (11, 12)),
+        ("TS=(a OR b", "Unbalanced parentheses", (3, 4)),
+        ("a OR b", "Search field missing", (0, 1)),
+        ("TS=(AND a)", "Missing term before operator", (4, 7)),
+        ("TS=(a) TI=b", "Missing operator", (7, 10)),
+        ("XY=a", "Search field not supported (XY=)", (0, 3)),
+        ("TS=(a SAME b)", "Operator not supported (SAME)", (6, 10)),
+        ('TS=("a OR b)', "Unexpected character", (4, 5)),
+    ],
+)
+def test_syntax_errors(query_string: str, msg: str, pos: tuple) -> None:
+    """Test whether syntax errors are reported with their positions."""
+    parser = WOSParser(query_string)
+    with pytest.raises(search_query_exception.QuerySyntaxError) as exc_info:
+        parser.parse()
+    assert exc_info.value.pos == pos
+    assert parser.linter_messages[0]["msg"] == msg
+    assert parser.linter_messages[0]["pos"] == pos
+
+
+def test_run_linter() -> None:
+    """Test the linter with WOS queries."""
+    assert run_linter("TS=(a OR b)", "wos") == []
+    assert run_linter("TS=(a OR b) AND c", "wos") == [
+        {"level": "error", "msg": "Search field missing", "pos": (16, 17)}
+    ]
+
+
+@pytest.mark.parametrize(
+    "query_string, expected, messages",
+    [
+        (
+            "TS=(a OR b c) AND (d OR) AND XY=e",
+            "AND[OR[a[ts], b c[ts]], d, e[XY=]]",
+            [
+                ("Search field missing", (19, 20)),
+                ("Missing term", (23, 24)),
+                ("Search field not supported (XY=)", (29, 32)),
+            ],
+        ),
+        (
+            "TS=(a AND OR b) TI=(c",
+            "AND[AND[a[ts], b[ts]], c[ti]]",
+            [
+                ("Missing term before operator", (10, 12)),
+                ("Missing operator", (16, 19)),
+                ("Unbalanced parentheses", (19, 20)),
+            ],
+        ),
+        (
+            "TS=(a SAME/2 b)) NOT",
+            "NEAR(2)[a[ts], b[ts]]",
+            [
+                ("Operator not supported (SAME)", (6, 12)),
+                ("Unbalanced parentheses", (15, 16)),
+                ("Missing term", (20, 20)),
+            ],
+        ),
+    ],
+)
+def test_lenient_mode(query_string: str, expected: str, messages: list) -> None:
+    """Test whether all errors are reported in one pass (lenient mode)."""
+    parser = WOSParser(query_string, mode="lenient")
+    query = parser.parse()
+    assert query.to_string() == expected
+    assert [(m["msg"], m["pos"]) for m in parser.linter_messages] == messages
+    assert run_linter(query_string, "wos") == parser.linter_messages
@@ -1,13 +1,20 @@
 #!/usr/bin/env python
 """Tests for search query translation"""
+import io
+import pickle
+import typing
 import unittest
 
 from search_query.and_query import AndQuery
 from search_query.constants import Fields
+from search_query.near_query import NearQuery
 from search_query.not_query import NotQuery
 from search_query.or_query import OrQuery
+from search_query.parser import parse
 from search_query.query import Query
+from search_query.query import QueryInterner
 from search_query.query import SearchField
+from search_query.traversal import QueryVisitor
 
 # pylint: disable=line-too-long
 # flake8: noqa: E501
@@ -148,6 +155,72 @@ class TestQuery(unittest.TestCase):
             "Query was not translated to PubMed Syntax",
         )
 
+    def test_write(self) -> None:
+        """test whether queries can be written to a stream in each syntax"""
+        for syntax in ["pre_notation", "structured", "wos", "pubmed"]:
+            stream = io.StringIO()
+            stream.write("query: ")
+            self.query_complete.write(syntax, stream)
+            self.assertEqual(
+                stream.getvalue(), "query: " + self.query_complete.to_string(syntax)
+            )
+        with self.assertRaises(ValueError):
+            self.query_complete.write("xy", io.StringIO())
+
+    def test_serialization_cache(self) -> None:
+        """test whether strings of subqueries are cached and reset after changes"""
+        expected = '(TI=("AI" OR "Artificial Intelligence" OR "Machine Learning" NOT robot*) AND TI=("health care" OR medicine) AND AB=(ethic* OR moral*))'
+        self.assertEqual(self.query_complete.to_string(syntax="wos"), expected)
+        # pylint: disable=protected-access
+        self.assertEqual(
+            self.query_health._get_serialized("wos"), 'TI=("health care" OR medicine)'
+        )
+        self.assertIsNone(self.query_health._get_serialized("pubmed"))
+
+        self.query_health.children[1].value = "medicin*"
+        self.assertIsNone(self.query_health._get_serialized("wos"))
+        self.assertIsNone(self.query_complete._get_serialized("wos"))
+        self.assertEqual(
+            self.query_ethics._get_serialized("wos"), "AB=(ethic* OR moral*)"
+        )
+        self.assertEqual(
+            self.query_complete.to_string(syntax="wos"),
+            expected.replace("medicine", "medicin*"),
+        )
+
+        self.query_ethics.children.pop()
+        self.assertEqual(
+            self.query_complete.to_string(syntax="pre_notation"),
+            'AND[OR["AI"[ti], "Artificial Intelligence"[ti], "Machine Learning"[ti], NOT[robot*[ti]]], OR["health care"[ti], medicin*[ti]], OR[ethic*[ab]]]',
+        )
+
+    def test_search_field_change_resets_cache(self) -> None:
+        """test whether search fields are replaced (not changed in place)"""
+        query = parse("TI=(a OR b)", syntax="wos")
+        self.assertEqual(query.to_string(), "OR[a[ti], b[ti]]")
+        with self.assertRaises(AttributeError):
+            query.children[0].search_field.value = Fields.ABSTRACT  # type: ignore
+        self.assertEqual(query.to_string(), "OR[a[ti], b[ti]]")
+
+        query.children[0].search_field = SearchField(Fields.ABSTRACT)
+        self.assertEqual(query.to_string(), "OR[a[ab], b[ti]]")
+
+    def test_to_strings(self) -> None:
+        """test whether a query can be translated to several syntaxes in one pass"""
+        syntaxes = ["pre_notation", "structured", "wos", "pubmed"]
+        self.assertEqual(
+            self.query_health.to_string(syntax="wos"), 'TI=("health care" OR medicine)'
+        )
+        strings = self.query_complete.to_strings(syntaxes)
+        self.assertEqual(list(strings), syntaxes)
+
+        # pylint: disable=protected-access
+        for syntax in syntaxes:
+            self.query_complete._invalidate()
+            self.assertEqual(strings[syntax], self.query_complete.to_string(syntax))
+        with self.assertRaises(ValueError):
+            self.query_complete.to_strings(["wos", "xy"])
+
     def test_invalid_tree_structure(self) -> None:
         """test wheter an invalid Query (which includes a cycle), correctly raises an exception"""
         with self.assertRaises(ValueError):
@@ -156,6 +229,267 @@ class TestQuery(unittest.TestCase):
                 search_field=SearchField("Author Keywords"),
             )
 
+    def test_shared_child_is_rejected(self) -> None:
+        """test whether a node cannot occur twice in one tree"""
+        with self.assertRaises(ValueError):
+            OrQuery(
+                [self.query_ethics, self.query_ethics],
+                search_field=SearchField(Fields.TITLE),
+            )
+        with self.assertRaises(ValueError):
+            OrQuery(
+                [self.query_ethics, self.query_ethics.children[0]],
+                search_field=SearchField(Fields.TITLE),
+            )
+        with self.assertRaises(ValueError):
+            self.query_health.children.append(self.query_robot)
+
+    def test_child_of_another_query_is_copied(self) -> None:
+        """test whether subtrees can be reused in other queries (as copies)"""
+        term = OrQuery(["ethic*"], search_field=SearchField(Fields.ABSTRACT))
+        query_1 = OrQuery([term], search_field=SearchField(Fields.ABSTRACT))
+        query_2 = OrQuery([term], search_field=SearchField(Fields.ABSTRACT))
+        self.assertIs(query_1.children[0], term)
+        self.assertIsNot(query_2.children[0], term)
+        self.assertEqual(query_2.children[0], term)
+        self.assertIs(query_2.children[0].parent, query_2)
+        self.assertIs(term.parent, query_1)
+
+        query_robot = OrQuery(
+            [self.query_robot], search_field=SearchField(Fields.TITLE)
+        )
+        self.assertEqual(query_robot.children[0], self.query_robot)
+        self.assertIs(self.query_robot.parent, self.query_ai)
+
+    def test_failed_construction_does_not_attach_children(self) -> None:
+        """test whether children remain unattached if building the tree fails"""
+        query_free = OrQuery(["ethic*"], search_field=SearchField(Fields.ABSTRACT))
+        query_twice = OrQuery(["moral*"], search_field=SearchField(Fields.ABSTRACT))
+        with self.assertRaises(ValueError):
+            AndQuery(
+                [query_free, query_twice, query_twice],
+                search_field=SearchField(Fields.TITLE),
+            )
+        self.assertIsNone(query_free.parent)
+        AndQuery([query_free], search_field=SearchField(Fields.TITLE))
+
+    def test_parent(self) -> None:
+        """test whether the parent of each node is set"""
+        self.assertIsNone(self.query_complete.parent)
+        self.assertIs(self.query_ai.parent, self.query_complete)
+        self.assertIs(self.query_robot.parent, self.query_ai)
+        self.assertIs(self.query_health.children[0].parent, self.query_health)
+
+    def test_compact_layout(self) -> None:
+        """test whether nodes are slotted and search fields/terms are shared"""
+        query_1 = OrQuery(["robot" + "ics", "ai"], search_field=Fields.TITLE)
+        query_2 = AndQuery(["robotics"], search_field=Fields.TITLE)
+        self.assertFalse(hasattr(query_1, "__dict__"))
+        self.assertFalse(hasattr(query_1.search_field, "__dict__"))
+        self.assertIs(
+            query_1.children[0].search_field, query_2.children[0].search_field
+        )
+        self.assertIs(query_1.children[0].value, query_2.children[0].value)
+
+    def test_structural_equality(self) -> None:
+        """test whether identical (sub)queries are equal and have the same hash"""
+        query_health = OrQuery(
+            ['"health care"', "medicine"],
+            search_field=SearchField(Fields.TITLE, position=(3, 5)),
+        )
+        self.assertEqual(query_health, self.query_health)
+        self.assertEqual(hash(query_health), hash(self.query_health))
+        self.assertNotEqual(self.query_health, self.query_ethics)
+        self.assertEqual({self.query_health: 1}[query_health], 1)
+
+        query_health.children[1].value = "medicin*"
+        self.assertNotEqual(query_health, self.query_health)
+        query_health.children[1].value = "medicine"
+        self.assertEqual(hash(query_health), hash(self.query_health))
+
+    def test_mutation_keeps_tree_valid(self) -> None:
+        """test whether modifying children rejects cycles and shared nodes"""
+        with self.assertRaises(ValueError):
+            self.query_robot.children.append(self.query_complete)
+        with self.assertRaises(ValueError):
+            self.query_ethics.children.append(self.query_robot)
+
+        old_hash = hash(self.query_complete)
+        removed = self.query_ai.children.pop()
+        self.assertIsNone(removed.parent)
+        self.assertNotEqual(hash(self.query_complete), old_hash)
+        self.query_ethics.children.append(removed)
+        self.assertIs(removed.parent, self.query_ethics)
+
+    def test_near_param_invalidates_caches(self) -> None:
+        """test whether changing near_param resets hashes and cached strings"""
+        query = NearQuery(["ethic*", "moral*"], search_field="ti", near_param=3)
+        parent = AndQuery([query], search_field="ti")
+        same = NearQuery(["ethic*", "moral*"], search_field="ti", near_param=3)
+        self.assertEqual(query, same)
+        string = parent.to_string("pre_notation")
+        query.near_param = 5
+        self.assertNotEqual(query, same)
+        self.assertNotEqual(parent.to_string("pre_notation"), string)
+        self.assertIn("NEAR(5)", parent.to_string("pre_notation"))
+
+        interned = QueryInterner().intern(query)
+        with self.assertRaises(AttributeError):
+            interned.near_param = 2  # type: ignore
+
+    def test_interned_search_field_is_immutable(self) -> None:
+        """test whether shared search fields cannot be modified"""
+        search_field = SearchField.intern(Fields.TITLE)
+        query = OrQuery(["a"], search_field="ti")
+        self.assertIs(search_field, query.children[0].search_field)
+        with self.assertRaises(AttributeError):
+            search_field.value = Fields.ABSTRACT
+        with self.assertRaises(AttributeError):
+            search_field.position = (0, 2)
+        self.assertIs(pickle.loads(pickle.dumps(search_field)), search_field)
+
+        own_search_field = SearchField(Fields.TITLE)
+        own_search_field.position = (0, 2)
+
+    def test_hash_after_search_field_change(self) -> None:
+        """test whether hashes are reset when the search field is replaced"""
+        query = parse("TI=(a OR b)", syntax="wos")
+        expected = parse("TI=(a) OR AB=(b)", syntax="wos")
+        self.assertNotEqual(hash(query), hash(expected))
+        with self.assertRaises(AttributeError):
+            query.children[1].search_field.value = Fields.ABSTRACT  # type: ignore
+        query.children[1].search_field = SearchField(Fields.ABSTRACT)
+        self.assertEqual(hash(query), hash(expected))
+        self.assertEqual(query, expected)
+        self.assertIs(
+            QueryInterner().intern(query).children[1].search_field,
+            SearchField.intern(Fields.ABSTRACT),
+        )
+
+    def test_interned_query_is_not_marked(self) -> None:
+        """test whether positions and marks of shared nodes cannot be set"""
+        interned = QueryInterner().intern(OrQuery(["a", "b"], search_field="ti"))
+        with self.assertRaises(AttributeError):
+            interned.position = (0, 1)
+        with self.assertRaises(AttributeError):
+            interned.mark()
+        self.assertFalse(interned.children[0].marked)
+        interned.remove_marks()
+
+        query = AndQuery([interned, "c"], search_field="ti")
+        with self.assertRaises(AttributeError):
+            query.mark()
+        self.assertFalse(query.marked)
+
+    def test_remove_by_identity(self) -> None:
+        """test whether remove() detaches the given node (not an equal sibling)"""
+        query = OrQuery(["ethic*", "ethic*"], search_field="ab")
+        first, second = query.children
+        self.assertEqual(first, second)
+        query.children.remove(second)
+        self.assertEqual(query.children, [first])
+        self.assertIs(query.children[0], first)
+        self.assertIsNone(second.parent)
+        self.assertIs(first.parent, query)
+        with self.assertRaises(ValueError):
+            query.children.remove(second)
+
+    def test_copy(self) -> None:
+        """test whether copies are independent (shared search fields remain shared)"""
+        query = parse("TS=(a NEAR/3 b) OR TI=c", syntax="wos")
+        copy = query.copy()
+        self.assertEqual(copy, query)
+        self.assertIsNone(copy.parent)
+        near = copy.children[0]
+        self.assertEqual(near.near_param, 3)  # type: ignore
+        self.assertIs(near.children[0].parent, near)
+        self.assertEqual(near.children[1].position, (13, 14))
+        search_field = near.children[0].search_field
+        self.assertIs(near.children[1].search_field, search_field)
+        self.assertIsNot(search_field, query.children[0].children[0].search_field)
+        copy.children[1].value = "changed"
+        self.assertEqual(query.children[1].value, "c")
+
+    def test_query_interner(self) -> None:
+        """test whether identical subtrees are shared after interning"""
+        query = AndQuery(
+            [
+                OrQuery(
+                    ["ethic*", "moral*"], search_field=SearchField(Fields.ABSTRACT)
+                ),
+                OrQuery(
+                    ["ethic*", "moral*"], search_field=SearchField(Fields.ABSTRACT)
+                ),
+            ],
+            search_field=SearchField(Fields.TITLE),
+        )
+        interner = QueryInterner()
+        interned = interner.intern(query)
+        self.assertEqual(interned, query)
+        self.assertIs(interned.children[0], interned.children[1])
+        self.assertIs(interner.intern(self.query_ethics), interned.children[0])
+        self.assertEqual(len(interner), 4)
+        with self.assertRaises(AttributeError):
+            interned.value = "OR"
+        # Interned queries can be shared by several parents
+        AndQuery([interned, interned], search_field=SearchField(Fields.TITLE))
+
+    def test_visitor(self) -> None:
+        """test whether visitors are called in pre-/post-order and can skip children"""
+
+        class Recorder(QueryVisitor):
+            """Records the visited nodes"""
+
+            def __init__(self, skip: Query) -> None:
+                self.events: list = []
+                self.skip = skip
+
+            def enter(
+                self, node: Query, index: int, parent: typing.Optional[Query]
+            ) -> bool:
+                self.events.append(("enter", node.value, index))
+                return node is not self.skip
+
+            def leave(
+                self, node: Query, index: int, parent: typing.Optional[Query]
+            ) -> None:
+                self.events.append(("leave", node.value, index))
+
+        recorder = Recorder(skip=self.query_robot)
+        self.query_ai.accept(recorder)
+        self.assertEqual(
+            recorder.events,
+            [
+                ("enter", "OR", 0),
+                ("enter", '"AI"', 0),
+                ("leave", '"AI"', 0),
+                ("enter", '"Artificial Intelligence"', 1),
+                ("leave", '"Artificial Intelligence"', 1),
+                ("enter", '"Machine Learning"', 2),
+                ("leave", '"Machine Learning"', 2),
+                ("enter", "NOT", 3),
+                ("leave", "NOT", 3),
+                ("leave", "OR", 0),
+            ],
+        )
+        self.assertEqual(
+            [node.value for node in self.query_robot.walk(order="postorder")],
+            ["robot*", "NOT"],
+        )
+
+    def test_deep_query(self) -> None:
+        """test whether very deep queries can be counted and serialized (no recursion)"""
+        query: Query = Query("t0", search_field=SearchField(Fields.TITLE))
+        for i in range(1, 20_000):
+            query = AndQuery([query, f"t{i}"], search_field=SearchField(Fields.TITLE))
+        self.assertEqual(query.get_nr_leaves(), 20_000)
+        self.assertTrue(
+            query.to_string(syntax="wos").endswith("AND t19998) AND t19999)")
+        )
+        self.assertTrue(query.to_string().startswith("AND[AND[AND["))
+        query.mark()
+        query.remove_marks()
+
 
 if __name__ == "__main__":
     unittest.main()
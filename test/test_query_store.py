@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""Tests for the binary query store."""
+from __future__ import annotations
+
+import pytest
+
+from search_query.and_query import AndQuery
+from search_query.constants import Fields
+from search_query.not_query import NotQuery
+from search_query.or_query import OrQuery
+from search_query.query import Query
+from search_query.query import SearchField
+from search_query.query_store import dump_queries
+from search_query.query_store import dumps
+from search_query.query_store import loads
+from search_query.query_store import QueryStore
+
+
+def _build_query(term: str) -> Query:
+    return AndQuery(
+        [
+            OrQuery(
+                [
+                    term,
+                    '"health care"',
+                    NotQuery(["robot*"], search_field=Fields.TITLE),
+                ],
+                search_field=Fields.TITLE,
+            ),
+            Query(
+                "ethic*",
+                search_field=SearchField(Fields.ABSTRACT, position=(20, 24)),
+                position=(25, 31),
+            ),
+        ],
+        search_field=Fields.TITLE,
+        position=(0, 32),
+    )
+
+
+def test_dumps_loads() -> None:
+    """Test whether a query is restored from its binary representation."""
+
+    query = _build_query("médecine")
+    restored = loads(dumps(query))
+
+    assert restored == query
+    assert restored.to_string() == query.to_string()
+    assert isinstance(restored, AndQuery)
+    assert isinstance(restored.children[0].children[2], NotQuery)
+    assert restored.position == (0, 32)
+    assert restored.children[1].position == (25, 31)
+    assert restored.children[1].search_field.position == (20, 24)  # type: ignore
+    assert restored.children[0].children[0].parent is restored.children[0]
+
+
+def test_query_store_file(tmp_path) -> None:  # type: ignore
+    """Test whether queries are loaded from a memory-mapped file."""
+
+    queries = [_build_query(f"term{i}") for i in range(10)]
+    path = tmp_path / "queries.bin"
+    with open(path, "wb") as file:
+        dump_queries(queries, file)
+
+    with QueryStore.open(str(path)) as store:
+        assert len(store) == 10
+        assert store[3] == queries[3]
+        assert store[-1] == queries[-1]
+        assert store[3] is not store[3]
+        assert list(store) == queries
+        assert store[2:4] == queries[2:4]
+        with pytest.raises(IndexError):
+            store[10]  # pylint: disable=pointless-statement
+
+
+def test_invalid_data() -> None:
+    """Test whether invalid data is rejected."""
+
+    with pytest.raises(ValueError):
+        loads(b"XXXX" + dumps(_build_query("a"))[4:])
+    with pytest.raises(ValueError):
+        loads(b"")
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Tests for the registry of parsers and serializers."""
+from __future__ import annotations
+
+import subprocess
+import sys
+
+import pytest
+
+from search_query.parser import PARSERS
+from search_query.parser_wos import WOSParser
+from search_query.registry import Registry
+
+# to run (from top-level dir): pytest test/test_registry.py
+
+
+def test_lazy_import() -> None:
+    """Test whether parsers and serializers are imported on first use."""
+    code = (
+        "import sys, search_query.parser, search_query.linter\n"
+        "print(sorted(name for name in sys.modules if name.startswith("
+        "('search_query.parser_', 'search_query.serializer_'))))\n"
+        "assert 'search_query.query_store' not in sys.modules\n"
+        "search_query.parser.parse('TS=a', syntax='wos').to_string('wos')\n"
+        "print(sorted(name for name in sys.modules if name.startswith("
+        "('search_query.parser_', 'search_query.serializer_'))))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    before, after = result.stdout.splitlines()
+    assert before == "[]"
+    assert "search_query.parser_wos" in after
+    assert "search_query.serializer_wos" in after
+    assert "search_query.parser_pubmed" not in after
+
+
+def test_registry() -> None:
+    """Test the registration by path and by class."""
+    registry = Registry(
+        "search_query.test", {"wos": "search_query.parser_wos:WOSParser"}
+    )
+    assert "wos" in registry
+    assert registry["wos"] is WOSParser
+    assert "xy" not in registry
+    with pytest.raises(KeyError):
+        registry["xy"]  # pylint: disable=pointless-statement
+
+    registry.register("xy", WOSParser)
+    assert registry["xy"] is WOSParser
+    assert list(registry) == ["wos", "xy"]
+    assert PARSERS["wos"] is WOSParser
+
+
+def test_version() -> None:
+    """Test whether the version is a string (also after importing _version)."""
+    code = (
+        "import search_query, search_query._version\n"
+        "assert isinstance(search_query.__version__, str)\n"
+        "from search_query.parse_cache import cache_key\n"
+        "cache_key('TS=a', 'wos', 'strict')\n"
+        "print(search_query.__version__)\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert result.stdout.strip()
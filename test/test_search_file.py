@@ -2,7 +2,17 @@
 """Tests for SearchFile parser."""
 from __future__ import annotations
 
+import gzip
+import json
+import shutil
+from pathlib import Path
+
+import pytest
+
+from search_query.search_file import iter_search_files
+from search_query.search_file import read_json_lines
 from search_query.search_file import SearchFile
+from search_query.search_file import write_json_lines
 
 
 def test_search_history_file_parser() -> None:
@@ -13,3 +23,61 @@ def test_search_history_file_parser() -> None:
     result = SearchFile(file_path)
 
     assert hasattr(result, "parsed")
+
+
+def test_json_lines_corpus(tmp_path: Path) -> None:
+    """Test writing and reading JSON Lines corpora (plain and gzip)."""
+
+    search_file = SearchFile("test/search_history_file_1.json")
+    records = [search_file.to_dict()]
+    for nr in range(3):
+        records.append({**records[0], "search_string": f"TS=(term{nr})"})
+    search_files = [SearchFile.from_dict(record) for record in records]
+    assert search_files[0].to_dict() == records[0]
+    assert search_files[0].parsed == search_file.parsed
+
+    (tmp_path / "sub").mkdir()
+    write_json_lines(search_files[:2], str(tmp_path / "corpus.jsonl"))
+    assert (
+        write_json_lines(iter(search_files[2:]), str(tmp_path / "sub" / "c.jsonl.gz"))
+        == 2
+    )
+    with gzip.open(tmp_path / "sub" / "c.jsonl.gz", "rt", encoding="utf-8") as file:
+        assert len(file.readlines()) == 2
+    shutil.copy("test/search_history_file_1.json", tmp_path / "sub" / "single.json")
+
+    loaded = list(read_json_lines(str(tmp_path / "corpus.jsonl")))
+    assert [item.to_dict() for item in loaded] == records[:2]
+
+    assert [item.search_string for item in iter_search_files(str(tmp_path))] == [
+        item.search_string for item in search_files + [search_file]
+    ]
+    assert [
+        item.search_string
+        for item in iter_search_files(str(tmp_path / "sub" / "c.jsonl.gz"))
+    ] == ["TS=(term1)", "TS=(term2)"]
+
+    # Records are validated (with the line of the record)
+    with open(tmp_path / "invalid.jsonl", "w", encoding="utf-8") as file:
+        file.write(json.dumps(records[0]) + "\n\n")
+        file.write(json.dumps({**records[0], "authors": "Wagner"}) + "\n")
+    records_iter = read_json_lines(str(tmp_path / "invalid.jsonl"))
+    assert next(records_iter).search_string == search_file.search_string
+    with pytest.raises(ValueError, match="invalid.jsonl:3: Authors must be a list"):
+        next(records_iter)
+
+    # Malformed lines are reported with the line
+    with open(tmp_path / "malformed.jsonl", "w", encoding="utf-8") as file:
+        file.write(json.dumps(records[0]) + "\n")
+        file.write('{"record_info": \n')
+    with pytest.raises(ValueError, match="malformed.jsonl:2: Expecting value"):
+        list(read_json_lines(str(tmp_path / "malformed.jsonl")))
+
+
+def test_iter_search_files_skips_hidden_files(tmp_path: Path) -> None:
+    """Test whether hidden files are skipped."""
+    shutil.copy("test/search_history_file_1.json", tmp_path / "search.json")
+    (tmp_path / ".hidden.json").write_text(
+        '{"version": "0", "results": {}}', encoding="utf-8"
+    )
+    assert len(list(iter_search_files(str(tmp_path)))) == 1
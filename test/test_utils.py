@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""Tests for the utilities."""
+from __future__ import annotations
+
+import os
+from pathlib import Path
+
+import pytest
+
+import search_query.exception as search_query_exception
+
+from search_query.linter import run_linter
+from search_query.parser_wos import WOSListParser
+from search_query.utils import SourceMap
+from search_query.utils import write_atomic
+
+# to run (from top-level dir): pytest test/test_utils.py
+
+QUERY_LIST = "1. TS=(a OR b)\n2. TI=c\n3. #1 AND #2 AND #1 AND d"
+
+
+def test_expand() -> None:
+    """Test whether references are expanded with a source map."""
+    search_string, source_map = WOSListParser(QUERY_LIST).expand()
+    assert search_string == "(TS=(a OR b)) AND (TI=c) AND (TS=(a OR b)) AND d"
+
+    # Copied characters are mapped to their source (both directions)
+    for pos, char in enumerate(search_string):
+        if char in "()" and QUERY_LIST[source_map.to_source(pos)] == "#":
+            continue
+        assert QUERY_LIST[source_map.to_source(pos)] == char
+    assert source_map.to_expanded(7) == 5
+    assert source_map.span_to_expanded((7, 14)) == (5, 12)
+    # Inserted parentheses are mapped to the reference
+    assert source_map.span_to_source((0, 1)) == (26, 28)
+    assert source_map.span_to_source((0, 13)) == (26, 28)
+    assert source_map.span_to_source((1, 12)) == (3, 14)
+    # The reference itself is not in the expanded string
+    with pytest.raises(ValueError):
+        source_map.to_expanded(26)
+
+
+def test_source_map_segments() -> None:
+    """Test whether segments are validated."""
+    source_map = SourceMap()
+    source_map.add_segment(0, 3, 10, 13)
+    with pytest.raises(ValueError):
+        source_map.add_segment(2, 4, 20, 22)
+    with pytest.raises(ValueError):
+        source_map.add_segment(3, 5, 20, 21)
+    source_map.add_segment(3, 4, 20, 22, inserted=True)
+    assert len(source_map) == 2
+    assert source_map.span_to_source((1, 4)) == (11, 22)
+
+
+def test_run_linter_list() -> None:
+    """Test whether all linter messages of a list are reported for the list."""
+    query_list = "1. TS=(a OR b)\n2. c\n3. #1 AND #2 AND #1 AND d"
+    assert run_linter(query_list, "wos") == [
+        {"level": "error", "msg": "Search field missing", "pos": (18, 19)},
+        {"level": "error", "msg": "Search field missing", "pos": (44, 45)},
+    ]
+    assert run_linter("1. TS=a\n2. #3\n3. #1 AND #2", "wos") == [
+        {"level": "error", "msg": "Circular reference", "pos": (11, 13)}
+    ]
+
+
+def test_run_linter_list_error_in_referenced_line() -> None:
+    """Test whether errors in a referenced line are reported in that line."""
+    query_list = "1. TS=(a b\n2. #1 AND TI=c"
+    messages = run_linter(query_list, "wos")
+    with pytest.raises(search_query_exception.QuerySyntaxError) as exc_info:
+        WOSListParser(query_list).parse()
+    assert [message["pos"] for message in messages] == [exc_info.value.pos]
+    assert messages[0]["pos"] == (6, 7)
+
+    # Rules report the positions in the referenced line as well
+    query_list = "1. TS=(a OR a)\n2. #1 AND TI=c"
+    assert run_linter(query_list, "wos") == [
+        {
+            "level": "warning",
+            "msg": "Redundant term (a)",
+            "pos": (12, 13),
+            "rule": "redundant-term",
+        }
+    ]
+
+
+def test_write_atomic(tmp_path: Path) -> None:
+    """Test whether files are replaced (without leftover temporary files)."""
+    path = tmp_path / "sub" / "file.txt"
+    write_atomic(str(path), "a")
+    write_atomic(str(path), b"b")
+    assert path.read_bytes() == b"b"
+    assert os.listdir(tmp_path / "sub") == ["file.txt"]